@@ -0,0 +1,166 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .synced_ids import SyncedIds
+
+# Canonical clause types; a clause key containing one of the keywords gets that type
+CLAUSE_TYPE_KEYWORDS = [
+    ("indemnification", ("indemn",)),
+    ("confidentiality", ("confidential", "non_disclosure", "nda")),
+    ("termination", ("terminat",)),
+    ("limitation_of_liability", ("liabilit",)),
+    ("warranty", ("warrant",)),
+    ("force_majeure", ("force_majeure",)),
+    ("intellectual_property", ("intellectual_property", "ip_")),
+    ("payment", ("payment", "fees", "invoic")),
+    ("renewal", ("renewal",)),
+    ("governing_law", ("governing_law", "jurisdiction")),
+    ("dispute_resolution", ("dispute", "arbitration")),
+    ("non_solicitation", ("non_solicit",)),
+    ("assignment", ("assignment",)),
+    ("insurance", ("insurance",)),
+    ("data_protection", ("data_protection", "privacy", "gdpr")),
+]
+
+MAX_CLAUSE_CHARS = 8000
+
+
+def normalize_clause_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+
+def clause_type(name: str) -> str:
+    """Canonical type for a clause key, falling back to the normalized key itself"""
+    key = normalize_clause_key(name)
+    for canonical, keywords in CLAUSE_TYPE_KEYWORDS:
+        if any(keyword in key for keyword in keywords):
+            return canonical
+    return key
+
+
+def clause_text(clause_data: Any) -> str:
+    """Text to embed for a clause value as stored in Contract.clauses"""
+    if isinstance(clause_data, dict):
+        text = clause_data.get("text")
+        if not text:
+            text = "; ".join(f"{k}: {v}" for k, v in clause_data.items() if k != "category" and v)
+    else:
+        text = str(clause_data or "")
+    return text.strip()[:MAX_CLAUSE_CHARS]
+
+
+def iter_clauses(clauses: Dict[str, Any]) -> Iterable[Tuple[str, str, str]]:
+    """Yield (clause_name, clause_type, text) for every non-empty clause"""
+    for name, data in (clauses or {}).items():
+        text = clause_text(data)
+        if text:
+            yield name, clause_type(name), text
+
+
+class ClauseIndex:
+    """In-memory cosine index over clause embeddings with contract/type filters.
+
+    Vectors are kept L2-normalized in one float32 matrix, so a query is a
+    single matrix-vector product over the (optionally filtered) rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._contract_ids = np.empty(0, dtype=np.int64)
+        self._types: List[str] = []
+        self._type_codes = np.empty(0, dtype=np.int32)
+        self._type_lookup: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._synced = SyncedIds()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def max_id(self) -> int:
+        return self._synced.max_id
+
+    def pending(self) -> Tuple[int, List[int]]:
+        """(max_id, gap ids) for the next sync; see SyncedIds"""
+        with self._lock:
+            return self._synced.pending()
+
+    def _type_code(self, name: str) -> int:
+        code = self._type_lookup.get(name)
+        if code is None:
+            code = len(self._types)
+            self._types.append(name)
+            self._type_lookup[name] = code
+        return code
+
+    def add(self, entries: List[Tuple[int, int, str, List[float]]]):
+        """Add (row_id, contract_id, clause_type, embedding) entries.
+
+        Rows the index already holds are skipped: two requests syncing at
+        once read the same new rows, and only the first one to get here adds them.
+        """
+        if not entries:
+            return
+        vectors = np.asarray([e[3] for e in entries], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        with self._lock:
+            fresh = [index for index, e in enumerate(entries) if self._synced.is_new(e[0])]
+            if not fresh:
+                return
+            if len(fresh) < len(entries):
+                entries = [entries[index] for index in fresh]
+                vectors = vectors[fresh]
+            ids = np.asarray([e[0] for e in entries], dtype=np.int64)
+            self._ids = np.concatenate([self._ids, ids])
+            self._contract_ids = np.concatenate([self._contract_ids, np.asarray([e[1] for e in entries], dtype=np.int64)])
+            self._type_codes = np.concatenate([self._type_codes, np.asarray([self._type_code(e[2]) for e in entries], dtype=np.int32)])
+            self._matrix = vectors if self._matrix is None else np.vstack([self._matrix, vectors])
+            self._synced.record(ids.tolist())
+
+    def remove_contract(self, contract_id: int):
+        with self._lock:
+            if self._matrix is None:
+                return
+            keep = self._contract_ids != contract_id
+            self._ids = self._ids[keep]
+            self._contract_ids = self._contract_ids[keep]
+            self._type_codes = self._type_codes[keep]
+            self._matrix = self._matrix[keep]
+
+    def search(self, vector: List[float], top_k: int = 10, contract_ids: Optional[List[int]] = None,
+               clause_type: Optional[str] = None, exclude_ids: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """Return (row_id, cosine score) of the nearest clauses, best first"""
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query /= norm
+
+        with self._lock:
+            if self._matrix is None or not len(self._ids):
+                return []
+            mask = np.ones(len(self._ids), dtype=bool)
+            if contract_ids:
+                mask &= np.isin(self._contract_ids, contract_ids)
+            if clause_type:
+                code = self._type_lookup.get(clause_type)
+                if code is None:
+                    return []
+                mask &= self._type_codes == code
+            if exclude_ids:
+                mask &= ~np.isin(self._ids, exclude_ids)
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return []
+            scores = self._matrix[rows] @ query if len(rows) < len(mask) else self._matrix @ query
+            ids = self._ids[rows]
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
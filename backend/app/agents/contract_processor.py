@@ -1,244 +1,100 @@
-import openai
+import asyncio
 import os
-from typing import Dict, Any, List, Tuple
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 import json
 import PyPDF2
-import re
 from io import BytesIO
-from openai import OpenAI
-from datetime import datetime
+from ..metrics import StageTimings
+from .diff_engine import diff_extractions
+from .extraction_merge import ExtractionMerge
+from .model_router import model_router, UsageRecorder
+from .prompts import extraction_system_prompt
+from .section_scanner import has_table_layout, scan_sections
+from .risk_rules import load_rules as load_risk_rules
+from .ocr import MIN_PAGE_CHARS as OCR_MIN_PAGE_CHARS, PageOCR, ocr_available
+from .relevance import (PAGE_BREAK, is_blank_page, is_table_of_contents, merge_small_chunks,
+                        strip_page_furniture, word_count)
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Chunk extraction requests in flight at once for a single document
+CHUNK_CONCURRENCY = int(os.getenv("OPENAI_CHUNK_CONCURRENCY", "4"))
 
-class ContractProcessor:
-    def __init__(self):
-        # Update the system prompt in ContractProcessor.__init__():
+# Scalar fields where chunks may disagree; conflicts go to the reconciliation model
+RECONCILED_FIELDS = [
+    ("contract_type",),
+    ("dates", "effective_date"),
+    ("dates", "expiration_date"),
+    ("financial", "total_value"),
+    ("financial", "currency"),
+]
 
-        self.system_prompt = """You are an Enterprise Contract Intelligence Agent. Extract ALL information from contracts.
+# Drop/merge chunks without contractual content before they reach the model
+RELEVANCE_GATING = os.getenv("RELEVANCE_GATING", "true").lower() in ("1", "true", "yes")
 
-        IMPORTANT EXTRACTIONS:
-        1. Extract signatories with names, titles, and signatures
-        2. Extract ALL parties with full legal names
-        3. For each contract, ensure you extract:
-           - All signatories (names, titles, signature dates)
-           - Total contract value with currency
-           - All parties involved
-           - Contract type and subtype
-           - Effective and expiration dates
+# Chunks are split at ~6000 characters; merged signature/short chunks may grow up to this size
+MAX_CHUNK_CHARS = 8000
 
-        INSTRUCTIONS:
-        1. Extract EVERY section, clause, term, and detail you find in the contract
-        2. If something doesn't fit predefined categories, create new categories
-        3. For tables (like payment schedules, deliverables, milestones), extract ALL data
-        4. For dates, convert to YYYY-MM-DD format
-        5. For monetary values, extract both amount and currency
-        6. For parties, extract FULL legal names
-        7. Preserve the original wording and structure when possible
-
-        Return ONLY valid JSON with this structure:
-        {
-            "contract_type": "type of contract",
-            "contract_subtype": "subtype if applicable",
-            "master_agreement_id": "reference number",
-            "parties": ["Party 1 Full Legal Name", "Party 2 Full Legal Name"],
-            
-            "dates": {
-                "effective_date": "YYYY-MM-DD",
-                "expiration_date": "YYYY-MM-DD",
-                "execution_date": "YYYY-MM-DD",
-                "termination_date": "YYYY-MM-DD",
-                "renewal_date": "YYYY-MM-DD",
-                "notice_period_days": 30,
-                "other_dates": {
-                    "date_description": "YYYY-MM-DD"
-                }
-            },
-            
-            "financial": {
-                "total_value": 100000,
-                "currency": "USD",
-                "payment_terms": "Net 30",
-                "billing_frequency": "Monthly",
-                "late_payment_fee": "1.5% per month",
-                "advance_payment": 0.3,
-                "retention_amount": 0.1,
-                "other_financial_terms": {}
-            },
-            
-            "payment_schedule": [
-                {
-                    "milestone": "Upon Signing",
-                    "percentage": 30,
-                    "amount": 30000,
-                    "due_date": "YYYY-MM-DD",
-                    "conditions": "None"
-                }
-            ],
-            
-            "deliverables": [
-                {
-                    "item": "Software Implementation",
-                    "due_date": "YYYY-MM-DD",
-                    "milestone": "Phase 1",
-                    "acceptance_criteria": "Client sign-off",
-                    "status": "Pending"
-                }
-            ],
-            
-            "service_levels": {
-                "uptime": {
-                    "target": "99.9%",
-                    "measurement_period": "Monthly",
-                    "remedies": "Service credit"
-                }
-            },
-            
-            "clauses": {
-                "confidentiality": {
-                    "text": "Full clause text here...",
-                    "duration_years": 5,
-                    "exceptions": "Public information",
-                    "category": "Legal"
-                },
-                "indemnification": {
-                    "text": "Full clause text here...",
-                    "scope": "Third-party claims",
-                    "limitations": "Direct damages only",
-                    "category": "Risk"
-                },
-                "termination": {
-                    "text": "Full clause text here...",
-                    "notice_period": 30,
-                    "causes": ["Breach", "Insolvency"],
-                    "category": "Administrative"
-                }
-            },
-            
-            "tables_and_schedules": {
-                "payment_schedule": "Full table text or structured data",
-                "deliverables_schedule": "Full table text or structured data",
-                "personnel_assignment": "Full table text or structured data"
-            },
-            
-            "key_fields": {
-                "contract_value": {
-                    "value": "100,000 USD",
-                    "data_type": "currency",
-                    "confidence": 0.95,
-                    "source_section": "Financial Terms"
-                },
-                "governing_law": {
-                    "value": "State of Delaware",
-                    "data_type": "text",
-                    "confidence": 0.98,
-                    "source_section": "Legal Provisions"
-                }
-            },
-            
-            "risk_indicators": {
-                "auto_renewal": true,
-                "unlimited_liability": false,
-                "penalty_clauses": true,
-                "confidentiality_period_years": 5,
-                "termination_for_convenience": true
-            },
-            
-            "compliance_requirements": {
-                "insurance_required": true,
-                "minimum_coverage": "1,000,000 USD",
-                "audit_rights": true,
-                "audit_frequency": "Annually",
-                "reporting_requirements": ["Monthly", "Quarterly", "Annually"]
-            },
-            
-            "contact_information": {
-                "signatories": [
-                    {
-                        "name": "John Doe",
-                        "title": "CEO",
-                        "email": "john@company.com",
-                        "signature_date": "YYYY-MM-DD"
-                    }
-                ],
-                "administrative_contacts": [
-                    {
-                        "type": "Billing",
-                        "name": "Jane Smith",
-                        "email": "billing@company.com",
-                        "phone": "+1-234-567-8900"
-                    }
-                ]
-            },
-            
-            "attachments_and_exhibits": [
-                {
-                    "name": "Exhibit A - Scope of Work",
-                    "reference": "Attached",
-                    "description": "Detailed project scope"
-                }
-            ],
-            
-            "miscellaneous": {
-                "document_version": "2.1",
-                "number_of_pages": 25,
-                "language": "English",
-                "has_amendments": false,
-                "amendment_history": []
-            },
-            
-            "extracted_sections": {
-                "section_name": {
-                    "text": "Full section text",
-                    "page_number": 5,
-                    "category": "category",
-                    "importance": "high/medium/low"
-                }
-            },
-            
-            "metadata": {
-                "extraction_completeness": 0.95,
-                "unstructured_content_preserved": true,
-                "tables_extracted": 2,
-                "sections_identified": 15
-            },
-            
-            "confidence_score": 0.95,
-            "risk_score": 0.3
-        }
+# Signature pages rarely run longer than this; longer chunks mentioning signatures are kept as-is
+SIGNATURE_BLOCK_MAX_WORDS = 150
 
-        IMPORTANT: 
-        - Extract ALL tables, schedules, and attachments
-        - If you see "REPORTING & PAYMENT SCHEDULE", extract it completely
-        - For payment schedules, extract all rows with amounts, dates, and conditions
-        - For reporting requirements, extract frequency, format, and recipients
-        - Preserve original wording for complex clauses
-        - Don't omit any information - include everything you find"""
+class ContractProcessor:
+    def __init__(self):
+        # Shared with save_contract_extraction and the portfolio re-score so all three agree
+        self.risk_rules = load_risk_rules()
     
-    def extract_text_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF file - FIXED VERSION"""
-        text = ""
+    @property
+    def system_prompt(self) -> str:
+        """Compact schema-driven prompt; identical for every request so providers can cache the prefix.
+        
+        Rendered from the schemas on first use (and cached there), not when the app is imported.
+        """
+        return extraction_system_prompt()
+    
+    def extract_text_from_pdf(self, file_content: bytes, stats: Optional[Dict[str, Any]] = None,
+                              ocr: bool = True) -> str:
+        """Extract text from PDF file, OCRing pages that have no text layer.
+        
+        `stats`, when given, receives page counts and how many pages were OCRed.
+        With ocr=False only the text layer is read (a cheap check at upload).
+        """
+        page_texts = []
+        scanned = []
+        can_ocr = ocr_available()
+        page_ocr = PageOCR() if ocr and can_ocr else None
         try:
             pdf_file = BytesIO(file_content)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
             for page_num in range(len(pdf_reader.pages)):
                 page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+                page_text = page.extract_text() or ""
+                if len(page_text.strip()) < OCR_MIN_PAGE_CHARS:
+                    scanned.append(page_num)
+                    if page_ocr is not None:
+                        # Recognised in the pool while the remaining pages are parsed
+                        page_ocr.submit(page_num, page)
+                page_texts.append(page_text)
                 
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
-            
-        return text
+        
+        recognised = page_ocr.collect() if page_ocr is not None else {}
+        for page_num, page_text in recognised.items():
+            if len(page_text.strip()) > len(page_texts[page_num].strip()):
+                page_texts[page_num] = page_text
+        
+        if stats is not None:
+            stats.update({
+                "page_count": len(page_texts),
+                "pages_without_text": len(scanned),
+                "ocr_pages": len(recognised),
+                "ocr": "available" if can_ocr else "unavailable",
+            })
+        # Page breaks let later stages recognise repeated headers and footers
+        return PAGE_BREAK.join(page_text + "\n" for page_text in page_texts)
     
     def _detect_tables(self, text: str) -> bool:
         """Detect if text contains table-like structures"""
-        # Simple table detection
-        lines = text.split('\n')
-        table_patterns = ['|', '\t', '  ', '    ']
-        for line in lines:
-            if any(pattern in line for pattern in table_patterns):
-                return True
-        return False
+        return has_table_layout(text)
     
     def _detect_signatures(self, text: str) -> bool:
         """Detect signature-related text"""
@@ -248,53 +104,8 @@ class ContractProcessor:
     
         
     def _calculate_risk_score(self, extraction: Dict[str, Any]) -> float:
-        """Calculate risk score based on extracted factors"""
-        risk_score = 0.0
-        
-        # Check for high-risk clauses
-        if extraction.get("clauses"):
-            high_risk_clauses = ["indemnification", "liability", "termination", "penalty"]
-            for clause in extraction["clauses"]:
-                if any(risk_term in clause.lower() for risk_term in high_risk_clauses):
-                    risk_score += 0.1
-        
-        # Check dates with better error handling
-        dates = extraction.get("dates", {})
-        if dates.get("expiration_date"):
-            try:
-                exp_date_str = dates["expiration_date"]
-                # Handle various date formats
-                if "T" in exp_date_str:
-                    exp_date = datetime.fromisoformat(exp_date_str.replace('Z', '+00:00'))
-                else:
-                    # Handle date-only format (YYYY-MM-DD)
-                    exp_date = datetime.strptime(exp_date_str, "%Y-%m-%d")
-                
-                days_remaining = (exp_date - datetime.now()).days
-                if days_remaining < 90:  # Expiring soon
-                    risk_score += 0.2
-                if days_remaining < 30:  # Expiring very soon
-                    risk_score += 0.3
-            except Exception as e:
-                print(f"Error parsing expiration date '{dates.get('expiration_date')}': {e}")
-        
-        # Check financial terms
-        financial = extraction.get("financial", {})
-        total_value = financial.get("total_value", 0)
-        
-        # Convert to float if it's a string
-        if isinstance(total_value, str):
-            try:
-                # Remove commas and non-numeric characters
-                total_value = float(''.join(filter(str.isdigit, total_value)))
-            except:
-                total_value = 0
-        
-        if total_value > 1000000:  # High value contract
-            risk_score += 0.15
-        
-        # Normalize to 0-1
-        return min(risk_score, 1.0)
+        """Calculate risk score from the configured risk rules"""
+        return self.risk_rules.score_extraction(extraction)[0]
     
     def _get_fallback_extraction(self) -> Dict[str, Any]:
         """Return structured fallback extraction"""
@@ -318,131 +129,26 @@ class ContractProcessor:
             "risk_score": 0.0
         }
     
-    def compare_versions(self, old_extraction: Dict[str, Any], new_extraction: Dict[str, Any]) -> Dict[str, Any]:
+    def compare_versions(self, old_extraction: Dict[str, Any], new_extraction: Dict[str, Any],
+                         max_deltas: int = 50, old_fingerprints: Dict[str, str] = None,
+                         new_fingerprints: Dict[str, str] = None) -> Dict[str, Any]:
         """Enhanced version comparison for amendments"""
-        deltas = []
+        # Structural tree diff: keyed/similarity list matching, identical subtrees skipped by hash.
+        # Precomputed section fingerprints let whole identical sections be skipped up front.
+        deltas, unchanged_subtrees = diff_extractions(
+            old_extraction, new_extraction,
+            old_fingerprints=old_fingerprints,
+            new_fingerprints=new_fingerprints
+        )
         
-        # Define comparison strategies for different field types
-        def compare_lists(old_list, new_list, field_name):
-            """Compare lists and identify additions/removals"""
-            if not old_list and not new_list:
-                return []
-            
-            old_list = old_list or []
-            new_list = new_list or []
-            
-            changes = []
-            old_set = set(str(item) for item in old_list)
-            new_set = set(str(item) for item in new_list)
-            
-            # Items removed
-            for item in old_set - new_set:
-                changes.append({
-                    "field_name": f"{field_name}.removed",
-                    "old_value": item,
-                    "new_value": None,
-                    "change_type": "removed"
-                })
-            
-            # Items added
-            for item in new_set - old_set:
-                changes.append({
-                    "field_name": f"{field_name}.added",
-                    "old_value": None,
-                    "new_value": item,
-                    "change_type": "added"
-                })
-            
-            return changes
-        
-        def compare_dicts(old_dict, new_dict, field_name):
-            """Compare dictionaries recursively"""
-            if not old_dict and not new_dict:
-                return []
-            
-            old_dict = old_dict or {}
-            new_dict = new_dict or {}
-            
-            changes = []
-            all_keys = set(old_dict.keys()) | set(new_dict.keys())
-            
-            for key in all_keys:
-                old_val = old_dict.get(key)
-                new_val = new_dict.get(key)
-                
-                # Handle nested structures
-                if isinstance(old_val, dict) and isinstance(new_val, dict):
-                    nested_changes = compare_dicts(old_val, new_val, f"{field_name}.{key}")
-                    changes.extend(nested_changes)
-                elif isinstance(old_val, list) and isinstance(new_val, list):
-                    list_changes = compare_lists(old_val, new_val, f"{field_name}.{key}")
-                    changes.extend(list_changes)
-                elif old_val != new_val:
-                    changes.append({
-                        "field_name": f"{field_name}.{key}",
-                        "old_value": old_val,
-                        "new_value": new_val,
-                        "change_type": "modified" if old_val is not None and new_val is not None else "added" if new_val is not None else "removed"
-                    })
-            
-            return changes
-        
-        # Compare all fields recursively
-        def compare_all_fields(old_data, new_data, path=""):
-            """Recursively compare all fields between two dictionaries"""
-            if not old_data and not new_data:
-                return []
-            
-            old_data = old_data or {}
-            new_data = new_data or {}
-            
-            changes = []
-            all_keys = set(old_data.keys()) | set(new_data.keys())
-            
-            for key in all_keys:
-                current_path = f"{path}.{key}" if path else key
-                old_val = old_data.get(key)
-                new_val = new_data.get(key)
-                
-                # Skip metadata fields that shouldn't be compared
-                if key in ['metadata', 'extracted_metadata', 'extraction_date', 'confidence_score', 'risk_score']:
-                    continue
-                
-                if isinstance(old_val, dict) and isinstance(new_val, dict):
-                    # Recursively compare dictionaries
-                    nested_changes = compare_all_fields(old_val, new_val, current_path)
-                    changes.extend(nested_changes)
-                elif isinstance(old_val, list) and isinstance(new_val, list):
-                    # Compare lists
-                    list_changes = compare_lists(old_val, new_val, current_path)
-                    changes.extend(list_changes)
-                elif old_val != new_val:
-                    # Simple value comparison
-                    changes.append({
-                        "field_name": current_path,
-                        "old_value": old_val,
-                        "new_value": new_val,
-                        "change_type": "modified" if old_val is not None and new_val is not None else "added" if new_val is not None else "removed"
-                    })
-            
-            return changes
-        
-        # Start comparison from root level
-        deltas = compare_all_fields(old_extraction, new_extraction)
-        
-        # Filter out None values that are the same
-        deltas = [delta for delta in deltas if delta["old_value"] != delta["new_value"]]
+        added = sum(1 for d in deltas if d["change_type"] == "added")
+        removed = sum(1 for d in deltas if d["change_type"] == "removed")
+        modified = sum(1 for d in deltas if d["change_type"] == "modified")
         
         # Generate a summary of changes
         summary_parts = []
         if deltas:
             summary_parts.append(f"Found {len(deltas)} changes")
-            
-            # Count by change type
-            added = sum(1 for d in deltas if d["change_type"] == "added")
-            removed = sum(1 for d in deltas if d["change_type"] == "removed")
-            modified = sum(1 for d in deltas if d["change_type"] == "modified")
-            
             if added:
                 summary_parts.append(f"{added} additions")
             if removed:
@@ -453,50 +159,188 @@ class ContractProcessor:
         summary = "No changes detected." if not deltas else f"Amendment analysis: {', '.join(summary_parts)}."
         
         # Calculate confidence change
-        old_conf = old_extraction.get("confidence_score", 0.0)
-        new_conf = new_extraction.get("confidence_score", 0.0)
+        old_conf = old_extraction.get("confidence_score") or 0.0
+        new_conf = new_extraction.get("confidence_score") or 0.0
         confidence_change = new_conf - old_conf
         
         return {
-            "deltas": deltas[:50],  # Limit to 50 most important changes
+            "deltas": deltas[:max_deltas],  # Already ranked, most important first
             "summary": summary,
             "confidence_change": confidence_change,
             "statistics": {
                 "total_changes": len(deltas),
-                "added": sum(1 for d in deltas if d["change_type"] == "added"),
-                "removed": sum(1 for d in deltas if d["change_type"] == "removed"),
-                "modified": sum(1 for d in deltas if d["change_type"] == "modified")
+                "added": added,
+                "removed": removed,
+                "modified": modified,
+                "unchanged_subtrees": unchanged_subtrees
             }
         }
 
     def extract_tables_from_text(self, text: str) -> Dict[str, Any]:
         """Extract table-like structures from text"""
         tables = {}
+        # Single linear pass; later sections with the same heading win, as before
+        for span in scan_sections(text):
+            tables[span["title"]] = text[span["start"]:span["end"]]
+        return tables
+
+    async def _extract_json(self, recorder: UsageRecorder, stage: str, user_content: str,
+                            max_tokens: int) -> Dict[str, Any]:
+        """Run the extraction prompt with the model routed for `stage` and parse the JSON reply"""
+        response = await recorder.complete(
+            stage,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.1,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"}
+        )
+        return json.loads(response.choices[0].message.content)
+    
+    def _needs_escalation(self, extracted: Dict[str, Any]) -> bool:
+        """Whether a cheap-model chunk result is too uncertain to keep"""
+        confidence = extracted.get("confidence_score")
+        return isinstance(confidence, (int, float)) and confidence < model_router.escalation_threshold
+    
+    def _conflicting_fields(self, chunk_results: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Distinct candidate values per reconciled field, where chunks disagree"""
+        conflicts = {}
+        for path in RECONCILED_FIELDS:
+            candidates = []
+            for chunk in chunk_results:
+                value = chunk
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if value not in (None, "", "Unknown") and value not in candidates:
+                    candidates.append(value)
+            if len(candidates) > 1:
+                conflicts[".".join(path)] = candidates
+        return conflicts
+    
+    async def _reconcile(self, recorder: UsageRecorder, merged: Dict[str, Any],
+                         conflicts: Dict[str, List[Any]]) -> Dict[str, Any]:
+        """Resolve fields the chunks disagree on with the reconciliation model"""
+        prompt = f"""Different sections of the same contract produced conflicting values for these fields.
+        Choose the single correct value for each field, using the contract type, parties and clauses for context.
         
-        # Common table patterns in contracts
-        table_patterns = [
-            r"(PAYMENT\s+SCHEDULE[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
-            r"(REPORTING\s+REQUIREMENTS[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
-            r"(DELIVERABLES[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
-            r"(MILESTONES[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
-            r"(SCHEDULE\s+[A-Z][\s\S]*?)(?=\n\n|\n[A-Z]|$)",
-            r"(EXHIBIT\s+[A-Z][\s\S]*?)(?=\n\n|\n[A-Z]|$)"
-        ]
+        Contract type: {merged.get("contract_type")}
+        Parties: {json.dumps(merged.get("parties", []))}
+        Clauses: {json.dumps(list(merged.get("clauses", {}).keys()))}
         
-        for pattern in table_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                table_name = match.group(1).split('\n')[0].strip()
-                table_content = match.group(1)
-                tables[table_name] = table_content
+        Conflicting candidates:
+        {json.dumps(conflicts, indent=2, default=str)}
         
-        return tables
-
-    def process_contract(self, text: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Process contract text with enhanced table extraction and chunking for large documents"""
+        Return ONLY a JSON object mapping each field name above to its chosen value."""
+        
+        response = await recorder.complete(
+            "reconciliation",
+            messages=[
+                {"role": "system", "content": "You reconcile contract data extracted from multiple sections."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=300,
+            response_format={"type": "json_object"}
+        )
+        resolved = json.loads(response.choices[0].message.content)
+        
+        for field, value in resolved.items():
+            if field not in conflicts:
+                continue
+            *parents, leaf = field.split(".")
+            target = merged
+            for key in parents:
+                target = target.setdefault(key, {})
+            target[leaf] = value
+        return merged
+    
+    def _split_into_chunks(self, text: str, chunk_size: int = 6000) -> List[str]:
+        """Split text into chunks, breaking at paragraph or sentence boundaries where possible"""
+        chunks = []
+        start = 0
+        
+        while start < len(text):
+            end = start + chunk_size
+            # Try to break at a paragraph or sentence boundary
+            if end < len(text):
+                # Look for paragraph break first
+                paragraph_break = text.rfind('\n\n', start, end)
+                if paragraph_break != -1 and paragraph_break > start:
+                    end = paragraph_break
+                else:
+                    # Look for sentence break
+                    sentence_break = max(text.rfind('. ', start, end),
+                                        text.rfind('? ', start, end),
+                                        text.rfind('! ', start, end))
+                    if sentence_break != -1 and sentence_break > start:
+                        end = sentence_break + 1
+            
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = end
+        
+        return chunks
+    
+    def _gate_chunks(self, chunks: List[str]) -> Tuple[List[str], Dict[str, Any]]:
+        """Drop chunks without contractual content and fold short ones into their neighbours"""
+        dropped = {"table_of_contents": 0, "blank": 0}
+        candidates = []
+        for chunk in chunks:
+            if self._detect_signatures(chunk) and word_count(chunk) < SIGNATURE_BLOCK_MAX_WORDS:
+                # Signature blocks carry signatories, so they are merged rather than dropped
+                candidates.append((chunk, True))
+            elif is_blank_page(chunk):
+                if self._detect_tables(chunk):
+                    # A few tabular lines may still be a small schedule; keep them with a neighbour
+                    candidates.append((chunk, True))
+                else:
+                    dropped["blank"] += 1
+            elif self.extract_tables_from_text(chunk):
+                # Anything with a schedule, exhibit or payment table is always worth extracting
+                candidates.append((chunk, False))
+            elif is_table_of_contents(chunk):
+                dropped["table_of_contents"] += 1
+            else:
+                candidates.append((chunk, False))
+        
+        if not candidates:
+            # Nothing looked contractual; let the model decide rather than extract nothing
+            return chunks, {"chunks_total": len(chunks), "chunks_sent": len(chunks), "dropped": {},
+                            "merged": 0, "calls_saved": 0}
+        
+        kept, merged = merge_small_chunks(candidates, MAX_CHUNK_CHARS)
+        return kept, {
+            "chunks_total": len(chunks),
+            "chunks_sent": len(kept),
+            "dropped": dropped,
+            "merged": merged,
+            "calls_saved": len(chunks) - len(kept),
+        }
+    
+    async def process_contract(self, text: str, metadata: Dict[str, Any] = None,
+                               timings: Optional[StageTimings] = None,
+                               chunk_progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Process contract text with enhanced table extraction and chunking for large documents.
+        
+        Stage timings are added to `timings` (a new one if not given) and saved in
+        metadata["stage_timings"]. `chunk_progress(done, total)` is awaited as
+        chunks finish, in completion order.
+        """
+        recorder = UsageRecorder(model_router)
+        timings = timings or StageTimings()
         try:
-            # Extract tables before sending to OpenAI
-            extracted_tables = self.extract_tables_from_text(text)
+            furniture_lines = 0
+            if RELEVANCE_GATING:
+                # Repeated page headers/footers would otherwise be sent once per chunk
+                with timings.stage("strip_headers"):
+                    text, furniture_lines = await asyncio.to_thread(strip_page_furniture, text)
+            
+            # Extract tables before sending to OpenAI (regex scan, kept off the event loop)
+            with timings.stage("table_scan"):
+                extracted_tables = await asyncio.to_thread(self.extract_tables_from_text, text)
             
             # Calculate approximate token count (rough estimate: 1 token ≈ 4 characters)
             approx_tokens = len(text) / 4
@@ -505,67 +349,90 @@ class ContractProcessor:
             if approx_tokens > 2000:  # Conservative threshold for GPT-4
                 print(f"Document too large ({approx_tokens:.0f} estimated tokens), processing in chunks")
                 
-                # Split text into chunks of ~2000 tokens each (8000 characters)
-                chunk_size = 6000
-                chunks = []
-                start = 0
-                
-                while start < len(text):
-                    end = start + chunk_size
-                    # Try to break at a paragraph or sentence boundary
-                    if end < len(text):
-                        # Look for paragraph break first
-                        paragraph_break = text.rfind('\n\n', start, end)
-                        if paragraph_break != -1 and paragraph_break > start:
-                            end = paragraph_break
-                        else:
-                            # Look for sentence break
-                            sentence_break = max(text.rfind('. ', start, end),
-                                                text.rfind('? ', start, end),
-                                                text.rfind('! ', start, end))
-                            if sentence_break != -1 and sentence_break > start:
-                                end = sentence_break + 1
-                    
-                    chunk = text[start:end].strip()
-                    if chunk:
-                        chunks.append(chunk)
-                    start = end
+                # Split text into chunks of ~2000 tokens each
+                with timings.stage("chunking"):
+                    chunks = self._split_into_chunks(text)
                 
                 print(f"Split document into {len(chunks)} chunks")
                 
-                # Process each chunk and combine results
-                all_extracted_data = []
-                for i, chunk in enumerate(chunks):
-                    print(f"Processing chunk {i+1}/{len(chunks)}")
+                gating = None
+                if RELEVANCE_GATING:
+                    with timings.stage("relevance_gating"):
+                        chunks, gating = await asyncio.to_thread(self._gate_chunks, chunks)
+                    gating["header_footer_lines_removed"] = furniture_lines
+                    print(f"Relevance gating: sending {len(chunks)} chunks, {gating['calls_saved']} calls saved")
+                
+                # Process chunks concurrently; results are folded into the merge as they arrive
+                semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+                merger = ExtractionMerge()
+                chunks_done = 0
+                
+                async def report_chunk():
+                    nonlocal chunks_done
+                    chunks_done += 1
+                    if chunk_progress is not None:
+                        await chunk_progress(chunks_done, len(chunks))
+                
+                async def extract_chunk(i: int, chunk: str):
+                    # Document-wide context first, so all chunks of a document share a longer prefix
+                    chunk_prompt = f"""Important tables found in full document: {list(extracted_tables.keys())}
                     
-                    chunk_prompt = f"""Analyze this portion of a contract document (chunk {i+1} of {len(chunks)}).
+                    Analyze this portion of a contract document (chunk {i+1} of {len(chunks)}).
                     Focus on extracting contractual elements from this specific section.
                     
-                    Important tables found in full document: {list(extracted_tables.keys())}
+                    Document text: {chunk[:MAX_CHUNK_CHARS]}"""
                     
-                    Document text: {chunk[:6000]}"""
+                    async with semaphore:
+                        print(f"Processing chunk {i+1}/{len(chunks)}")
+                        try:
+                            # Fast model first; uncertain or unparseable chunks go to the strong model
+                            extracted = None
+                            try:
+                                extracted = await self._extract_json(recorder, "chunk_extraction", chunk_prompt, 1500)
+                                if self._needs_escalation(extracted):
+                                    print(f"Chunk {i+1} below confidence threshold, escalating")
+                                    extracted = None
+                            except json.JSONDecodeError:
+                                print(f"Chunk {i+1} returned invalid JSON, escalating")
+                            
+                            if extracted is None:
+                                extracted = await self._extract_json(recorder, "escalation", chunk_prompt, 1500)
+                            
+                        except Exception as e:
+                            # Transient API errors were already retried by the rate limiter
+                            print(f"Error processing chunk {i+1}: {str(e)}")
+                            await report_chunk()
+                            return None
                     
+                    merger.add(i, extracted)
+                    await report_chunk()
+                    return extracted
+                
+                with timings.stage("chunk_extraction"):
+                    chunk_results = await asyncio.gather(*[
+                        extract_chunk(i, chunk) for i, chunk in enumerate(chunks)
+                    ])
+                all_extracted_data = [result for result in chunk_results if result is not None]
+                failed_chunks = [i + 1 for i, result in enumerate(chunk_results) if result is None]
+                
+                if not all_extracted_data:
+                    raise RuntimeError(f"All {len(chunks)} chunks failed extraction")
+                
+                with timings.stage("merge"):
+                    combined_result = self._merged_result(merger)
+                    conflicts = self._conflicting_fields(all_extracted_data)
+                
+                # Only fields the chunks disagree on are sent to the strong model
+                if conflicts:
                     try:
-                        response = client.chat.completions.create(
-                            model="gpt-4-turbo-preview",
-                            messages=[
-                                {"role": "system", "content": self.system_prompt},
-                                {"role": "user", "content": chunk_prompt}
-                            ],
-                            temperature=0.1,
-                            max_tokens=1500,  # Conservative for chunks
-                            response_format={"type": "json_object"}
-                        )
-                        
-                        extracted = json.loads(response.choices[0].message.content)
-                        all_extracted_data.append(extracted)
-                        
+                        with timings.stage("reconciliation"):
+                            combined_result = await self._reconcile(recorder, combined_result, conflicts)
                     except Exception as e:
-                        print(f"Error processing chunk {i+1}: {str(e)}")
-                        continue
+                        print(f"Error reconciling chunk results: {e}")
                 
-                # Combine all extracted data intelligently
-                combined_result = self._merge_chunk_extractions(all_extracted_data)
+                # Record partial extractions instead of dropping chunks silently
+                if failed_chunks:
+                    combined_result["metadata"]["failed_chunks"] = failed_chunks
                 
                 # Add extracted tables to result
                 if extracted_tables:
@@ -582,6 +449,10 @@ class ContractProcessor:
                         "processing_method": "chunked",
                         "number_of_chunks": len(chunks)
                     }
+                combined_result["metadata"]["model_usage"] = recorder.summary()
+                combined_result["metadata"]["stage_timings"] = timings.summary()
+                if gating:
+                    combined_result["metadata"]["relevance_gating"] = gating
                 
                 return combined_result
                 
@@ -597,18 +468,9 @@ class ContractProcessor:
                 {text[:12000]}  # Leave room for response
                 """
                 
-                response = client.chat.completions.create(
-                    model="gpt-4-turbo-preview",
-                    messages=[
-                        {"role": "system", "content": self.system_prompt},
-                        {"role": "user", "content": context}
-                    ],
-                    temperature=0.1,
-                    max_tokens=4000,  # Increased for detailed extraction
-                    response_format={"type": "json_object"}
-                )
-                
-                result = json.loads(response.choices[0].message.content)
+                # Increased token budget for detailed single-pass extraction
+                with timings.stage("full_extraction"):
+                    result = await self._extract_json(recorder, "full_extraction", context, 4000)
                 
                 # Add extracted tables to result
                 if extracted_tables:
@@ -620,110 +482,47 @@ class ContractProcessor:
                 # Add metadata
                 if metadata:
                     result["metadata"] = {**result.get("metadata", {}), **metadata}
+                result.setdefault("metadata", {})["model_usage"] = recorder.summary()
+                result["metadata"]["stage_timings"] = timings.summary()
                 
                 return result
                 
         except Exception as e:
             print(f"Error processing contract: {e}")
-            return self._get_fallback_extraction()
+            fallback = self._get_fallback_extraction()
+            fallback["metadata"] = {
+                **(metadata or {}),
+                "extraction_error": str(e)[:500],
+                "model_usage": recorder.summary(),
+                "stage_timings": timings.summary()
+            }
+            return fallback
 
     def _merge_chunk_extractions(self, chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Merge multiple chunk extractions into a single comprehensive result"""
-        if not chunk_results:
+        merger = ExtractionMerge()
+        for i, chunk in enumerate(chunk_results):
+            merger.add(i, chunk)
+        return self._merged_result(merger)
+    
+    def _merged_result(self, merger: ExtractionMerge) -> Dict[str, Any]:
+        """Final extraction from a streaming merge of chunk results"""
+        if not merger.chunks:
             return self._get_fallback_extraction()
         
-        # Start with first chunk as base
-        merged = chunk_results[0].copy()
-        
-        # Merge parties (unique)
-        all_parties = set()
-        for chunk in chunk_results:
-            if "parties" in chunk and isinstance(chunk["parties"], list):
-                all_parties.update(chunk["parties"])
-        merged["parties"] = list(all_parties)
-        
-        # Merge dates (keep most specific)
-        for chunk in chunk_results[1:]:
-            if "dates" in chunk and isinstance(chunk["dates"], dict):
-                for date_type, date_value in chunk["dates"].items():
-                    if date_value and date_value != "Unknown":
-                        if date_type not in merged["dates"] or merged["dates"][date_type] == "Unknown":
-                            merged["dates"][date_type] = date_value
-        
-        # Merge financial data - FIXED: Handle string values properly
-        for chunk in chunk_results[1:]:
-            if "financial" in chunk and isinstance(chunk["financial"], dict):
-                for financial_key, financial_value in chunk["financial"].items():
-                    if financial_value:
-                        # Skip comparison for non-numeric fields
-                        if financial_key in ["currency", "payment_terms", "billing_frequency", "late_payment_fee", "advance_payment", "retention_amount"]:
-                            if financial_key not in merged["financial"]:
-                                merged["financial"][financial_key] = financial_value
-                        else:
-                            # For numeric fields (total_value), handle string to number conversion
-                            if financial_key == "total_value":
-                                try:
-                                    # Convert current value to float if it exists
-                                    current_val = merged["financial"].get(financial_key, 0)
-                                    if isinstance(current_val, str):
-                                        try:
-                                            # Remove non-numeric characters and convert
-                                            current_val_clean = ''.join(c for c in str(current_val) if c.isdigit() or c == '.')
-                                            current_val = float(current_val_clean) if current_val_clean else 0
-                                        except:
-                                            current_val = 0
-                                    
-                                    # Convert new value to float
-                                    new_val = financial_value
-                                    if isinstance(new_val, str):
-                                        try:
-                                            # Remove non-numeric characters and convert
-                                            new_val_clean = ''.join(c for c in str(new_val) if c.isdigit() or c == '.')
-                                            new_val = float(new_val_clean) if new_val_clean else 0
-                                        except:
-                                            new_val = 0
-                                    
-                                    # Only update if new value is larger and valid
-                                    if financial_key not in merged["financial"] or new_val > current_val:
-                                        merged["financial"][financial_key] = financial_value  # Keep original value
-                                except Exception as e:
-                                    print(f"Error comparing financial value for {financial_key}: {e}")
-                                    continue
-                            else:
-                                # For other financial fields, just take the first non-empty value
-                                if financial_key not in merged["financial"]:
-                                    merged["financial"][financial_key] = financial_value
-        
-        # Merge clauses
-        all_clauses = {}
-        for chunk in chunk_results:
-            if "clauses" in chunk and isinstance(chunk["clauses"], dict):
-                for clause_name, clause_data in chunk["clauses"].items():
-                    if clause_name not in all_clauses or len(str(clause_data)) > len(str(all_clauses[clause_name])):
-                        all_clauses[clause_name] = clause_data
-        merged["clauses"] = all_clauses
-        
-        # Merge deliverables
-        all_deliverables = []
-        for chunk in chunk_results:
-            if "deliverables" in chunk and isinstance(chunk["deliverables"], list):
-                for deliverable in chunk["deliverables"]:
-                    if deliverable not in all_deliverables:
-                        all_deliverables.append(deliverable)
-        merged["deliverables"] = all_deliverables
-        
-        # Update metadata
+        merged = merger.result()
+        clauses = merged.get("clauses", {})
+        deliverables = merged.get("deliverables", [])
         merged["metadata"] = {
             "extraction_completeness": 0.95,
             "unstructured_content_preserved": True,
             "tables_extracted": len(merged.get("tables_and_schedules", {})),
-            "sections_identified": len(all_clauses) + len(all_deliverables),
+            "sections_identified": len(clauses) + len(deliverables),
             "processing_method": "chunked_merge"
         }
-        
         return merged
 
-    def compare_text_content(self, old_text: str, new_text: str) -> Dict[str, Any]:
+    async def compare_text_content(self, old_text: str, new_text: str) -> Dict[str, Any]:
         """Compare raw text content for amendments using OpenAI"""
         try:
             prompt = f"""Compare these two contract versions and identify ALL changes between them.
@@ -758,8 +557,8 @@ class ContractProcessor:
             }}
             """
             
-            response = client.chat.completions.create(
-                model="gpt-4-turbo-preview",
+            response = await UsageRecorder(model_router).complete(
+                "comparison",
                 messages=[
                     {"role": "system", "content": "You are a legal contract comparison expert. Analyze amendments thoroughly."},
                     {"role": "user", "content": prompt}
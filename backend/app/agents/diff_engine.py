@@ -0,0 +1,322 @@
+import hashlib
+import json
+from datetime import date, datetime
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keys that never take part in a comparison (extraction bookkeeping, not contract content)
+SKIP_KEYS = {"metadata", "extracted_metadata", "extraction_date", "confidence_score", "risk_score"}
+
+# Fields used to match list items of dicts across versions, in order of preference
+LIST_KEY_FIELDS = ("id", "name", "item", "milestone", "title", "factor", "section", "type")
+
+# Relative importance of each top-level section, used to rank deltas
+SECTION_WEIGHTS = {
+    "financial": 1.0,
+    "payment_schedule": 0.95,
+    "parties": 0.95,
+    "dates": 0.9,
+    "clauses": 0.85,
+    "risk_indicators": 0.8,
+    "contract_type": 0.8,
+    "key_fields": 0.7,
+    "compliance_requirements": 0.65,
+    "deliverables": 0.6,
+    "service_levels": 0.6,
+    "contact_information": 0.5,
+    "tables_and_schedules": 0.4,
+    "attachments_and_exhibits": 0.35,
+    "extracted_sections": 0.3,
+    "miscellaneous": 0.2,
+}
+DEFAULT_SECTION_WEIGHT = 0.5
+CHANGE_TYPE_WEIGHTS = {"removed": 1.0, "modified": 0.9, "added": 0.8}
+
+SIMILARITY_THRESHOLD = 0.6
+# Upper bound on old x new candidate pairs scored for similarity in a single list
+MAX_SIMILARITY_PAIRS = 2500
+
+
+def normalize_value(value: Any) -> Any:
+    """Bring scalars into a canonical, JSON-serializable form"""
+    if isinstance(value, datetime):
+        if value.hour == value.minute == value.second == value.microsecond == 0:
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {str(k): normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    return value
+
+
+class _Node:
+    """Subtree of an extraction annotated with a content digest"""
+
+    __slots__ = ("value", "digest", "children", "leaves")
+
+    def __init__(self, value: Any, digest: bytes, children: Any = None, leaves: Optional[frozenset] = None):
+        self.value = value
+        self.digest = digest
+        self.children = children
+        self.leaves = leaves
+
+
+def _hash(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+def build_tree(value: Any) -> _Node:
+    """Hash a normalized value bottom-up so every subtree carries its digest"""
+    if isinstance(value, dict):
+        children = {}
+        parts = [b"d"]
+        for key in sorted(value):
+            if key in SKIP_KEYS:
+                continue
+            child = build_tree(value[key])
+            children[key] = child
+            parts.append(key.encode("utf-8"))
+            parts.append(child.digest)
+        return _Node(value, _hash(*parts), children)
+    if isinstance(value, list):
+        children = [build_tree(v) for v in value]
+        return _Node(value, _hash(b"l", *(c.digest for c in children)), children)
+    encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return _Node(value, _hash(b"s", encoded))
+
+
+def _leaf_set(node: _Node) -> frozenset:
+    """Set of (path, digest) pairs for the leaves of a subtree, used for similarity"""
+    if node.leaves is None:
+        leaves = set()
+        stack = [("", node)]
+        while stack:
+            path, current = stack.pop()
+            if isinstance(current.children, dict):
+                for key, child in current.children.items():
+                    stack.append((f"{path}.{key}", child))
+            elif isinstance(current.children, list):
+                for child in current.children:
+                    stack.append((f"{path}[]", child))
+            else:
+                leaves.add((path, current.digest))
+        node.leaves = frozenset(leaves)
+    return node.leaves
+
+
+def similarity(old: _Node, new: _Node) -> float:
+    """Similarity in [0, 1] between two subtrees"""
+    if old.digest == new.digest:
+        return 1.0
+    if isinstance(old.value, str) and isinstance(new.value, str):
+        matcher = SequenceMatcher(None, old.value, new.value, autojunk=False)
+        if matcher.real_quick_ratio() < SIMILARITY_THRESHOLD or matcher.quick_ratio() < SIMILARITY_THRESHOLD:
+            return 0.0
+        return matcher.ratio()
+    if old.children is None or new.children is None or type(old.children) is not type(new.children):
+        return 0.0
+    old_leaves = _leaf_set(old)
+    new_leaves = _leaf_set(new)
+    union = len(old_leaves | new_leaves)
+    return len(old_leaves & new_leaves) / union if union else 1.0
+
+
+def _list_key_field(old_items: List[_Node], new_items: List[_Node]) -> Optional[str]:
+    """Pick a field that uniquely identifies the dict items on both sides"""
+    items = old_items + new_items
+    if not items or not all(isinstance(n.children, dict) for n in items):
+        return None
+    for field in LIST_KEY_FIELDS:
+        old_keys = [_item_key(n, field) for n in old_items]
+        new_keys = [_item_key(n, field) for n in new_items]
+        if None in old_keys or None in new_keys:
+            continue
+        if len(set(old_keys)) == len(old_keys) and len(set(new_keys)) == len(new_keys):
+            return field
+    return None
+
+
+def _item_key(node: _Node, field: str) -> Optional[str]:
+    child = node.children.get(field)
+    if child is None or not isinstance(child.value, (str, int, float)) or isinstance(child.value, bool):
+        return None
+    return str(child.value).strip().lower()
+
+
+def _item_label(node: _Node, fallback: int) -> str:
+    """Human-readable label for a list item in a delta path"""
+    if isinstance(node.children, dict):
+        for field in LIST_KEY_FIELDS:
+            child = node.children.get(field)
+            if child is not None and isinstance(child.value, (str, int)) and not isinstance(child.value, bool):
+                return str(child.value)
+    elif node.children is None and isinstance(node.value, (str, int, float)) and len(str(node.value)) <= 80:
+        return str(node.value)
+    return str(fallback)
+
+
+class TreeDiff:
+    """Structural diff between two extraction trees"""
+
+    def __init__(self, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.similarity_threshold = similarity_threshold
+        self.deltas: List[Dict[str, Any]] = []
+        self.nodes_skipped = 0
+
+    def diff(self, old: _Node, new: _Node, path: str = "") -> List[Dict[str, Any]]:
+        self._diff(old, new, path)
+        return self.deltas
+
+    def _emit(self, path: str, old_value: Any, new_value: Any, change_type: str):
+        self.deltas.append({
+            "field_name": path,
+            "old_value": old_value,
+            "new_value": new_value,
+            "change_type": change_type,
+        })
+
+    def _diff(self, old: Optional[_Node], new: Optional[_Node], path: str):
+        if old is None and new is None:
+            return
+        if old is None:
+            if new.value not in (None, "", [], {}):
+                self._emit(path, None, new.value, "added")
+            return
+        if new is None:
+            if old.value not in (None, "", [], {}):
+                self._emit(path, old.value, None, "removed")
+            return
+        if old.digest == new.digest:
+            self.nodes_skipped += 1
+            return
+
+        if isinstance(old.children, dict) and isinstance(new.children, dict):
+            for key in old.children.keys() | new.children.keys():
+                self._diff(old.children.get(key), new.children.get(key),
+                           f"{path}.{key}" if path else key)
+        elif isinstance(old.children, list) and isinstance(new.children, list):
+            self._diff_lists(old.children, new.children, path)
+        elif old.value is None or old.value == "":
+            self._emit(path, None, new.value, "added")
+        elif new.value is None or new.value == "":
+            self._emit(path, old.value, None, "removed")
+        else:
+            self._emit(path, old.value, new.value, "modified")
+
+    def _diff_lists(self, old_items: List[_Node], new_items: List[_Node], path: str):
+        # 1. Identical items match regardless of position
+        unmatched_new: Dict[bytes, List[int]] = {}
+        for j, node in enumerate(new_items):
+            unmatched_new.setdefault(node.digest, []).append(j)
+        old_left = []
+        for i, node in enumerate(old_items):
+            bucket = unmatched_new.get(node.digest)
+            if bucket:
+                bucket.pop()
+                self.nodes_skipped += 1
+            else:
+                old_left.append(i)
+        new_left = sorted(j for bucket in unmatched_new.values() for j in bucket)
+        if not old_left and not new_left:
+            return
+
+        # 2. Keyed matching of dict items (deliverables by "item", schedules by "milestone", ...)
+        old_nodes = [old_items[i] for i in old_left]
+        new_nodes = [new_items[j] for j in new_left]
+        key_field = _list_key_field(old_nodes, new_nodes)
+        if key_field:
+            new_by_key = {_item_key(n, key_field): (j, n) for j, n in zip(new_left, new_nodes)}
+            still_old = []
+            for i, node in zip(old_left, old_nodes):
+                match = new_by_key.pop(_item_key(node, key_field), None)
+                if match is None:
+                    still_old.append(i)
+                else:
+                    self._diff(node, match[1], f"{path}[{_item_label(node, i)}]")
+            old_left = still_old
+            new_left = sorted(j for j, _ in new_by_key.values())
+
+        # 3. Pair the remaining items by similarity, best pairs first
+        pairs: List[Tuple[float, int, int]] = []
+        if old_left and new_left and len(old_left) * len(new_left) <= MAX_SIMILARITY_PAIRS:
+            for i in old_left:
+                for j in new_left:
+                    score = similarity(old_items[i], new_items[j])
+                    if score >= self.similarity_threshold:
+                        pairs.append((score, i, j))
+            pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+        paired_old, paired_new = set(), set()
+        for _, i, j in pairs:
+            if i in paired_old or j in paired_new:
+                continue
+            paired_old.add(i)
+            paired_new.add(j)
+            self._diff(old_items[i], new_items[j], f"{path}[{_item_label(old_items[i], i)}]")
+
+        # 4. Whatever is left was genuinely removed or added
+        for i in old_left:
+            if i not in paired_old:
+                self._emit(f"{path}[{_item_label(old_items[i], i)}]", old_items[i].value, None, "removed")
+        for j in new_left:
+            if j not in paired_new:
+                self._emit(f"{path}[{_item_label(new_items[j], j)}]", None, new_items[j].value, "added")
+
+
+def delta_importance(delta: Dict[str, Any]) -> float:
+    """Score a delta by section, change type and nesting depth"""
+    path = delta["field_name"]
+    section = path.split(".", 1)[0].split("[", 1)[0]
+    depth = path.count(".") + path.count("[")
+    weight = SECTION_WEIGHTS.get(section, DEFAULT_SECTION_WEIGHT)
+    weight *= CHANGE_TYPE_WEIGHTS.get(delta["change_type"], 0.8)
+    return round(weight / (1 + 0.25 * depth), 4)
+
+
+def rank_deltas(deltas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Attach an importance score to each delta and sort most important first"""
+    for delta in deltas:
+        delta["importance"] = delta_importance(delta)
+    return sorted(deltas, key=lambda d: (-d["importance"], d["field_name"]))
+
+
+def section_fingerprints(extraction: Dict[str, Any]) -> Dict[str, str]:
+    """Merkle-style digest of each top-level section of an extraction"""
+    tree = build_tree(normalize_value(extraction or {}))
+    return {key: child.digest.hex() for key, child in tree.children.items()}
+
+
+def fingerprint_digest(fingerprints: Dict[str, str]) -> str:
+    """Single digest over all section fingerprints, identifying a contract's content"""
+    parts = [f"{key}={fingerprints[key]}".encode("utf-8") for key in sorted(fingerprints or {})]
+    return _hash(b"f", *parts).hex()
+
+
+def diff_extractions(old_extraction: Dict[str, Any], new_extraction: Dict[str, Any],
+                     similarity_threshold: float = SIMILARITY_THRESHOLD,
+                     old_fingerprints: Optional[Dict[str, str]] = None,
+                     new_fingerprints: Optional[Dict[str, str]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """Diff two extraction dicts; returns ranked deltas and the number of identical subtrees skipped"""
+    old_extraction = old_extraction or {}
+    new_extraction = new_extraction or {}
+    skipped_sections = 0
+    if old_fingerprints and new_fingerprints:
+        # Sections with equal precomputed fingerprints are identical: drop them without hashing
+        same = {key for key, digest in old_fingerprints.items() if new_fingerprints.get(key) == digest}
+        if same:
+            old_extraction = {k: v for k, v in old_extraction.items() if k not in same}
+            new_extraction = {k: v for k, v in new_extraction.items() if k not in same}
+            skipped_sections = len(same)
+
+    old_tree = build_tree(normalize_value(old_extraction))
+    new_tree = build_tree(normalize_value(new_extraction))
+    engine = TreeDiff(similarity_threshold)
+    deltas = engine.diff(old_tree, new_tree)
+    return rank_deltas(deltas), engine.nodes_skipped + skipped_sections
@@ -0,0 +1,177 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from .. import schemas
+from .diff_engine import LIST_KEY_FIELDS
+
+# Values that say nothing; any real value from another chunk replaces them
+EMPTY_VALUES = (None, "", "Unknown", "unknown", "N/A", "n/a", [], {})
+
+# Keys owned by the pipeline rather than the model
+SKIPPED_KEYS = ("metadata", "tables_and_schedules", "risk_score")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+# Shape conflicts between chunks resolve towards a list (a lone object where a list belongs is
+# the usual slip, and keeping the list keeps the other chunks' entries), then towards a dict
+_SLOT_PRIORITY = {"list": 2, "dict": 1, "value": 0}
+
+# Order of an item: (chunk index, position in its list)
+Order = Tuple[int, int]
+
+
+def normalize_key(value: Any) -> str:
+    """Case, punctuation and spacing insensitive key ("ACME Corp., Inc." == "acme corp inc")"""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return _NON_ALNUM.sub(" ", str(value).lower()).strip()
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Numeric value of 1250000, "1,250,000", "$1.25M"-style strings; None if there is none"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value).replace(",", ""))
+    return float(match.group(0)) if match else None
+
+
+@lru_cache(maxsize=None)
+def field_shapes() -> Dict[str, str]:
+    """Slot kind ("list" or "dict") the extraction schema gives each top-level field"""
+    shapes = {}
+    for name, prop in schemas.ContractExtraction.model_json_schema()["properties"].items():
+        if prop.get("type") == "array":
+            shapes[name] = "list"
+        elif prop.get("type") == "object" or "$ref" in prop:
+            shapes[name] = "dict"
+    return shapes
+
+
+def _is_empty(value: Any) -> bool:
+    return any(value is empty or (value == empty and type(value) is type(empty)) for empty in EMPTY_VALUES)
+
+
+def _item_key(item: Any) -> str:
+    """Identity of a list entry: its name-like field (plus due date), else its normalized content"""
+    if isinstance(item, dict):
+        for field in LIST_KEY_FIELDS:
+            value = item.get(field)
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool) and value != "":
+                return f"{field}:{normalize_key(value)}:{normalize_key(item.get('due_date', ''))}"
+    return normalize_key(item)
+
+
+def _richness(value: Any) -> int:
+    """How much a candidate says; the richer duplicate wins"""
+    if isinstance(value, dict):
+        return sum(1 for v in value.values() if not _is_empty(v))
+    return len(str(value))
+
+
+class ExtractionMerge:
+    """Streaming merge of chunk extractions.
+
+    Every field keeps a winner under a fixed rule, and each rule picks a
+    maximum under a total order that includes the chunk position. Folding is
+    therefore associative and commutative: chunk results can be added as they
+    arrive from concurrent workers, in any order, and the result is the same.
+    Each add is linear in the size of the chunk's extraction.
+
+    Rules:
+    - scalars (dates, currency, contract type, ...): first non-empty value in document order
+    - financial.total_value: the largest amount
+    - clauses: one per normalized name, the longest text wins
+    - lists (parties, deliverables, payment schedule, ...): one entry per normalized
+      identity key, the most complete duplicate wins; document order is kept
+    - a field that is a list in one chunk and a dict or scalar in another keeps the
+      shape the extraction schema gives it; below the top level the list wins
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.chunks = 0
+
+    def add(self, index: int, extraction: Dict[str, Any]) -> "ExtractionMerge":
+        """Fold in the extraction of chunk `index`"""
+        for key, value in extraction.items():
+            if key not in SKIPPED_KEYS:
+                self._fold(self.fields, key, value, (index, 0), (key,))
+        self.chunks += 1
+        return self
+
+    def update(self, other: "ExtractionMerge") -> "ExtractionMerge":
+        """Fold another partial merge into this one (`other` is consumed)"""
+        for key, slot in other.fields.items():
+            self.fields[key] = self._combine(self.fields.get(key), slot, field_shapes().get(key))
+        self.chunks += other.chunks
+        return self
+
+    # Slots: ("value", rank, value) | ("dict", {key: slot}) | ("list", {identity: ("value", rank, item)})
+    def _lift(self, value: Any, order: Order, path: Tuple[str, ...]):
+        if path == ("financial", "total_value"):
+            amount = parse_amount(value)
+            return ("value", (1, amount if amount is not None else float("-inf"), -order[0], -order[1]), value)
+        if path == ("clauses",) and isinstance(value, dict):
+            return ("dict", {
+                normalize_key(name): ("value", (len(str(clause)), -order[0], -i), (name, clause))
+                for i, (name, clause) in enumerate(value.items()) if not _is_empty(clause)
+            }, "clauses")
+        if isinstance(value, dict):
+            fields = {}
+            for key, child in value.items():
+                self._fold(fields, key, child, order, path + (key,))
+            return ("dict", fields)
+        if isinstance(value, list):
+            items = {}
+            for i, item in enumerate(value):
+                if _is_empty(item):
+                    continue
+                slot = ("value", (_richness(item), -order[0], -i), (order[0], i, item))
+                identity = _item_key(item)
+                items[identity] = self._combine(items.get(identity), slot)
+            return ("list", items)
+        # First meaningful value in document order
+        return ("value", (0, -order[0], -order[1]), value)
+
+    def _fold(self, fields: Dict[str, Any], key: str, value: Any, order: Order, path: Tuple[str, ...]):
+        if _is_empty(value):
+            return
+        shape = field_shapes().get(key) if len(path) == 1 else None
+        fields[key] = self._combine(fields.get(key), self._lift(value, order, path), shape)
+
+    def _combine(self, a, b, shape: Optional[str] = None):
+        """Merge two slots for one field; `shape` is the kind the schema expects there, if known"""
+        if a is None:
+            return b
+        if a[0] != b[0]:
+            # Malformed in one chunk: keep the expected shape, else the higher priority one
+            if shape in (a[0], b[0]):
+                return a if a[0] == shape else b
+            return a if _SLOT_PRIORITY[a[0]] > _SLOT_PRIORITY[b[0]] else b
+        if a[0] == "value":
+            return a if a[1] >= b[1] else b
+        # Dicts and lists: merge key by key into the larger side
+        small, large = (a, b) if len(a[1]) <= len(b[1]) else (b, a)
+        merged = large[1]
+        for key, slot in small[1].items():
+            merged[key] = self._combine(merged.get(key), slot)
+        return large
+
+    def _lower(self, slot) -> Any:
+        if slot[0] == "value":
+            return slot[2]
+        if slot[0] == "list":
+            # Restore document order: (chunk index, position)
+            entries = sorted((item_slot[2] for item_slot in slot[1].values()), key=lambda e: (e[0], e[1]))
+            return [item for _, _, item in entries]
+        if len(slot) > 2 and slot[2] == "clauses":
+            return dict(s[2] for s in slot[1].values())
+        return {key: self._lower(child) for key, child in slot[1].items()}
+
+    def result(self) -> Dict[str, Any]:
+        return {key: self._lower(slot) for key, slot in self.fields.items()}
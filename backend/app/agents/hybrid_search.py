@@ -0,0 +1,146 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .synced_ids import SyncedIds
+
+# Keeps section numbers (12.3), amounts (1,000,000) and dates (2024-01-01) as single terms
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.,/\-][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were will with "
+    "shall any such all".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+# Whole query in double quotes: the user wants those exact words
+_QUOTED = re.compile(r'^\s*"[^"]+"\s*$')
+# Section numbers, amounts, dates, reference codes (MSA-2024-017), emails: terms an embedding can't match exactly
+_IDENTIFIER = re.compile(r"(?:[§$€£#]\S*|\S*\d\S*|\S+@\S+)")
+
+# Words that only introduce an identifier ("section 12.3", "Schedule B-2")
+REFERENCE_WORDS = frozenset("section sections clause clauses article schedule exhibit annex appendix "
+                            "paragraph invoice po no. ref".split())
+
+
+def is_lexical_query(query: str) -> bool:
+    """Queries BM25 answers on its own, so hybrid search can skip the embedding call.
+
+    Quoted phrases, queries made only of identifiers (section numbers,
+    amounts, dates, reference codes) and single-term lookups such as a party
+    name. Anything worded as a question or description still gets vectors.
+    """
+    if _QUOTED.match(query):
+        return True
+    words = query.split()
+    identifiers = [word for word in words if _IDENTIFIER.fullmatch(word)]
+    if identifiers and all(word in identifiers or word.lower() in REFERENCE_WORDS for word in words):
+        return True
+    return len(tokenize(query)) == 1 and len(words) <= 2
+
+
+class BM25Index:
+    """Incremental in-memory BM25 inverted index over text chunks"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._doc_ids: List[int] = []
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        self._synced = SyncedIds()
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def pending(self) -> Tuple[int, List[int]]:
+        """(max_id, gap ids) for the next sync; see SyncedIds"""
+        with self._lock:
+            return self._synced.pending()
+
+    def add(self, docs: Iterable[Tuple[int, str]]):
+        """Index (doc_id, text) pairs.
+
+        Documents already indexed (two requests syncing at once read the same
+        rows) are skipped, so they don't skew term and document frequencies
+        or come back twice.
+        """
+        with self._lock:
+            added = set()
+            for doc_id, text in docs:
+                if not self._synced.is_new(doc_id) or doc_id in added:
+                    continue
+                added.add(doc_id)
+                terms = tokenize(text)
+                position = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._doc_lengths.append(len(terms))
+                self._total_length += len(terms)
+                for term, tf in Counter(terms).items():
+                    self._postings[term].append((position, tf))
+            self._synced.record(added)
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        """Return (doc_id, score) of the best matching documents"""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._doc_ids)
+            if not n_docs or not terms:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for position, tf in postings:
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[position] / avg_length)
+                    scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [(self._doc_ids[position], score) for position, score in ranked]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """Fuse several ranked id lists; ids ranked high by any retriever float to the top"""
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def rerank(query: str, candidates: Sequence[Tuple[int, str]], top_k: int = 10) -> List[Tuple[int, float]]:
+    """Cheap local rerank by query-term coverage, exact phrase match and term proximity"""
+    query_terms = tokenize(query)
+    if not query_terms:
+        return [(doc_id, 0.0) for doc_id, _ in candidates[:top_k]]
+    unique_terms = set(query_terms)
+    phrase = " ".join(query_terms)
+
+    scored = []
+    for order, (doc_id, text) in enumerate(candidates):
+        terms = tokenize(text)
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for i, term in enumerate(terms):
+            if term in unique_terms:
+                positions[term].append(i)
+        coverage = len(positions) / len(unique_terms)
+        exact = 1.0 if len(query_terms) > 1 and phrase in " ".join(terms) else 0.0
+        proximity = 0.0
+        if len(positions) > 1:
+            firsts = sorted(p[0] for p in positions.values())
+            proximity = len(positions) / (firsts[-1] - firsts[0] + 1)
+        # Small prior from the fused order breaks ties in favour of the retrievers
+        score = coverage + 0.5 * exact + 0.25 * proximity + 0.01 / (order + 1)
+        scored.append((doc_id, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
@@ -0,0 +1,75 @@
+import os
+import time
+from typing import Any, Dict
+
+from .. import metrics
+from .openai_client import chat_completion
+
+STRONG_MODEL = "gpt-4-turbo-preview"
+FAST_MODEL = "gpt-3.5-turbo-0125"
+
+# Pipeline stage -> (environment variable, default model)
+DEFAULT_ROUTES = {
+    "chunk_extraction": ("OPENAI_CHUNK_MODEL", FAST_MODEL),
+    "escalation": ("OPENAI_ESCALATION_MODEL", STRONG_MODEL),
+    "reconciliation": ("OPENAI_MERGE_MODEL", STRONG_MODEL),
+    "full_extraction": ("OPENAI_EXTRACTION_MODEL", STRONG_MODEL),
+    "comparison": ("OPENAI_COMPARISON_MODEL", STRONG_MODEL),
+    "rag_answer": ("OPENAI_ANSWER_MODEL", STRONG_MODEL),
+}
+
+
+class ModelRouter:
+    """Maps pipeline stages to models, configurable per stage through the environment"""
+
+    def __init__(self):
+        self.routes = {stage: os.getenv(env, default) for stage, (env, default) in DEFAULT_ROUTES.items()}
+        # Chunk results below this confidence are re-extracted with the escalation model
+        self.escalation_threshold = float(os.getenv("ROUTING_ESCALATION_THRESHOLD", "0.6"))
+
+    def model_for(self, stage: str) -> str:
+        return self.routes.get(stage, STRONG_MODEL)
+
+
+class UsageRecorder:
+    """Per-document accounting of model, latency and tokens for each stage"""
+
+    def __init__(self, router: "ModelRouter"):
+        self.router = router
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    async def complete(self, stage: str, **kwargs):
+        """Run a chat completion with the stage's model and record its cost"""
+        model = self.router.model_for(stage)
+        started = time.monotonic()
+        response = await chat_completion(model=model, **kwargs)
+        self.record(stage, model, time.monotonic() - started, getattr(response, "usage", None))
+        return response
+
+    def record(self, stage: str, model: str, latency: float, usage: Any = None):
+        entry = self.stages.setdefault(stage, {
+            "models": [], "calls": 0, "latency_seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+        })
+        if model not in entry["models"]:
+            entry["models"].append(model)
+        entry["calls"] += 1
+        entry["latency_seconds"] = round(entry["latency_seconds"] + latency, 3)
+        metrics.LLM_CALL_LATENCY.observe(latency, stage=stage, model=model)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            metrics.LLM_TOKENS.inc(prompt_tokens, stage=stage, model=model, type="prompt")
+            metrics.LLM_TOKENS.inc(completion_tokens, stage=stage, model=model, type="completion")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "total_calls": sum(s["calls"] for s in self.stages.values()),
+            "total_prompt_tokens": sum(s["prompt_tokens"] for s in self.stages.values()),
+            "total_completion_tokens": sum(s["completion_tokens"] for s in self.stages.values()),
+        }
+
+
+model_router = ModelRouter()
@@ -0,0 +1,271 @@
+"""OCR fallback for PDF pages without a text layer (scanned contracts).
+
+extract_text_from_pdf keeps PyPDF2's text for every page that has one and
+sends only the remaining pages here. Each of those pages is cut out as a
+single-page PDF and OCRed in a shared process pool, one page per task, so
+the digital pages of a mixed document are parsed while the scanned ones
+are being recognised and a scanned document uses every core.
+
+Results are cached by a hash of the page's embedded images (plus DPI and
+language): in memory, and in OCR_CACHE_DIR when set, which also shares
+them between workers. A page with an image PyPDF2 can't read is OCRed
+without caching rather than sharing a key with other pages. The upload check reads only the text layer; OCR runs
+in background processing, off the request path.
+
+Knobs: OCR_DPI (render resolution, default 300; 200 is faster, 400 helps
+small print), OCR_LANGUAGE (Tesseract languages, e.g. "eng+deu"),
+OCR_WORKERS (default: all cores), OCR_ENABLED=false to turn it off.
+
+Needs the optional `pytesseract` and `Pillow` packages and the tesseract
+binary (e.g. apt-get install tesseract-ocr); pages are rendered with
+`pypdfium2` when installed, otherwise the page's largest embedded image is
+used. Without them, pages with no text layer are left empty as before.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Optional
+
+import PyPDF2
+
+from .. import metrics
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:  # optional: no OCR fallback
+    pytesseract = None
+    Image = None
+
+try:
+    import pypdfium2
+except ImportError:  # optional: fall back to the page's embedded image
+    pypdfium2 = None
+
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() in ("1", "true", "yes")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR")
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "2048"))
+OCR_PAGE_TIMEOUT = float(os.getenv("OCR_PAGE_TIMEOUT", "120"))
+# Pages whose text layer has fewer characters than this are treated as scanned
+MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))
+
+OCR_PAGES = metrics.counter("ocr_pages_total", "Pages without a text layer by outcome (ocr, cached, failed)",
+                            ("result",))
+OCR_PAGE_SECONDS = metrics.histogram("ocr_page_seconds", "Render and OCR time per page, measured in the worker")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_available: Optional[bool] = None
+
+
+def _init_worker():
+    # One Tesseract thread per process; the pool already runs a page per core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Shared process pool, created on the first scanned page"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 2
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        return _pool
+
+
+def _discard_pool():
+    """A worker died (e.g. killed for memory); the next page starts a fresh pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def ocr_available() -> bool:
+    """OCR is enabled and pytesseract, Pillow and the tesseract binary are all present"""
+    global _available
+    if _available is None:
+        _available = False
+        if OCR_ENABLED and pytesseract is not None:
+            try:
+                pytesseract.get_tesseract_version()
+                _available = True
+            except Exception as e:
+                print(f"OCR fallback disabled, tesseract not usable: {e}")
+    return _available
+
+
+def _image_streams(resources, depth: int = 0):
+    """Image XObjects of a page, including ones wrapped in form XObjects (as some scanners do)"""
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is None:
+        return
+    xobjects = xobjects.get_object()
+    for name in sorted(xobjects):
+        xobject = xobjects[name].get_object()
+        if xobject.get("/Subtype") == "/Image":
+            yield xobject
+        elif xobject.get("/Subtype") == "/Form" and depth < 3:
+            yield from _image_streams(xobject.get("/Resources"), depth + 1)
+
+
+def _image_bytes(image) -> Optional[bytes]:
+    """An image stream's data through PyPDF2's public API; None if its filter can't be read"""
+    try:
+        data = image.get_data()
+    except Exception:
+        return None
+    if isinstance(data, str):
+        data = data.encode("latin-1", "replace")
+    return data or None
+
+
+def page_image_hash(page, dpi: int = OCR_DPI, language: str = OCR_LANGUAGE, images=None) -> Optional[str]:
+    """Cache key for a page from its image streams; None if one of them can't be read.
+
+    `images` are the page's image streams when the caller already has them.
+    """
+    if images is None:
+        images = list(_image_streams(page.get("/Resources")))
+    digest = hashlib.sha256(f"{dpi}:{language}:{page.mediabox}:{page.get('/Rotate', 0)}".encode())
+    for image in images:
+        data = _image_bytes(image)
+        if data is None:
+            return None
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def single_page_pdf(page) -> bytes:
+    writer = PyPDF2.PdfWriter()
+    writer.add_page(page)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _page_image(page_pdf: bytes, dpi: int):
+    if pypdfium2 is not None:
+        document = pypdfium2.PdfDocument(page_pdf)
+        try:
+            return document[0].render(scale=dpi / 72).to_pil()
+        finally:
+            document.close()
+    # No renderer: a scanned page is normally one full-page image
+    images = PyPDF2.PdfReader(BytesIO(page_pdf)).pages[0].images
+    if not images:
+        return None
+    return Image.open(BytesIO(max(images, key=lambda image: len(image.data)).data))
+
+
+def ocr_page(page_pdf: bytes, dpi: int, language: str):
+    """Worker entry point: (text, seconds) for one single-page PDF"""
+    started = time.perf_counter()
+    try:
+        image = _page_image(page_pdf, dpi)
+        text = pytesseract.image_to_string(image, lang=language) if image is not None else ""
+    except Exception as e:
+        # pytesseract's exceptions don't survive pickling back to the parent, which breaks the whole pool
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return text, time.perf_counter() - started
+
+
+class OCRCache:
+    """Recognised text by page hash: in-process LRU, plus one file per page under `directory` when set"""
+
+    def __init__(self, max_entries: int = OCR_CACHE_SIZE, directory: Optional[str] = OCR_CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, key + ".txt"), encoding="utf-8") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                return None
+            self._remember(key, text)
+            return text
+        return None
+
+    def set(self, key: str, text: str):
+        self._remember(key, text)
+        if self.directory:
+            # Write then rename so a concurrent reader never sees half a file
+            path = os.path.join(self.directory, key + ".txt")
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temporary, path)
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+ocr_cache = OCRCache()
+
+
+class PageOCR:
+    """OCR for the scanned pages of one document: submit pages as they are found, collect at the end"""
+
+    def __init__(self, dpi: int = OCR_DPI, language: str = OCR_LANGUAGE, cache: OCRCache = ocr_cache):
+        self.dpi = dpi
+        self.language = language
+        self.cache = cache
+        self.results: Dict[int, str] = {}
+        self._pending: Dict[int, tuple] = {}
+
+    def submit(self, page_num: int, page):
+        images = list(_image_streams(page.get("/Resources")))
+        if not images:
+            # Blank or vector-only page: nothing a scan could have put there
+            return
+        # An image that can't be read still renders; such a page is OCRed without caching
+        key = page_image_hash(page, self.dpi, self.language, images)
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            OCR_PAGES.inc(result="cached")
+            self.results[page_num] = cached
+            return
+        future: Future = _get_pool().submit(ocr_page, single_page_pdf(page), self.dpi, self.language)
+        self._pending[page_num] = (key, future)
+
+    def collect(self) -> Dict[int, str]:
+        """Recognised text by page number; failed pages are left out"""
+        for page_num, (key, future) in self._pending.items():
+            try:
+                text, seconds = future.result(timeout=OCR_PAGE_TIMEOUT)
+            except Exception as e:
+                OCR_PAGES.inc(result="failed")
+                print(f"OCR failed for page {page_num + 1}: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    _discard_pool()
+                continue
+            OCR_PAGE_SECONDS.observe(seconds)
+            OCR_PAGES.inc(result="ocr")
+            if key is not None:
+                self.cache.set(key, text)
+            self.results[page_num] = text
+        self._pending.clear()
+        return self.results
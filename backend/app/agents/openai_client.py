@@ -0,0 +1,59 @@
+import asyncio
+import os
+import weakref
+
+from .rate_limiter import estimate_tokens, get_limiter
+
+# One pooled client per event loop: httpx connections cannot be shared across loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+
+def _build_client() -> "AsyncOpenAI":
+    # The openai package takes ~0.3s to import; pay for it on the first call rather than at startup
+    import httpx
+    from openai import AsyncOpenAI
+
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "50")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+    )
+    timeout = httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT", "120")), connect=10.0)
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=0,  # Retries are owned by the rate limiter
+        http_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+    )
+
+
+def get_client() -> "AsyncOpenAI":
+    """Shared AsyncOpenAI client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _build_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close the running loop's client and its connection pool"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+async def chat_completion(**kwargs):
+    """chat.completions.create through the model's shared chat rate limiter"""
+    prompt_text = [m.get("content") for m in kwargs.get("messages", [])]
+    estimated = estimate_tokens(*prompt_text, completion_tokens=kwargs.get("max_tokens") or 1000)
+    limiter = get_limiter("chat", kwargs.get("model", ""))
+    return await limiter.call(get_client().chat.completions.create, estimated_tokens=estimated, **kwargs)
+
+
+async def create_embedding(**kwargs):
+    """embeddings.create through the model's shared embeddings rate limiter"""
+    texts = kwargs.get("input")
+    texts = [texts] if isinstance(texts, str) else texts
+    estimated = estimate_tokens(*texts)
+    limiter = get_limiter("embeddings", kwargs.get("model", ""))
+    return await limiter.call(get_client().embeddings.create, estimated_tokens=estimated, **kwargs)
@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .diff_engine import diff_extractions, normalize_value
+
+# Below this many targets the process pool costs more than it saves
+MIN_PARALLEL_TARGETS = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+_LIST_LABEL = re.compile(r"\[[^\]]*\]")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Shared process pool, created on first batch comparison"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv("COMPARE_WORKERS", "0")) or os.cpu_count() or 2
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _diff_one(baseline: Dict[str, Any], baseline_fingerprints: Optional[Dict[str, str]],
+              target_id: int, target: Dict[str, Any],
+              target_fingerprints: Optional[Dict[str, str]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Worker entry point: diff one target against the baseline"""
+    deltas, _ = diff_extractions(baseline, target,
+                                 old_fingerprints=baseline_fingerprints,
+                                 new_fingerprints=target_fingerprints)
+    return target_id, deltas
+
+
+def field_pattern(field_name: str) -> str:
+    """Collapse list item labels so deviations on different items of one list aggregate together"""
+    return _LIST_LABEL.sub("[]", field_name)
+
+
+class DeviationTally:
+    """Running per-field-path count of contracts that deviate from the baseline"""
+
+    def __init__(self):
+        self.by_field: Counter = Counter()
+        self.by_change_type: Counter = Counter()
+        self.contracts = 0
+        self.identical = 0
+
+    def add(self, deltas: List[Dict[str, Any]]):
+        self.contracts += 1
+        if not deltas:
+            self.identical += 1
+        # Count each path once per contract, so frequency reads as "share of contracts"
+        for path in {field_pattern(d["field_name"]) for d in deltas}:
+            self.by_field[path] += 1
+        for delta in deltas:
+            self.by_change_type[delta["change_type"]] += 1
+
+    def summary(self, top_n: int = 50) -> Dict[str, Any]:
+        return {
+            "contracts_compared": self.contracts,
+            "identical_to_baseline": self.identical,
+            "changes_by_type": dict(self.by_change_type),
+            "deviation_frequency": [
+                {
+                    "field_path": path,
+                    "contracts": count,
+                    "frequency": round(count / self.contracts, 4) if self.contracts else 0.0,
+                }
+                for path, count in self.by_field.most_common(top_n)
+            ],
+        }
+
+
+def compare_portfolio(baseline: Dict[str, Any], targets: List[Tuple[int, Dict[str, Any], Optional[Dict[str, str]]]],
+                      baseline_fingerprints: Optional[Dict[str, str]] = None,
+                      max_deltas: int = 50, tally: Optional[DeviationTally] = None) -> Iterator[Dict[str, Any]]:
+    """Diff the baseline against every (id, extraction, fingerprints) target.
+
+    Yields one result per target as soon as it is ready, in completion order.
+    All deltas (not just the first max_deltas) are added to the tally if given.
+    """
+    baseline = normalize_value(baseline)
+    if len(targets) < MIN_PARALLEL_TARGETS:
+        results = (_diff_one(baseline, baseline_fingerprints, target_id, normalize_value(target), fingerprints)
+                   for target_id, target, fingerprints in targets)
+    else:
+        pool = _get_pool()
+        futures = [
+            pool.submit(_diff_one, baseline, baseline_fingerprints, target_id, normalize_value(target), fingerprints)
+            for target_id, target, fingerprints in targets
+        ]
+        results = (future.result() for future in as_completed(futures))
+
+    for target_id, deltas in results:
+        if tally is not None:
+            tally.add(deltas)
+        yield {
+            "contract_id": target_id,
+            "total_changes": len(deltas),
+            "deltas": deltas[:max_deltas],
+        }
@@ -0,0 +1,59 @@
+from functools import lru_cache
+from typing import Any, Dict
+
+from .. import schemas
+
+_SCALARS = {"string": "str", "integer": "int", "number": "num", "boolean": "bool"}
+
+
+def _render(node: Dict[str, Any], defs: Dict[str, Any]) -> str:
+    """Render a JSON-schema node in a compact TypeScript-like notation"""
+    if "$ref" in node:
+        return _render(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    if node.get("format") in ("date", "date-time"):
+        return "date"
+    if "anyOf" in node:
+        options = [o for o in node["anyOf"] if o.get("type") != "null"]
+        return "|".join(_render(o, defs) for o in options) or "null"
+
+    kind = node.get("type")
+    if kind == "array":
+        return f"[{_render(node.get('items', {}), defs)}]"
+    if kind == "object" or "properties" in node:
+        properties = node.get("properties")
+        if properties:
+            required = set(node.get("required", []))
+            fields = ",".join(
+                f"{name}{'' if name in required else '?'}:{_render(prop, defs)}"
+                for name, prop in properties.items()
+            )
+            extra = node.get("additionalProperties")
+            return "{" + fields + (",...}" if extra else "}")
+        extra = node.get("additionalProperties")
+        if isinstance(extra, dict) and extra:
+            return f"map<{_render(extra, defs)}>"
+        return "map<any>"
+    return _SCALARS.get(kind, "any")
+
+
+@lru_cache(maxsize=None)
+def compact_schema(model: type = schemas.ContractExtraction) -> str:
+    """Compact schema string for a pydantic model (? = optional, [T] = list, map<T> = free-form keys)"""
+    schema = model.model_json_schema()
+    return _render(schema, schema.get("$defs", {}))
+
+
+@lru_cache(maxsize=None)
+def extraction_system_prompt() -> str:
+    """Byte-stable system prompt, so every extraction request shares the same cacheable prefix"""
+    return f"""You are an Enterprise Contract Intelligence Agent. Extract ALL information from the contract text.
+
+Rules:
+- Extract every section, clause, term, table (payment schedules, deliverables, milestones, reporting requirements) and attachment. Add new keys for anything that fits no category.
+- Parties: FULL legal names. Signatories: name, title, email, signature date.
+- Dates as YYYY-MM-DD. Money as a number plus a 3-letter currency code.
+- Preserve the original wording of complex clauses. Don't omit any information.
+- confidence_score is your confidence (0-1) in the extraction as a whole.
+
+Return ONLY valid JSON matching this schema (?: optional, [T]: list, map<T>: object with free-form keys, ...: extra keys allowed):
+{compact_schema()}"""
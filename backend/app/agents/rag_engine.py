@@ -1,30 +1,26 @@
-import openai
-import os
-import json
+import asyncio
 from typing import List, Dict, Any
-from openai import OpenAI
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import numpy as np
+
+from .openai_client import chat_completion, create_embedding
+from .model_router import model_router
 
 class RAGEngine:
     def __init__(self):
         self.embedding_model = "text-embedding-3-small"
-        self.gpt_model = "gpt-4-turbo-preview"
+        self.gpt_model = model_router.model_for("rag_answer")
     
-    def create_embeddings(self, text: str, chunk_size: int = 1000) -> List[Dict[str, Any]]:
+    async def create_embeddings(self, text: str, chunk_size: int = 1000) -> List[Dict[str, Any]]:
         """Create embeddings for text chunks"""
         chunks = self._chunk_text(text, chunk_size)
+        vectors = await self.embed_texts(chunks)
         embeddings = []
         
-        for i, chunk in enumerate(chunks):
-            response = client.embeddings.create(
-                model=self.embedding_model,
-                input=chunk
-            )
-            
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors)):
             embedding_data = {
                 "text_chunk": chunk,
-                "embedding": response.data[0].embedding,
+                "embedding": vector,
                 "metadata": {
                     "chunk_index": i,
                     "chunk_size": len(chunk)
@@ -34,23 +30,49 @@ class RAGEngine:
         
         return embeddings
     
-    def search_similar(self, query: str, embeddings: List[List[float]], top_k: int = 5) -> List[int]:
-        """Search for similar embeddings"""
-        query_embedding = client.embeddings.create(
+    async def embed_texts(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+        """Embed many texts with batched API calls, sent concurrently"""
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            response = await create_embedding(
+                model=self.embedding_model,
+                input=batch
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        
+        batches = await asyncio.gather(*[
+            embed_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ])
+        return [vector for batch in batches for vector in batch]
+    
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a single search query"""
+        response = await create_embedding(
             model=self.embedding_model,
             input=query
-        ).data[0].embedding
-        
-        # Simple cosine similarity (for production, use vector DB)
-        similarities = []
-        for i, emb in enumerate(embeddings):
-            sim = self._cosine_similarity(query_embedding, emb)
-            similarities.append((i, sim))
-        
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return [idx for idx, _ in similarities[:top_k]]
+        )
+        return response.data[0].embedding
+    
+    def rank_by_vector(self, query_embedding: List[float], embeddings: List[List[float]], top_k: int = 5) -> List[int]:
+        """Rank stored embeddings by cosine similarity to a query embedding"""
+        # Simple cosine similarity (for production, use vector DB); one matrix product instead of a loop per row
+        if not embeddings:
+            return []
+        matrix = np.asarray(embeddings, dtype=np.float64)
+        query = np.asarray(query_embedding, dtype=np.float64)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = matrix @ query / np.where(norms == 0, 1, norms)
+        # Stable sort keeps the original order among equal scores, as the list sort did
+        order = np.argsort(-similarities, kind="stable")
+        return order[:top_k].tolist()
+    
+    async def search_similar(self, query: str, embeddings: List[List[float]], top_k: int = 5) -> List[int]:
+        """Search for similar embeddings"""
+        query_embedding = await self.embed_query(query)
+        # Cosine ranking is CPU work; keep it off the event loop
+        return await asyncio.to_thread(self.rank_by_vector, query_embedding, embeddings, top_k)
     
-    def answer_query(self, query: str, context: str) -> str:
+    async def answer_query(self, query: str, context: str) -> str:
         """Answer query based on context"""
         prompt = f"""Based on the following contract context, answer the query.
         
@@ -61,7 +83,7 @@ class RAGEngine:
         
         Answer:"""
         
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model=self.gpt_model,
             messages=[
                 {"role": "system", "content": "You are a contract analysis assistant."},
@@ -95,7 +117,6 @@ class RAGEngine:
     
     def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
-        import numpy as np
         a = np.array(a)
         b = np.array(b)
         return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
\ No newline at end of file
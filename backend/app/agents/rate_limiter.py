@@ -0,0 +1,261 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .. import metrics
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """Errors worth retrying: throttling, timeouts, dropped connections and 5xx.
+
+    Resolved on first use so importing the app doesn't import openai.
+    """
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+def _worker_share(value: float) -> float:
+    """Split an account-wide quota evenly across the uvicorn/gunicorn workers"""
+    workers = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+    return value / workers
+
+
+def _set_done(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers are told how long to wait instead of blocking"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens (possibly going into debt); return seconds to wait before using them"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+    def adjust(self, amount: float):
+        """Correct a reservation once the real cost is known (positive refunds tokens)"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Client-side limiter for one OpenAI model.
+
+    Requests and tokens are metered by token buckets sized to the per-minute
+    quota. Concurrency follows AIMD: it grows by one slot per window of
+    healthy responses and halves on 429s or slow responses. Failed calls are
+    retried with full-jitter exponential backoff, honouring Retry-After.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float,
+                 max_concurrency: int = 16, min_concurrency: int = 1, max_retries: int = 6,
+                 latency_target: float = 30.0, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max(min_concurrency, max_concurrency // 2))
+        self.max_retries = max_retries
+        self.latency_target = latency_target
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        # (loop, future) of callers waiting for a slot; callers may run on different event loops
+        self._waiters: "deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = deque()
+        self.stats: Dict[str, float] = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0, "tokens": 0}
+
+    async def _acquire_slot(self):
+        """Wait for a concurrency slot; woken by a release (or a raised limit) rather than by polling"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.concurrency):
+                    self.in_flight += 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    else:
+                        # Woken but gone: pass the wake-up on
+                        self._wake_waiters()
+                raise
+
+    def _wake_waiters(self):
+        """Wake as many waiters as there are free slots; the caller holds the lock"""
+        free = int(self.concurrency) - self.in_flight
+        while free > 0 and self._waiters:
+            loop, future = self._waiters.popleft()
+            loop.call_soon_threadsafe(_set_done, future)
+            free -= 1
+
+    def _release_slot(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    def _on_success(self, latency: float):
+        with self._lock:
+            if latency > self.latency_target:
+                self.concurrency = max(self.min_concurrency, self.concurrency * 0.9)
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+                self._wake_waiters()
+
+    def _on_throttle(self):
+        with self._lock:
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            self.stats["throttled"] += 1
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, estimated_tokens: int = 0, **kwargs) -> Any:
+        """Run an OpenAI call under the rate limits, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            if wait:
+                await asyncio.sleep(wait)
+
+            await self._acquire_slot()
+            started = time.monotonic()
+            try:
+                response = await fn(*args, **kwargs)
+            except retryable_errors() as e:
+                self._release_slot()
+                metrics.OPENAI_ATTEMPT_LATENCY.observe(time.monotonic() - started, kind=self.name, outcome="error")
+                self.tokens.adjust(estimated_tokens)  # Nothing was consumed; the retry reserves again
+                if isinstance(e, retryable_errors()[0]):  # openai.RateLimitError
+                    self._on_throttle()
+                if attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    metrics.OPENAI_FAILURES.inc(kind=self.name)
+                    raise
+                self.stats["retries"] += 1
+                metrics.OPENAI_RETRIES.inc(kind=self.name, error=type(e).__name__)
+                delay = self._backoff(attempt, e)
+                print(f"[{self.name}] {type(e).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self._release_slot()
+                self.stats["failures"] += 1
+                metrics.OPENAI_FAILURES.inc(kind=self.name)
+                raise
+
+            self._release_slot()
+            latency = time.monotonic() - started
+            self._on_success(latency)
+            metrics.OPENAI_ATTEMPT_LATENCY.observe(latency, kind=self.name, outcome="ok")
+            self.stats["calls"] += 1
+
+            # Settle the token reservation against real usage
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None) if usage is not None else None
+            if used is not None:
+                self.tokens.adjust(estimated_tokens - used)
+                self.stats["tokens"] += used
+                metrics.OPENAI_TOKENS.inc(used, kind=self.name)
+            return response
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _model_setting(prefix: str, setting: str, model: str, default: str) -> str:
+    """A per-model override such as OPENAI_RPM_GPT_4O_MINI, else the family-wide OPENAI_RPM"""
+    model_key = re.sub(r"[^A-Z0-9]+", "_", model.upper()).strip("_")
+    return os.getenv(f"{prefix}_{setting}_{model_key}") or os.getenv(f"{prefix}_{setting}", default)
+
+
+def get_limiter(kind: str, model: str) -> RateLimiter:
+    """Shared limiter for "chat" or "embeddings" requests to one model, sized from the environment.
+
+    OpenAI's RPM/TPM quotas are per model, so each model gets its own
+    buckets and concurrency: escalations to the strong model don't spend
+    the fast model's budget. Limits come from OPENAI_RPM_<MODEL> (model name
+    upper-cased, punctuation as "_"), falling back to OPENAI_RPM; likewise
+    TPM and MAX_CONCURRENCY, and OPENAI_EMBEDDING_* for embeddings.
+
+    Across processes the quota is split statically: every worker takes
+    1/WEB_CONCURRENCY of it, without coordinating at run time.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get((kind, model))
+        if limiter is None:
+            prefix = "OPENAI" if kind == "chat" else "OPENAI_EMBEDDING"
+            default_rpm, default_tpm = ("500", "300000") if kind == "chat" else ("3000", "1000000")
+            limiter = RateLimiter(
+                name=f"{kind}:{model}",
+                requests_per_minute=_worker_share(float(_model_setting(prefix, "RPM", model, default_rpm))),
+                tokens_per_minute=_worker_share(float(_model_setting(prefix, "TPM", model, default_tpm))),
+                max_concurrency=int(_model_setting(prefix, "MAX_CONCURRENCY", model, "16")),
+                max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "6")),
+            )
+            _limiters[(kind, model)] = limiter
+        return limiter
+
+
+def _limiter_state():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    state = {}
+    for limiter in limiters:
+        state[(limiter.name, "concurrency_limit")] = round(limiter.concurrency, 2)
+        state[(limiter.name, "in_flight")] = limiter.in_flight
+    return state
+
+
+metrics.gauge("openai_limiter", "Current AIMD concurrency limit and requests in flight per limiter",
+              ("kind", "value"), collect=_limiter_state)
+
+
+def estimate_tokens(*texts: Optional[str], completion_tokens: int = 0) -> int:
+    """Rough token estimate (1 token ~ 4 characters) plus the completion budget"""
+    return sum(len(t or "") for t in texts) // 4 + completion_tokens
@@ -0,0 +1,110 @@
+import re
+from collections import Counter
+from typing import List, Tuple
+
+# extract_text_from_pdf separates pages with a form feed
+PAGE_BREAK = "\f"
+
+# Lines inspected at the top and bottom of each page when looking for headers/footers
+EDGE_LINES = 3
+
+_DIGITS = re.compile(r"\d+")
+_WORD = re.compile(r"[A-Za-z]{2,}")
+# "1.2 Payment Terms ........ 14", "Exhibit A<tab>32", "Scope of Work    7"
+_TOC_LINE = re.compile(r"(?:\.{3,}|…|\s{2,}|\t)\s*\d{1,4}\s*$")
+_BLANK_PAGE = re.compile(r"intentionally\s+(?:left\s+)?blank|\[reserved\]|to\s+be\s+attached", re.IGNORECASE)
+
+
+def _edge_key(line: str) -> str:
+    """Page numbers and dates differ from page to page; compare header/footer lines without digits"""
+    return _DIGITS.sub("#", line.strip().lower())
+
+
+def strip_page_furniture(text: str, min_pages: int = 3, min_share: float = 0.5) -> Tuple[str, int]:
+    """Remove header/footer lines repeated at the top or bottom of most pages.
+
+    Returns the cleaned text and the number of lines removed. Text without
+    page breaks, or with fewer than `min_pages` pages, is returned unchanged.
+    """
+    pages = text.split(PAGE_BREAK)
+    if len(pages) < min_pages:
+        return text, 0
+
+    page_lines = [page.split("\n") for page in pages]
+    edges = []
+    for lines in page_lines:
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        edges.append(set(filled[:EDGE_LINES] + filled[-EDGE_LINES:]))
+
+    counts = Counter()
+    for lines, edge in zip(page_lines, edges):
+        counts.update({_edge_key(lines[i]) for i in edge})
+    threshold = max(min_pages, len(pages) * min_share)
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return text, 0
+
+    removed = 0
+    cleaned_pages = []
+    for lines, edge in zip(page_lines, edges):
+        kept = []
+        for i, line in enumerate(lines):
+            if i in edge and _edge_key(line) in repeated:
+                removed += 1
+                continue
+            kept.append(line)
+        cleaned_pages.append("\n".join(kept))
+    return PAGE_BREAK.join(cleaned_pages), removed
+
+
+def word_count(text: str) -> int:
+    return len(_WORD.findall(text))
+
+
+def is_table_of_contents(text: str, min_entries: int = 5, min_share: float = 0.6) -> bool:
+    """Most lines are headings followed by a page number"""
+    lines = [line for line in text.split("\n") if line.strip()]
+    entries = sum(1 for line in lines if _TOC_LINE.search(line))
+    if entries < min_entries:
+        return False
+    share = entries / len(lines)
+    if "table of contents" in text.lower():
+        return share >= min_share * 0.66
+    return share >= min_share
+
+
+def is_blank_page(text: str, max_words: int = 25) -> bool:
+    """Next to no prose: empty exhibits, separator pages, "intentionally left blank" placeholders"""
+    words = word_count(text)
+    return words < max_words or (words < 60 and bool(_BLANK_PAGE.search(text)))
+
+
+def merge_small_chunks(chunks: List[Tuple[str, bool]], max_chars: int) -> Tuple[List[str], int]:
+    """Fold chunks flagged as mergeable into a neighbour while the result stays under max_chars.
+
+    A mergeable chunk joins the previous chunk when it fits, otherwise it is
+    carried forward and prepended to the next one. Returns the chunks and the
+    number of merges performed.
+    """
+    result: List[str] = []
+    carry = None
+    merged = 0
+    for chunk, mergeable in chunks:
+        if carry is not None:
+            if len(carry) + len(chunk) + 2 <= max_chars:
+                chunk = carry + "\n\n" + chunk
+                merged += 1
+            else:
+                result.append(carry)
+            carry = None
+        if mergeable:
+            if result and len(result[-1]) + len(chunk) + 2 <= max_chars:
+                result[-1] = result[-1] + "\n\n" + chunk
+                merged += 1
+            else:
+                carry = chunk
+            continue
+        result.append(chunk)
+    if carry is not None:
+        result.append(carry)
+    return result, merged
@@ -0,0 +1,208 @@
+"""Contract risk scoring from rules declared as data.
+
+A rule set is a JSON-style dict with a version and a list of rules. Each
+rule tests one field of a contract record and, where it matches, adds its
+weight to the score and/or reports a risk factor. Scoring is column-wise:
+each field is converted to a numpy array once per batch and every rule is
+a vectorized comparison over it, so one pass scores a single extraction at
+ingest or thousands of stored contracts in a re-score
+(app.risk_rescore).
+
+Records are flat mappings with the Contract column names (auto_renewal,
+total_value, expiration_date, termination_date, risk_indicators,
+clauses); record_from_extraction builds one from an extraction. Set
+RISK_RULES_PATH to a JSON file to replace DEFAULT_RULES.
+
+Rule ops:
+    truthy          field is truthy ("risk_indicators.unlimited_liability" reads a JSON key)
+    gt              numeric field > value
+    days_until_lt   date field is less than `value` days away (or already past)
+    clause_terms    weight counts once per clause whose name contains one of `terms`
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+RULES_PATH = os.getenv("RISK_RULES_PATH")
+
+OPS = ("truthy", "gt", "days_until_lt", "clause_terms")
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "version": "1",
+    "max_score": 1.0,
+    "rules": [
+        {"id": "auto_renewal", "op": "truthy", "field": "auto_renewal", "weight": 0.0,
+         "factor": {"factor": "Auto Renewal", "severity": "medium",
+                    "mitigation": "Set calendar reminder before renewal period", "confidence": 0.9}},
+        {"id": "unlimited_liability", "op": "truthy", "field": "risk_indicators.unlimited_liability", "weight": 0.0,
+         "factor": {"factor": "Unlimited Liability", "severity": "high",
+                    "mitigation": "Negotiate liability cap", "confidence": 0.8}},
+        {"id": "penalty_clauses", "op": "truthy", "field": "risk_indicators.penalty_clauses", "weight": 0.0,
+         "factor": {"factor": "Penalty Clauses", "severity": "medium",
+                    "mitigation": "Review penalty terms", "confidence": 0.7}},
+        {"id": "high_value", "op": "gt", "field": "total_value", "value": 1000000, "weight": 0.15,
+         "factor": {"factor": "High Contract Value", "severity": "medium",
+                    "mitigation": "Additional review required", "confidence": 1.0}},
+        {"id": "very_high_value", "op": "gt", "field": "total_value", "value": 5000000, "weight": 0.0,
+         "factor": {"factor": "High Contract Value", "severity": "high",
+                    "mitigation": "Additional review required", "confidence": 1.0}},
+        {"id": "expiring_soon", "op": "days_until_lt", "field": "expiration_date", "value": 90, "weight": 0.2,
+         "factor": {"factor": "Contract Expiring Soon", "severity": "medium",
+                    "mitigation": "Initiate renewal process", "confidence": 1.0}},
+        {"id": "expiring_very_soon", "op": "days_until_lt", "field": "expiration_date", "value": 30, "weight": 0.3,
+         "factor": {"factor": "Contract Expiring Soon", "severity": "high",
+                    "mitigation": "Initiate renewal process", "confidence": 1.0}},
+        {"id": "risk_clauses", "op": "clause_terms", "field": "clauses", "weight": 0.1,
+         "terms": ["indemnification", "liability", "termination", "penalty"]},
+    ],
+}
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool) or value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        digits = "".join(filter(str.isdigit, value))
+        return float(digits) if digits else np.nan
+    return np.nan
+
+
+def _to_timestamp(value: Any) -> float:
+    if isinstance(value, str) and value:
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return np.nan
+    if isinstance(value, datetime):
+        # Stored dates are naive; compare extracted ones on the same footing
+        return value.replace(tzinfo=None).timestamp()
+    return np.nan
+
+
+def _clause_names(value: Any) -> List[str]:
+    if isinstance(value, dict):
+        return [str(name).lower() for name in value]
+    if isinstance(value, list):
+        return [str(name).lower() for name in value]
+    return []
+
+
+def record_from_extraction(extraction: Dict[str, Any]) -> Dict[str, Any]:
+    """Score input for an extraction, shaped like a stored contract row"""
+    risk_indicators = extraction.get("risk_indicators") or {}
+    dates = extraction.get("dates") or {}
+    return {
+        "auto_renewal": risk_indicators.get("auto_renewal"),
+        "total_value": (extraction.get("financial") or {}).get("total_value"),
+        "expiration_date": dates.get("expiration_date"),
+        "termination_date": dates.get("termination_date"),
+        "risk_indicators": risk_indicators,
+        "clauses": extraction.get("clauses") or {},
+    }
+
+
+def indicators_from_factors(factors: Any, auto_renewal: Any = None) -> Dict[str, bool]:
+    """risk_indicators for a contract stored before they were kept, read back from its risk factors.
+
+    The factors were produced by the version 1 rules, so each indicator rule
+    there maps to the factor it reported.
+    """
+    names = {factor.get("factor") for factor in factors or [] if isinstance(factor, dict)}
+    indicators = {"auto_renewal": bool(auto_renewal)}
+    for rule in DEFAULT_RULES["rules"]:
+        column, _, key = rule["field"].partition(".")
+        if column == "risk_indicators" and key and rule.get("factor"):
+            indicators[key] = rule["factor"]["factor"] in names
+    return indicators
+
+
+class RiskRules:
+    def __init__(self, spec: Dict[str, Any]):
+        self.version = str(spec["version"])
+        self.max_score = float(spec.get("max_score", 1.0))
+        self.rules = list(spec["rules"])
+        for rule in self.rules:
+            if rule.get("op") not in OPS:
+                raise ValueError(f"Risk rule {rule.get('id')!r}: unknown op {rule.get('op')!r}")
+        self.spec = spec
+
+    @property
+    def columns(self) -> List[str]:
+        """Contract columns the rules read"""
+        return sorted({rule["field"].split(".", 1)[0] for rule in self.rules})
+
+    def _values(self, records: Sequence[Mapping[str, Any]], field: str) -> List[Any]:
+        column, _, key = field.partition(".")
+        values = [record.get(column) for record in records]
+        if key:
+            values = [value.get(key) if isinstance(value, dict) else None for value in values]
+        return values
+
+    def _array(self, records, rule, now_ts: float, cache: Dict) -> np.ndarray:
+        """Per-record match (bool) or match count (clause_terms) for a rule"""
+        op, field = rule["op"], rule["field"]
+        if op == "clause_terms":
+            terms = tuple(term.lower() for term in rule["terms"])
+            return np.fromiter(
+                (sum(any(term in name for term in terms) for name in _clause_names(value))
+                 for value in self._values(records, field)),
+                dtype=np.float64, count=len(records))
+        if op == "truthy":
+            return np.fromiter((bool(value) for value in self._values(records, field)),
+                               dtype=bool, count=len(records))
+        # Converted columns are shared by every rule on the same field
+        if (op, field) not in cache:
+            convert = _to_float if op == "gt" else _to_timestamp
+            column = np.fromiter((convert(value) for value in self._values(records, field)),
+                                 dtype=np.float64, count=len(records))
+            if op == "days_until_lt":
+                column = np.floor((column - now_ts) / 86400.0)
+            cache[(op, field)] = column
+        column = cache[(op, field)]
+        # NaN (missing) compares False
+        return column > rule["value"] if op == "gt" else column < rule["value"]
+
+    def evaluate(self, records: Sequence[Mapping[str, Any]],
+                 now: Optional[datetime] = None) -> Tuple[np.ndarray, List[List[Dict[str, Any]]]]:
+        """(scores, risk factors per record)"""
+        now_ts = (now or datetime.now()).timestamp()
+        scores = np.zeros(len(records))
+        factors: List[List[Dict[str, Any]]] = [[] for _ in records]
+        cache: Dict = {}
+        for rule in self.rules:
+            matched = self._array(records, rule, now_ts, cache)
+            weight = float(rule.get("weight", 0.0))
+            if weight:
+                scores += weight * matched
+            if rule.get("factor"):
+                for index in np.flatnonzero(matched):
+                    _add_factor(factors[index], rule["factor"])
+        return np.round(np.minimum(scores, self.max_score), 4), factors
+
+    def score_extraction(self, extraction: Dict[str, Any],
+                         now: Optional[datetime] = None) -> Tuple[float, List[Dict[str, Any]]]:
+        scores, factors = self.evaluate([record_from_extraction(extraction)], now)
+        return float(scores[0]), factors[0]
+
+
+def _add_factor(factors: List[Dict[str, Any]], factor: Dict[str, Any]):
+    """Several rules may report the same factor (e.g. value thresholds); the most severe one is kept"""
+    for index, existing in enumerate(factors):
+        if existing["factor"] == factor["factor"]:
+            if SEVERITY_RANK.get(factor.get("severity"), 0) > SEVERITY_RANK.get(existing.get("severity"), 0):
+                factors[index] = dict(factor)
+            return
+    factors.append(dict(factor))
+
+
+def load_rules(path: Optional[str] = RULES_PATH) -> RiskRules:
+    if path:
+        with open(path) as f:
+            return RiskRules(json.load(f))
+    return RiskRules(DEFAULT_RULES)
@@ -0,0 +1,68 @@
+import re
+from typing import Any, Dict, List
+
+# Section kinds and the heading keywords that open them
+SECTION_KINDS = {
+    "payment_schedule": r"PAYMENT\s+SCHEDULE",
+    "reporting_requirements": r"REPORTING\s+REQUIREMENTS",
+    "deliverables": r"DELIVERABLES",
+    "milestones": r"MILESTONES",
+    "schedule": r"SCHEDULE\s+[A-Z0-9]{1,4}\b",
+    "exhibit": r"EXHIBIT\s+[A-Z0-9]{1,4}\b",
+}
+
+# One alternation compiled once: a heading is a line that starts with a keyword, optionally
+# after a section number ("4.", "4.2", "Section 7 -"). The leading newline gives the regex
+# engine a literal to skip ahead to, instead of trying a match at every character.
+_HEADING = re.compile(
+    r"\n[ \t]*(?:(?:section\s+)?[\d.)]+[ \t]*[-:]?[ \t]*)?(?:"
+    + "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in SECTION_KINDS.items())
+    + ")[^\n]*",
+    re.IGNORECASE,
+)
+_BLANK_LINE = re.compile(r"\n[ \t]*(?=\n)")
+_CONTENT = re.compile(r"\S")
+
+# Headings in mixed case are only trusted on short lines, so prose such as
+# "Deliverables shall be accepted within ..." does not open a section
+MAX_MIXED_CASE_HEADING = 60
+
+
+def _headings(text: str):
+    """Yield (kind, title, start, end) of heading lines; offsets exclude surrounding whitespace"""
+    # Scan with a newline in front so the first line is a candidate too; offsets shift by one
+    for match in _HEADING.finditer("\n" + text):
+        line = match.group(0)[1:]
+        title = line.strip()
+        if match.group(match.lastgroup).isupper() or len(title) <= MAX_MIXED_CASE_HEADING:
+            start = match.start() + len(line) - len(line.lstrip())
+            yield match.lastgroup, title, start, match.end() - 1
+
+
+def scan_sections(text: str) -> List[Dict[str, Any]]:
+    """Find schedule/table sections in a single linear scan.
+
+    A section runs from its heading line to the first blank line after some
+    body text, the next heading, or the end of the text. Each span is
+    {"kind", "title", "start", "end"} with character offsets into `text`.
+    Every region is searched at most once, so there is no backtracking
+    across the document.
+    """
+    headings = list(_headings(text))
+    spans: List[Dict[str, Any]] = []
+    for i, (kind, title, start, heading_end) in enumerate(headings):
+        limit = headings[i + 1][2] if i + 1 < len(headings) else len(text)
+        end = limit
+        body = _CONTENT.search(text, heading_end, limit)
+        if body is not None:
+            blank = _BLANK_LINE.search(text, body.start(), limit)
+            if blank is not None:
+                end = blank.start()
+        end = start + len(text[start:end].rstrip())
+        spans.append({"kind": kind, "title": title, "start": start, "end": end})
+    return spans
+
+
+def has_table_layout(text: str) -> bool:
+    """True when any line contains table-like separators (pipes, tabs, column padding)"""
+    return "|" in text or "\t" in text or "  " in text
@@ -0,0 +1,55 @@
+import os
+import time
+from typing import Dict, Iterable, List, Tuple
+
+# How long an id skipped over by a sync is re-read before it is taken to be rolled back or deleted
+GAP_SECONDS = float(os.getenv("INDEX_SYNC_GAP_SECONDS", "300"))
+# Ids below the new high-water mark considered per sync; in-flight rows are always near the top
+MAX_GAPS = int(os.getenv("INDEX_SYNC_MAX_GAPS", "1000"))
+
+
+class SyncedIds:
+    """Which table rows an in-memory index holds, for syncing it by id.
+
+    Ids are assigned at insert but become visible at commit, so when two
+    ingests run at once a lower id can commit after a higher one has already
+    been read. Syncs read rows above max_id plus the ids they skipped over
+    (gaps), which are re-read by primary key until they show up or are older
+    than GAP_SECONDS. An id is new if it is above max_id or still a gap, so
+    overlapping syncs never add a row twice. Not thread safe: the owning
+    index calls it under its own lock.
+    """
+
+    def __init__(self, gap_seconds: float = GAP_SECONDS, max_gaps: int = MAX_GAPS):
+        self.gap_seconds = gap_seconds
+        self.max_gaps = max_gaps
+        self.max_id = 0
+        self._gaps: Dict[int, float] = {}
+
+    def is_new(self, row_id: int) -> bool:
+        return row_id > self.max_id or row_id in self._gaps
+
+    def record(self, row_ids: Iterable[int]):
+        """Note ids just added to the index"""
+        row_ids = set(row_ids)
+        if not row_ids:
+            return
+        for row_id in row_ids:
+            self._gaps.pop(row_id, None)
+        top = max(row_ids)
+        if top > self.max_id:
+            now = time.monotonic()
+            for row_id in range(max(self.max_id + 1, top - self.max_gaps), top):
+                if row_id not in row_ids:
+                    self._gaps[row_id] = now
+            self.max_id = top
+        if len(self._gaps) > self.max_gaps:
+            for row_id in sorted(self._gaps)[:len(self._gaps) - self.max_gaps]:
+                del self._gaps[row_id]
+
+    def pending(self) -> Tuple[int, List[int]]:
+        """(max_id, gap ids) to read on the next sync; expired gaps are dropped"""
+        cutoff = time.monotonic() - self.gap_seconds
+        for row_id in [row_id for row_id, seen in self._gaps.items() if seen < cutoff]:
+            del self._gaps[row_id]
+        return self.max_id, sorted(self._gaps)
@@ -0,0 +1,243 @@
+"""Contract deadline alerts: renewal and termination notice dates, upcoming expirations.
+
+Deadlines are derived once per contract version when it is saved (notice
+date = expiration minus the notice period) and stored in
+contract_deadlines with the time their alert is due. The scheduler never
+scans contracts: each refill reads the pending alerts due within the next
+ALERTS_HORIZON_HOURS through a partial index on alert_at, keeps them in a
+min-heap, and every tick pops only the entries that have come due. Fired
+alerts stay in the table until acknowledged and are served by /alerts.
+
+Every worker may run a scheduler; firing is a conditional UPDATE on
+fired_at IS NULL, so an alert fires once however many workers hold it.
+"""
+import heapq
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from . import metrics, models
+
+# Alert lead times: how long before the deadline itself the alert fires
+NOTICE_LEAD_DAYS = int(os.getenv("ALERTS_NOTICE_LEAD_DAYS", "30"))
+EXPIRY_LEAD_DAYS = int(os.getenv("ALERTS_EXPIRY_LEAD_DAYS", "90"))  # Same window as "expiring soon" on the dashboard
+HORIZON = timedelta(hours=float(os.getenv("ALERTS_HORIZON_HOURS", "24")))
+TICK_SECONDS = float(os.getenv("ALERTS_TICK_SECONDS", "60"))
+FIRE_BATCH = 500
+
+KINDS = ("renewal_notice", "termination_notice", "expiration")
+
+ALERTS_FIRED = metrics.counter("contract_alerts_fired_total", "Deadline alerts fired by kind", ("kind",))
+
+# (kind, deadline_at, alert_at)
+Deadline = Tuple[str, datetime, datetime]
+
+
+def contract_deadlines(contract: models.Contract, now: Optional[datetime] = None) -> List[Deadline]:
+    """Deadlines still ahead for a contract version (a Contract or a row of DEADLINE_COLUMNS).
+
+    Auto-renewing contracts get a renewal notice deadline (last day to send
+    notice of non-renewal); others with a termination notice period get a
+    termination notice deadline against the termination or expiration date.
+    Every contract with an end date gets an expiration deadline.
+    """
+    now = now or datetime.now()
+    end = contract.termination_date or contract.expiration_date
+    deadlines: List[Deadline] = []
+    notice_lead = timedelta(days=NOTICE_LEAD_DAYS)
+    if contract.auto_renewal and contract.expiration_date and contract.renewal_notice_period:
+        notice = contract.expiration_date - timedelta(days=contract.renewal_notice_period)
+        deadlines.append(("renewal_notice", notice, notice - notice_lead))
+    elif end and contract.termination_notice_period:
+        notice = end - timedelta(days=contract.termination_notice_period)
+        deadlines.append(("termination_notice", notice, notice - notice_lead))
+    if end:
+        deadlines.append(("expiration", end, end - timedelta(days=EXPIRY_LEAD_DAYS)))
+    return [deadline for deadline in deadlines if deadline[1] >= now]
+
+
+def sync_contract_deadlines(db: Session, contract: models.Contract,
+                            superseded_id: Optional[int] = None) -> List[Tuple[datetime, int]]:
+    """Replace the pending deadlines of a contract (and of the version it supersedes); the caller commits.
+
+    Returns (alert_at, deadline id) for AlertScheduler.schedule.
+    """
+    stale = [contract.id] if superseded_id is None else [contract.id, superseded_id]
+    db.query(models.ContractDeadline)\
+        .filter(models.ContractDeadline.contract_id.in_(stale), models.ContractDeadline.fired_at.is_(None))\
+        .delete(synchronize_session=False)
+    rows = [
+        models.ContractDeadline(contract_id=contract.id, kind=kind, deadline_at=deadline_at, alert_at=alert_at)
+        for kind, deadline_at, alert_at in contract_deadlines(contract)
+    ]
+    db.add_all(rows)
+    db.flush()
+    return [(row.alert_at, row.id) for row in rows]
+
+
+# What contract_deadlines reads; the backfill runs as a migration, so it must not load whole Contract entities
+# (columns added by later migrations don't exist yet)
+DEADLINE_COLUMNS = (
+    models.Contract.id,
+    models.Contract.expiration_date,
+    models.Contract.termination_date,
+    models.Contract.auto_renewal,
+    models.Contract.renewal_notice_period,
+    models.Contract.termination_notice_period,
+)
+
+
+def backfill_deadlines(db: Session, batch_size: int = 1000) -> int:
+    """Deadlines for the latest version of every contract ingested before the table existed; commits per batch"""
+    newer = aliased(models.Contract)
+    has_deadlines = exists().where(models.ContractDeadline.contract_id == models.Contract.id)
+    superseded = exists().where(newer.previous_version_id == models.Contract.id)
+    query = db.query(*DEADLINE_COLUMNS)\
+        .filter(models.Contract.expiration_date.isnot(None) | models.Contract.termination_date.isnot(None))\
+        .filter(~has_deadlines, ~superseded)\
+        .order_by(models.Contract.id)
+    created = 0
+    last_id = 0
+    while True:
+        contracts = query.filter(models.Contract.id > last_id).limit(batch_size).all()
+        if not contracts:
+            return created
+        for contract in contracts:
+            for kind, deadline_at, alert_at in contract_deadlines(contract):
+                db.add(models.ContractDeadline(
+                    contract_id=contract.id, kind=kind, deadline_at=deadline_at, alert_at=alert_at))
+                created += 1
+        last_id = contracts[-1].id
+        db.commit()
+        db.expunge_all()
+
+
+def with_contract_summary():
+    """Loader option: the contract fields alert_to_dict reads, joined into the alert query rather than one query per row"""
+    return joinedload(models.ContractDeadline.contract).load_only(
+        models.Contract.contract_type, models.Contract.parties, models.Contract.auto_renewal)
+
+
+def alert_to_dict(deadline: models.ContractDeadline, now: Optional[datetime] = None) -> Dict:
+    now = now or datetime.now()
+    contract = deadline.contract
+    return {
+        "id": deadline.id,
+        "contract_id": deadline.contract_id,
+        "kind": deadline.kind,
+        "deadline_at": deadline.deadline_at,
+        "alert_at": deadline.alert_at,
+        "days_left": (deadline.deadline_at - now).days,
+        "fired_at": deadline.fired_at,
+        "acknowledged_at": deadline.acknowledged_at,
+        "acknowledged_by": deadline.acknowledged_by,
+        "contract_type": contract.contract_type if contract else None,
+        "parties": contract.parties if contract else None,
+        "auto_renewal": contract.auto_renewal if contract else None,
+    }
+
+
+def list_alerts(db: Session, status: str = "open", kind: Optional[str] = None,
+                days: int = 30, limit: int = 100) -> List[Dict]:
+    """Alerts for /alerts.
+
+    open: fired and not acknowledged (newest first); fired: everything that
+    has fired; upcoming: not fired yet and due within `days`, soonest first.
+    """
+    now = datetime.now()
+    query = db.query(models.ContractDeadline).options(with_contract_summary())
+    if status == "upcoming":
+        query = query.filter(
+            models.ContractDeadline.fired_at.is_(None),
+            models.ContractDeadline.alert_at <= now + timedelta(days=days),
+        ).order_by(models.ContractDeadline.alert_at)
+    else:
+        query = query.filter(models.ContractDeadline.fired_at.isnot(None))
+        if status == "open":
+            query = query.filter(models.ContractDeadline.acknowledged_at.is_(None))
+        query = query.order_by(models.ContractDeadline.fired_at.desc())
+    if kind:
+        query = query.filter(models.ContractDeadline.kind == kind)
+    return [alert_to_dict(deadline, now) for deadline in query.limit(limit).all()]
+
+
+class AlertScheduler:
+    """Min-heap of (alert_at, deadline id) covering the next HORIZON of pending alerts"""
+
+    def __init__(self, session_factory: Callable[[], Session], horizon: timedelta = HORIZON):
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self._heap: List[Tuple[datetime, int]] = []
+        self._queued = set()
+        self._loaded_until: Optional[datetime] = None
+        self._lock = threading.Lock()
+        metrics.gauge("contract_alerts_queued", "Pending alerts held in the scheduler's heap",
+                      collect=lambda: {(): len(self._heap)})
+
+    def schedule(self, entries: List[Tuple[datetime, int]]):
+        """Take deadlines saved by this process; ones beyond the loaded window wait for a refill"""
+        with self._lock:
+            for alert_at, deadline_id in entries:
+                if self._loaded_until is not None and alert_at < self._loaded_until:
+                    self._push(alert_at, deadline_id)
+
+    def _push(self, alert_at: datetime, deadline_id: int):
+        if deadline_id not in self._queued:
+            self._queued.add(deadline_id)
+            heapq.heappush(self._heap, (alert_at, deadline_id))
+
+    def _refill(self, db: Session, now: datetime):
+        until = now + self.horizon
+        # Index range on ix_contract_deadlines_pending; includes anything overdue
+        rows = db.query(models.ContractDeadline.alert_at, models.ContractDeadline.id)\
+            .filter(models.ContractDeadline.fired_at.is_(None), models.ContractDeadline.alert_at < until)\
+            .all()
+        with self._lock:
+            for alert_at, deadline_id in rows:
+                self._push(alert_at, deadline_id)
+            self._loaded_until = until
+
+    def _pop_due(self, now: datetime) -> List[int]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, deadline_id = heapq.heappop(self._heap)
+                self._queued.discard(deadline_id)
+                due.append(deadline_id)
+        return due
+
+    def tick(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Fire every alert that has come due; returns the ones this call fired"""
+        now = now or datetime.now()
+        db = self.session_factory()
+        try:
+            # Refill halfway through the window so other workers' new deadlines are picked up
+            if self._loaded_until is None or now + self.horizon / 2 >= self._loaded_until:
+                self._refill(db, now)
+            due = self._pop_due(now)
+            if not due:
+                return []
+            alerts = []
+            for start in range(0, len(due), FIRE_BATCH):
+                batch = due[start:start + FIRE_BATCH]
+                # Deadlines replaced or fired elsewhere since they were queued simply don't match
+                db.query(models.ContractDeadline)\
+                    .filter(models.ContractDeadline.id.in_(batch), models.ContractDeadline.fired_at.is_(None))\
+                    .update({models.ContractDeadline.fired_at: now}, synchronize_session=False)
+                db.commit()
+                fired = db.query(models.ContractDeadline)\
+                    .options(with_contract_summary())\
+                    .filter(models.ContractDeadline.id.in_(batch), models.ContractDeadline.fired_at == now)\
+                    .all()
+                alerts.extend(alert_to_dict(deadline, now) for deadline in fired)
+        finally:
+            db.close()
+        for alert in alerts:
+            ALERTS_FIRED.inc(kind=alert["kind"])
+            print(f"Alert: contract {alert['contract_id']} {alert['kind']} on "
+                  f"{alert['deadline_at']:%Y-%m-%d} ({alert['days_left']} days)")
+        return alerts
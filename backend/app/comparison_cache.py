@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ComparisonCache:
+    """In-process LRU of /contracts/compare results keyed by contract pair.
+
+    Each entry remembers the content digests of both contracts when it was
+    computed; a lookup with different digests is a miss, so an entry goes
+    stale as soon as either contract changes.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[str, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, id1: int, id2: int, digest1: str, digest2: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((id1, id2))
+            if entry is None or entry[0] != digest1 or entry[1] != digest2:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((id1, id2))
+            self.hits += 1
+            return entry[2]
+
+    def set(self, id1: int, id2: int, digest1: str, digest2: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[(id1, id2)] = (digest1, digest2, result)
+            self._entries.move_to_end((id1, id2))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_contract(self, contract_id: int):
+        """Drop every cached comparison involving the contract"""
+        with self._lock:
+            for key in [k for k in self._entries if contract_id in k]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,147 @@
+"""Response compression middleware: brotli when the client accepts it and the
+`brotli` package is installed, gzip otherwise.
+
+Bodies under COMPRESSION_MIN_SIZE bytes, responses that already carry a
+Content-Encoding and media types that don't compress (PDFs, images,
+archives) pass through untouched. Streaming responses are compressed chunk
+by chunk with a sync flush after each one, so NDJSON progress lines still
+reach the client as they are produced; server-sent events are never
+compressed because proxies and browsers buffer compressed event streams.
+"""
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Level 5 is about 2x faster than 6 on large contract payloads for ~10% more bytes
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+UNCOMPRESSIBLE_TYPES = ("text/event-stream", "application/pdf", "application/zip", "application/gzip", "image/")
+
+RESPONSE_BYTES = metrics.counter(
+    "http_response_bytes_total", "Response body bytes before and after compression", ("encoding", "stage"))
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding from an Accept-Encoding header (q=0 excludes)"""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or media_type.startswith(UNCOMPRESSIBLE_TYPES)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # The encoded bytes differ from the identity representation the strong ETag names
+                headers["ETag"] = "W/" + headers["etag"]
+            compressed = self.encoder.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            self._count(body, compressed)
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        compressed = self.encoder.compress(body, final=not more_body)
+        self._count(body, compressed)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _count(self, body: bytes, compressed: bytes):
+        RESPONSE_BYTES.inc(len(body), encoding=self.encoding, stage="uncompressed")
+        RESPONSE_BYTES.inc(len(compressed), encoding=self.encoding, stage="sent")
@@ -0,0 +1,179 @@
+"""Document processing status events, pushed to clients over server-sent events.
+
+The ingestion worker publishes each stage transition (queued, extracting,
+chunk i/n, embedding, completed, failed) to a broker, and
+GET /documents/{id}/events streams them, so upload screens don't poll
+/documents/{id}/status.
+
+The default backend is in-process: subscribers only see events published
+by the same worker process, which holds as long as the upload and the
+event stream land on the same process (one worker, or sticky sessions).
+Set STATUS_EVENTS_URL=redis://... to fan events out through Redis pub/sub
+across workers. That backend needs the `redis` package, which is not a
+hard dependency.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from . import metrics
+
+TERMINAL_STAGES = ("completed", "failed")
+# Latest event per document kept for clients that subscribe mid-way
+MAX_TRACKED_DOCUMENTS = int(os.getenv("STATUS_EVENTS_TRACKED", "1000"))
+
+EVENTS_PUBLISHED = metrics.counter("status_events_published_total", "Processing status events by stage", ("stage",))
+
+
+def make_event(document_id: int, stage: str, **details) -> Dict[str, Any]:
+    return {"document_id": document_id, "stage": stage, "at": time.time(), **details}
+
+
+class InProcessBackend:
+    def __init__(self, max_tracked: int = MAX_TRACKED_DOCUMENTS):
+        self.max_tracked = max_tracked
+        self._latest: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._subscribers: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    async def publish(self, event: Dict[str, Any]):
+        document_id = event["document_id"]
+        with self._lock:
+            self._latest[document_id] = event
+            self._latest.move_to_end(document_id)
+            while len(self._latest) > self.max_tracked:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(document_id, ()))
+        for loop, queue in subscribers:
+            # Subscribers may sit on another thread's loop
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def latest(self, document_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._latest.get(document_id)
+
+    async def subscribe(self, document_id: int) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yields None once subscribed, then each event"""
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(document_id, []).append(entry)
+        try:
+            yield None
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(document_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(document_id, None)
+
+
+class RedisBackend:
+    """Events go to a per-document channel; the latest one is also kept under a key with a TTL"""
+
+    def __init__(self, url: str, ttl: int = 3600, prefix: str = "document-events:"):
+        import redis.asyncio  # optional dependency, only needed when STATUS_EVENTS_URL is set
+
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def publish(self, event: Dict[str, Any]):
+        payload = json.dumps(event)
+        channel = f"{self.prefix}{event['document_id']}"
+        pipe = self.client.pipeline()
+        pipe.setex(channel + ":latest", self.ttl, payload)
+        pipe.publish(channel, payload)
+        await pipe.execute()
+
+    async def latest(self, document_id: int) -> Optional[Dict[str, Any]]:
+        payload = await self.client.get(f"{self.prefix}{document_id}:latest")
+        return json.loads(payload) if payload else None
+
+    async def subscribe(self, document_id: int) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yields None once Redis confirms the SUBSCRIBE, then each event"""
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(f"{self.prefix}{document_id}")
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "subscribe":
+                    yield None
+                elif message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+
+
+def backend_from_env():
+    url = os.getenv("STATUS_EVENTS_URL")
+    return RedisBackend(url) if url else InProcessBackend()
+
+
+class StatusBroker:
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else backend_from_env()
+
+    async def publish(self, document_id: int, stage: str, **details):
+        """Publish a stage transition; never lets a broker error break processing"""
+        try:
+            await self.backend.publish(make_event(document_id, stage, **details))
+            EVENTS_PUBLISHED.inc(stage=stage)
+        except Exception as e:
+            print(f"Error publishing status event for document {document_id}: {e}")
+
+    async def latest(self, document_id: int) -> Optional[Dict[str, Any]]:
+        return await self.backend.latest(document_id)
+
+    async def stream(self, document_id: int, initial: Optional[Dict[str, Any]] = None,
+                     keepalive: float = 15.0) -> AsyncIterator[str]:
+        """Server-sent event frames: the current state, then every transition until a terminal stage.
+
+        `initial` is used when the broker has no event for the document (e.g.
+        it was processed before this worker started). Comment frames are sent
+        every `keepalive` seconds so proxies keep the connection open.
+        """
+        subscription = self.backend.subscribe(document_id)
+        next_event = None
+        try:
+            # Wait for the backend to confirm the subscription (a round trip with Redis) before reading
+            # the latest event, so a transition published in between, such as a quick "failed", isn't lost
+            await subscription.__anext__()
+            next_event = asyncio.ensure_future(subscription.__anext__())
+            current = await self.latest(document_id) or initial
+            if current is not None:
+                yield _frame(current)
+                if current["stage"] in TERMINAL_STAGES:
+                    return
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=keepalive)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+                event = next_event.result()
+                next_event = asyncio.ensure_future(subscription.__anext__())
+                if event == current:
+                    # Published after subscribing but already read as the latest event
+                    continue
+                yield _frame(event)
+                if event["stage"] in TERMINAL_STAGES:
+                    return
+        finally:
+            if next_event is not None:
+                next_event.cancel()
+                try:
+                    await next_event
+                except (asyncio.CancelledError, StopAsyncIteration):
+                    pass
+            await subscription.aclose()
+
+
+def _frame(event: Dict[str, Any]) -> str:
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
@@ -1,22 +1,73 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, BackgroundTasks, Request, Response, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, or_
 from sqlalchemy.orm import Session
 from typing import List
 import os
 from dotenv import load_dotenv
-from app.database import get_db, engine
+from app.database import get_db, get_read_db, engine, SessionLocal, WorkerSessionLocal
 # from database import get_db, engine
 from . import models
 from . import schemas
 from .agents.contract_processor import ContractProcessor
 from .agents.rag_engine import RAGEngine
+from .agents.openai_client import close_client
+from .agents.diff_engine import section_fingerprints, fingerprint_digest
+from .agents.portfolio_compare import compare_portfolio, DeviationTally
+from .agents.clause_index import ClauseIndex, iter_clauses, clause_type as canonical_clause_type
+from .agents.hybrid_search import BM25Index, is_lexical_query, reciprocal_rank_fusion, rerank
+from .comparison_cache import ComparisonCache
+from .response_cache import ResponseCache
+from .serialization import FastJSONResponse
+from .compression import CompressionMiddleware
+from .events import StatusBroker, make_event as make_status_event
+from .parties import backfill_parties, contracts_with_party, link_contract_parties
+from .agents.risk_rules import load_rules as load_risk_rules
+from .risk_rescore import rescore_contracts, run_to_dict, start_run as start_rescore_run
+from .alerts import AlertScheduler, list_alerts, sync_contract_deadlines, TICK_SECONDS as ALERT_TICK_SECONDS
+from . import metrics
+from . import migrations
+import asyncio
 import json
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from datetime import datetime, timezone
 from typing import Optional
 
 load_dotenv()
 
-app = FastAPI(title="Contract Intelligence Agent")
+# Apply pending schema migrations when the app starts. With several replicas, set AUTO_MIGRATE=false
+# and run `python -m app.migrations` once per release instead, so pods become ready without touching the schema.
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+ALERTS_ENABLED = os.getenv("ALERTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+STARTUP_SECONDS = metrics.histogram("app_startup_seconds", "Time spent in application startup (migrations, background tasks)",
+                                    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown; nothing here runs at import, so importing the app needs no database"""
+    started = time.perf_counter()
+    if AUTO_MIGRATE:
+        # Create or upgrade the schema
+        await run_in_threadpool(migrations.migrate, engine)
+    # Fire contract deadline alerts in the background (ALERTS_ENABLED=false to leave it to another worker)
+    alert_task = asyncio.create_task(run_alert_scheduler()) if ALERTS_ENABLED else None
+    elapsed = time.perf_counter() - started
+    STARTUP_SECONDS.observe(elapsed)
+    print(f"Startup completed in {elapsed:.2f}s")
+    try:
+        yield
+    finally:
+        if alert_task is not None:
+            alert_task.cancel()
+        # Release the pooled OpenAI connections
+        await close_client()
+
+app = FastAPI(title="Contract Intelligence Agent", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -26,17 +77,58 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
-# Initialize models
-models.Base.metadata.create_all(bind=engine)
-
+# Cheap to construct: the extraction prompt is rendered and the OpenAI client created on first use
 processor = ContractProcessor()
 rag_engine = RAGEngine()
+comparison_cache = ComparisonCache(max_entries=int(os.getenv("COMPARISON_CACHE_SIZE", "512")))
+response_cache = ResponseCache()
+status_broker = StatusBroker()
+alert_scheduler = AlertScheduler(WorkerSessionLocal)
+clause_index = ClauseIndex()
+chunk_lexical_index = BM25Index()
+
+async def run_alert_scheduler():
+    while True:
+        try:
+            await run_in_threadpool(alert_scheduler.tick)
+        except Exception as e:
+            print(f"Error in alert scheduler: {e}")
+        await asyncio.sleep(ALERT_TICK_SECONDS)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Latency histogram per route template (e.g. /contracts/{contract_id}), not per raw URL"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+@app.get("/health", include_in_schema=False)
+def health():
+    """Readiness probe: answers once startup has finished, without touching the database"""
+    return {"status": "ok"}
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 
 
 @app.get("/contracts/summary")
-async def get_contracts_summary(db: Session = Depends(get_db)):
+def get_contracts_summary(db: Session = Depends(get_read_db)):
     """Get comprehensive contract summary"""
     from sqlalchemy import func, case, and_
     from datetime import datetime, timedelta
@@ -105,67 +197,90 @@ async def get_contracts_summary(db: Session = Depends(get_db)):
         "by_status": by_status
     }
 
+def contract_cache_stamp(db: Session, contract_id: int):
+    """(version, last modified) of a contract without loading its JSON columns; 404 if missing"""
+    row = db.query(models.Contract.version, models.Contract.last_updated, models.Contract.extraction_date)\
+        .filter(models.Contract.id == contract_id)\
+        .first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    last_modified = row.last_updated or row.extraction_date
+    stamp = f"v{row.version}:{last_modified.timestamp() if last_modified else 0}"
+    return stamp, last_modified
+
 @app.get("/contracts/{contract_id}/versions")
-async def get_contract_versions(
+def get_contract_versions(
     contract_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Get all versions of a contract"""
-    contract = db.query(models.Contract).filter(
-        models.Contract.id == contract_id
-    ).first()
-    
-    if not contract:
-        raise HTTPException(status_code=404, detail="Contract not found")
+    stamp, last_modified = contract_cache_stamp(db, contract_id)
     
-    # Find all versions (follow previous_version chain)
-    versions = []
-    current = contract
-    
-    while current:
-        versions.append(current)
-        if current.previous_version_id:
-            current = db.query(models.Contract).filter(
-                models.Contract.id == current.previous_version_id
-            ).first()
-        else:
-            current = None
+    def load():
+        contract = db.query(models.Contract).filter(
+            models.Contract.id == contract_id
+        ).first()
+        
+        # Find all versions (follow previous_version chain)
+        versions = []
+        current = contract
+        
+        while current:
+            versions.append(current)
+            if current.previous_version_id:
+                current = db.query(models.Contract).filter(
+                    models.Contract.id == current.previous_version_id
+                ).first()
+            else:
+                current = None
+        
+        versions.reverse()  # Oldest first
+        return versions, [version.id for version in versions]
     
-    versions.reverse()  # Oldest first
-    return versions
+    return response_cache.respond(request, "versions", f"{contract_id}:{stamp}", last_modified, load)
 
 @app.get("/contracts/{contract_id}/deltas")
-async def get_contract_deltas(
+def get_contract_deltas(
     contract_id: int,
+    request: Request,
     version_from: Optional[int] = None,
     version_to: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get changes between contract versions"""
-    contract = db.query(models.Contract).filter(
-        models.Contract.id == contract_id
-    ).first()
+    from sqlalchemy import func
     
-    if not contract:
-        raise HTTPException(status_code=404, detail="Contract not found")
+    stamp, last_modified = contract_cache_stamp(db, contract_id)
+    # Deltas are stored against this contract when its next version is ingested, which leaves its stamp alone
+    latest_delta_id, latest_detected_at = db.query(
+        func.max(models.ContractDelta.id), func.max(models.ContractDelta.detected_at)
+    ).filter(models.ContractDelta.contract_id == contract_id).one()
+    if latest_detected_at and (not last_modified or latest_detected_at > last_modified):
+        last_modified = latest_detected_at
     
-    # Get specific versions or all deltas
-    if version_from and version_to:
-        deltas = db.query(models.ContractDelta).filter(
-            and_(
-                models.ContractDelta.contract_id == contract_id,
-                models.ContractDelta.previous_version_id == version_from
-            )
-        ).all()
-    else:
-        deltas = db.query(models.ContractDelta).filter(
-            models.ContractDelta.contract_id == contract_id
-        ).order_by(models.ContractDelta.detected_at.desc()).all()
+    def load():
+        from sqlalchemy import and_
+        
+        # Get specific versions or all deltas
+        if version_from and version_to:
+            deltas = db.query(models.ContractDelta).filter(
+                and_(
+                    models.ContractDelta.contract_id == contract_id,
+                    models.ContractDelta.previous_version_id == version_from
+                )
+            ).all()
+        else:
+            deltas = db.query(models.ContractDelta).filter(
+                models.ContractDelta.contract_id == contract_id
+            ).order_by(models.ContractDelta.detected_at.desc()).all()
+        return deltas, [contract_id]
     
-    return deltas
+    key = f"{contract_id}:{stamp}:d{latest_delta_id or 0}:{version_from}:{version_to}"
+    return response_cache.respond(request, "deltas", key, last_modified, load)
 
 @app.get("/contracts/search/advanced")
-async def advanced_search(
+def advanced_search(
     query: Optional[str] = None,
     contract_type: Optional[str] = None,
     party_name: Optional[str] = None,
@@ -175,9 +290,10 @@ async def advanced_search(
     end_date: Optional[datetime] = None,
     risk_level: Optional[str] = None,
     needs_review: Optional[bool] = None,
+    clause: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Advanced contract search with filters"""
     from sqlalchemy import or_, and_
@@ -189,7 +305,7 @@ async def advanced_search(
         query_builder = query_builder.filter(
             or_(
                 models.Contract.contract_type.ilike(f"%{query}%"),
-                models.Contract.parties.cast(String).ilike(f"%{query}%"),
+                models.Contract.id.in_(contracts_with_party(db, query)),
                 models.Contract.clauses.cast(String).ilike(f"%{query}%")
             )
         )
@@ -200,10 +316,10 @@ async def advanced_search(
             models.Contract.contract_type == contract_type
         )
     
-    # Party filter
+    # Party filter: index seek through the normalized parties table
     if party_name:
         query_builder = query_builder.filter(
-            models.Contract.parties.cast(String).ilike(f"%{party_name}%")
+            models.Contract.id.in_(contracts_with_party(db, party_name))
         )
     
     # Value range filter
@@ -255,6 +371,10 @@ async def advanced_search(
             models.Contract.needs_review == needs_review
         )
     
+    # Clause filter: contracts whose extraction has this clause key (GIN index on PostgreSQL)
+    if clause:
+        query_builder = query_builder.filter(has_clause(db, clause))
+    
     # Execute query
     contracts = query_builder.offset(skip).limit(limit).all()
     total = query_builder.count()
@@ -266,262 +386,349 @@ async def advanced_search(
         "contracts": contracts
     }
 
-def process_document_async(document_id: int, file_content: bytes, db: Session, 
-                          is_amendment: bool = False, parent_document_id: Optional[int] = None):
-    """Enhanced async processing with versioning"""
+def has_clause(db: Session, clause_name: str):
+    """Filter on a key of Contract.clauses; `?` is the JSONB key-exists operator"""
+    if db.get_bind().dialect.name == "postgresql":
+        return models.Contract.clauses.op("?")(clause_name)
+    from sqlalchemy import func
+    key = clause_name.replace('"', '')
+    return func.json_type(models.Contract.clauses, f'$."{key}"').isnot(None)
+
+def contract_to_extraction(contract: models.Contract) -> dict:
+    """Rebuild the comparable extraction shape from a stored contract"""
+    return {
+        "contract_type": contract.contract_type,
+        "contract_subtype": contract.contract_subtype,
+        "master_agreement_id": contract.master_agreement_id,
+        "parties": contract.parties,
+        "dates": {
+            "effective_date": contract.effective_date,
+            "expiration_date": contract.expiration_date,
+            "execution_date": contract.execution_date,
+            "termination_date": contract.termination_date,
+        },
+        "financial": {
+            "total_value": contract.total_value,
+            "currency": contract.currency,
+            "payment_terms": contract.payment_terms,
+            "billing_frequency": contract.billing_frequency,
+        },
+        "clauses": contract.clauses or {},
+        "key_fields": contract.key_fields or {},
+        "confidence_score": contract.confidence_score,
+    }
+
+def ensure_fingerprints(contract: models.Contract, db: Session) -> dict:
+    """Return the contract's section fingerprints, backfilling rows stored before they existed"""
+    if not contract.fingerprints:
+        contract.fingerprints = section_fingerprints(contract_to_extraction(contract))
+        db.commit()
+    return contract.fingerprints
+
+async def index_contract_clauses(contract_id: int, contract_clauses: dict, db: Session, rag: RAGEngine) -> int:
+    """Embed each clause of a contract and store the vectors for the clause index"""
+    clauses = list(iter_clauses(contract_clauses))
+    if not clauses:
+        return 0
+    
+    vectors = await rag.embed_texts([text for _, _, text in clauses])
+    rows = [
+        models.ClauseEmbedding(
+            contract_id=contract_id,
+            clause_name=name,
+            clause_type=clause_kind,
+            text=text,
+            embedding=vector
+        )
+        for (name, clause_kind, text), vector in zip(clauses, vectors)
+    ]
+    
+    def store():
+        db.add_all(rows)
+        db.commit()
+    
+    await run_in_threadpool(store)
+    # The in-memory index picks new rows up by id on its next sync
+    return len(rows)
+
+def sync_clause_index(db: Session):
+    """Load clause vectors stored since the index was last synced, by any worker.
+
+    Also re-reads ids skipped by earlier syncs, which concurrent ingests may commit out of order.
+    """
+    max_id, gaps = clause_index.pending()
+    new_rows = models.ClauseEmbedding.id > max_id
+    rows = db.query(
+        models.ClauseEmbedding.id,
+        models.ClauseEmbedding.contract_id,
+        models.ClauseEmbedding.clause_type,
+        models.ClauseEmbedding.embedding
+    ).filter(or_(new_rows, models.ClauseEmbedding.id.in_(gaps)) if gaps else new_rows)\
+        .order_by(models.ClauseEmbedding.id)\
+        .all()
+    clause_index.add([tuple(row) for row in rows])
+
+def save_contract_extraction(local_db: Session, document_id: int, extraction: dict,
+                             is_amendment: bool = False, parent_document_id: Optional[int] = None) -> models.Contract:
+    """Persist an extraction as a new contract version, storing deltas against the parent if amended"""
+    # Handle versioning if this is an amendment
+    previous_contract = None
+    version = 1
+    
+    if is_amendment and parent_document_id:
+        # Find the latest version of the parent contract
+        parent_doc = local_db.query(models.Document)\
+            .filter(models.Document.id == parent_document_id)\
+            .first()
+    
+        if parent_doc:
+            previous_contract = local_db.query(models.Contract)\
+                .filter(models.Contract.document_id == parent_doc.id)\
+                .order_by(models.Contract.version.desc())\
+                .first()
+    
+            if previous_contract:
+                version = previous_contract.version + 1
+    
+                # Prepare extraction data from previous contract
+                previous_extraction = contract_to_extraction(previous_contract)
+    
+                # Compare versions using full extraction
+                comparison = processor.compare_versions(
+                    previous_extraction,
+                    extraction
+                )
+    
+                # Store deltas
+                for delta in comparison.get("deltas", []):
+                    contract_delta = models.ContractDelta(
+                        contract_id=previous_contract.id,
+                        previous_version_id=previous_contract.previous_version_id,
+                        field_name=delta["field_name"],
+                        old_value=json.dumps(delta["old_value"]) if delta["old_value"] else None,
+                        new_value=json.dumps(delta["new_value"]) if delta["new_value"] else None,
+                        change_type=delta["change_type"],
+                        confidence_change=comparison.get("confidence_change")
+                    )
+                    local_db.add(contract_delta)
+    
+    # Fix the signatories extraction
+    signatories_list = []
+    
+    # Try different possible locations for signatories
+    if extraction.get("contact_information") and extraction["contact_information"].get("signatories"):
+        signatories_list = extraction["contact_information"]["signatories"]
+    elif extraction.get("signatories"):
+        signatories_list = extraction["signatories"]
+    
+    # Fix the contacts extraction
+    contacts_list = []
+    
+    if extraction.get("contact_information") and extraction["contact_information"].get("administrative_contacts"):
+        contacts_list = extraction["contact_information"]["administrative_contacts"]
+    elif extraction.get("contacts"):
+        contacts_list = extraction["contacts"]
+    
+    # Score and factors from the same rules the processor and the portfolio re-score use
+    risk_score, risk_factors_list = processor.risk_rules.score_extraction(extraction)
+    
+    # Helper function to clean date values
+    def clean_date(date_value):
+        """Convert empty strings to None for date fields"""
+        if not date_value or date_value == "" or date_value == "Unknown":
+            return None
+        if isinstance(date_value, str):
+            # Parse here rather than relying on the database to coerce strings (SQLite won't)
+            try:
+                return datetime.fromisoformat(date_value.replace('Z', '+00:00'))
+            except ValueError:
+                print(f"Unparseable date from extraction: {date_value!r}")
+                return None
+        return date_value
+    
+    # Save contract with all extracted fields
+    contract = models.Contract(
+        document_id=document_id,
+        contract_type=extraction.get("contract_type", "Unknown"),
+        contract_subtype=extraction.get("contract_subtype"),
+        master_agreement_id=extraction.get("master_agreement_id"),
+        parties=extraction.get("parties", []),
+        effective_date=clean_date(extraction.get("dates", {}).get("effective_date")),
+        expiration_date=clean_date(extraction.get("dates", {}).get("expiration_date")),
+        execution_date=clean_date(extraction.get("dates", {}).get("execution_date")),
+        termination_date=clean_date(extraction.get("dates", {}).get("termination_date")),
+        total_value=extraction.get("financial", {}).get("total_value"),
+        currency=extraction.get("financial", {}).get("currency"),
+        payment_terms=extraction.get("financial", {}).get("payment_terms"),
+        billing_frequency=extraction.get("financial", {}).get("billing_frequency"),
+        signatories=signatories_list,
+        contacts=contacts_list,
+        auto_renewal=extraction.get("risk_indicators", {}).get("auto_renewal"),
+        renewal_notice_period=extraction.get("dates", {}).get("notice_period_days"),
+        termination_notice_period=extraction.get("dates", {}).get("notice_period_days"),
+        governing_law=extraction.get("key_fields", {}).get("governing_law", {}).get("value") if extraction.get("key_fields", {}).get("governing_law") else None,
+        jurisdiction=extraction.get("key_fields", {}).get("governing_law", {}).get("value") if extraction.get("key_fields", {}).get("governing_law") else None,
+        confidentiality=extraction.get("clauses", {}).get("confidentiality") is not None,
+        indemnification=extraction.get("clauses", {}).get("indemnification") is not None,
+        liability_cap=extraction.get("key_fields", {}).get("liability_cap", {}).get("value") if extraction.get("key_fields", {}).get("liability_cap") else None,
+        insurance_requirements=extraction.get("compliance_requirements", {}).get("minimum_coverage"),
+        service_levels=extraction.get("service_levels", {}),
+        deliverables=extraction.get("deliverables", []),
+        risk_score=risk_score,
+        risk_factors=risk_factors_list,
+        risk_indicators=extraction.get("risk_indicators") or {},
+        risk_rules_version=processor.risk_rules.version,
+        risk_scored_at=datetime.now(timezone.utc),
+        clauses=extraction.get("clauses", {}),
+        key_fields=extraction.get("key_fields", {}),
+        extracted_metadata=extraction.get("metadata", {}),
+        confidence_score=extraction.get("confidence_score", 0.0),
+        version=version,
+        previous_version_id=previous_contract.id if previous_contract else None,
+        change_summary=f"Amendment detected with {len(extraction.get('clauses', {}))} clauses" if is_amendment else "Initial extraction",
+        needs_review=True,
+    )
+    
+    local_db.add(contract)
+    local_db.commit()
+    local_db.refresh(contract)
+    
+    # Fingerprint the stored shape so /contracts/compare can skip identical sections
+    contract.fingerprints = section_fingerprints(contract_to_extraction(contract))
+    # Normalized party/signatory rows back the indexed counterparty search
+    link_contract_parties(local_db, contract.id, contract.parties, signatories_list)
+    # Notice and expiry deadlines for the alert scheduler; the superseded version's pending ones go
+    deadlines = sync_contract_deadlines(local_db, contract, previous_contract.id if previous_contract else None)
+    local_db.commit()
+    alert_scheduler.schedule(deadlines)
+    
+    # Load attributes now so the caller can read them without touching the database
+    local_db.refresh(contract)
+    print(f"Contract saved with ID: {contract.id}, Version: {version}")
+    
+    return contract
+
+def save_rag_embeddings(local_db: Session, contract_id: int, version: int, embeddings: List[dict]):
+    """Store RAG chunk embeddings for a contract"""
+    for emb in embeddings:
+        rag_entry = models.RAGEmbedding(
+            contract_id=contract_id,
+            text_chunk=emb["text_chunk"],
+            embedding=emb["embedding"],
+            chunk_metadata=emb["metadata"],
+            version=version
+        )
+        local_db.add(rag_entry)
+    
+    local_db.commit()
+
+def save_stage_timings(local_db: Session, contract_id: int, stage_timings: dict):
+    """Store the document's complete stage timings, including stages after the contract was saved"""
+    contract = local_db.query(models.Contract).filter(models.Contract.id == contract_id).first()
+    if contract:
+        # Reassign so SQLAlchemy sees the JSON column change
+        contract.extracted_metadata = {**(contract.extracted_metadata or {}), "stage_timings": stage_timings}
+        local_db.commit()
+
+def set_document_status(local_db: Session, document_id: int, status: str, version: Optional[int] = None):
+    """Update a document's processing status"""
+    document = local_db.query(models.Document)\
+        .filter(models.Document.id == document_id)\
+        .first()
+    if not document:
+        return None
+    document.status = status
+    if version is not None:
+        document.version = version
+    local_db.commit()
+    return document
+
+async def process_document_async(document_id: int, file_content: bytes,
+                                 is_amendment: bool = False, parent_document_id: Optional[int] = None):
+    """Enhanced async processing with versioning.
+    
+    Runs on the event loop: OpenAI calls are awaited, while PDF parsing and
+    database work go to the threadpool. Uses its own session from the worker
+    pool; the request's session is closed once the response is sent.
+    """
+    timings = metrics.StageTimings()
     try:
         print(f"Starting enhanced async processing for document {document_id}")
         
-        from app.database import SessionLocal
-        local_db = SessionLocal()
+        local_db = WorkerSessionLocal()
         
         try:
             # Update document status
-            document = local_db.query(models.Document)\
-                .filter(models.Document.id == document_id)\
-                .first()
+            document = await run_in_threadpool(set_document_status, local_db, document_id, "processing")
             
             if not document:
                 print(f"Document {document_id} not found")
                 return
-                
-            document.status = "processing"
-            local_db.commit()
             
             # Extract text with metadata
             print(f"Extracting text from PDF for document {document_id}")
-            text = processor.extract_text_from_pdf(file_content)
-            pdf_metadata = {"page_count": "Unknown", "extraction_method": "PyPDF2"}
+            await status_broker.publish(document_id, "extracting")
+            pdf_stats = {}
+            with timings.stage("pdf_parse"):
+                text = await run_in_threadpool(processor.extract_text_from_pdf, file_content, pdf_stats)
+            pdf_metadata = {
+                "page_count": pdf_stats.get("page_count", "Unknown"),
+                "extraction_method": "PyPDF2+OCR" if pdf_stats.get("ocr_pages") else "PyPDF2",
+                "ocr_pages": pdf_stats.get("ocr_pages", 0),
+            }
             
             if not text or len(text.strip()) < 50:
                 print(f"No substantial text extracted from document {document_id}")
-                document.status = "failed: No text extracted"
-                local_db.commit()
+                message = "No text extracted"
+                if pdf_stats.get("pages_without_text"):
+                    message += f" ({pdf_stats['pages_without_text']} scanned pages, {pdf_stats.get('ocr_pages', 0)} OCRed)"
+                await run_in_threadpool(set_document_status, local_db, document_id, f"failed: {message}")
+                await status_broker.publish(document_id, "failed", message=message)
                 return
             
             print(f"Text extracted, length: {len(text)} characters")
             
             # Process contract
             print(f"Processing contract with enhanced extraction")
-            extraction = processor.process_contract(text, pdf_metadata)
-            
-            print(f"Extraction completed, confidence: {extraction.get('confidence_score')}")
-            
-            # Handle versioning if this is an amendment
-            previous_contract = None
-            version = 1
-            
-            if is_amendment and parent_document_id:
-                # Find the latest version of the parent contract
-                parent_doc = local_db.query(models.Document)\
-                    .filter(models.Document.id == parent_document_id)\
-                    .first()
-                
-                if parent_doc:
-                    previous_contract = local_db.query(models.Contract)\
-                        .filter(models.Contract.document_id == parent_doc.id)\
-                        .order_by(models.Contract.version.desc())\
-                        .first()
-                    
-                    if previous_contract:
-                        version = previous_contract.version + 1
-                        
-                        # Prepare extraction data from previous contract
-                        previous_extraction = {
-                            "contract_type": previous_contract.contract_type,
-                            "contract_subtype": previous_contract.contract_subtype,
-                            "master_agreement_id": previous_contract.master_agreement_id,
-                            "parties": previous_contract.parties,
-                            "dates": {
-                                "effective_date": previous_contract.effective_date,
-                                "expiration_date": previous_contract.expiration_date,
-                                "execution_date": previous_contract.execution_date,
-                                "termination_date": previous_contract.termination_date,
-                            },
-                            "financial": {
-                                "total_value": previous_contract.total_value,
-                                "currency": previous_contract.currency,
-                                "payment_terms": previous_contract.payment_terms,
-                                "billing_frequency": previous_contract.billing_frequency,
-                            },
-                            "clauses": previous_contract.clauses or {},
-                            "key_fields": previous_contract.key_fields or {},
-                            "confidence_score": previous_contract.confidence_score,
-                        }
-                        
-                        # Compare versions using full extraction
-                        comparison = processor.compare_versions(
-                            previous_extraction,
-                            extraction
-                        )
-                        
-                        # Store deltas
-                        for delta in comparison.get("deltas", []):
-                            contract_delta = models.ContractDelta(
-                                contract_id=previous_contract.id,
-                                previous_version_id=previous_contract.previous_version_id,
-                                field_name=delta["field_name"],
-                                old_value=json.dumps(delta["old_value"]) if delta["old_value"] else None,
-                                new_value=json.dumps(delta["new_value"]) if delta["new_value"] else None,
-                                change_type=delta["change_type"],
-                                confidence_change=comparison.get("confidence_change")
-                            )
-                            local_db.add(contract_delta)
-            
-            # Fix the signatories extraction
-            signatories_list = []
-            
-            # Try different possible locations for signatories
-            if extraction.get("contact_information") and extraction["contact_information"].get("signatories"):
-                signatories_list = extraction["contact_information"]["signatories"]
-            elif extraction.get("signatories"):
-                signatories_list = extraction["signatories"]
+            async def chunk_progress(done: int, total: int):
+                await status_broker.publish(document_id, "chunk", chunk=done, chunks=total)
             
-            # Fix the contacts extraction
-            contacts_list = []
+            extraction = await processor.process_contract(text, pdf_metadata, timings, chunk_progress)
             
-            if extraction.get("contact_information") and extraction["contact_information"].get("administrative_contacts"):
-                contacts_list = extraction["contact_information"]["administrative_contacts"]
-            elif extraction.get("contacts"):
-                contacts_list = extraction["contacts"]
-            
-            # Helper function to extract risk factors
-            def extract_risk_factors(extraction_data):
-                """Extract risk factors from the extraction result"""
-                risk_factors = []
-                
-                # Check for high risk indicators
-                risk_indicators = extraction_data.get("risk_indicators", {})
-                
-                if risk_indicators.get("auto_renewal"):
-                    risk_factors.append({
-                        "factor": "Auto Renewal",
-                        "severity": "medium",
-                        "mitigation": "Set calendar reminder before renewal period",
-                        "confidence": 0.9
-                    })
-                
-                if risk_indicators.get("unlimited_liability"):
-                    risk_factors.append({
-                        "factor": "Unlimited Liability",
-                        "severity": "high",
-                        "mitigation": "Negotiate liability cap",
-                        "confidence": 0.8
-                    })
-                
-                if risk_indicators.get("penalty_clauses"):
-                    risk_factors.append({
-                        "factor": "Penalty Clauses",
-                        "severity": "medium",
-                        "mitigation": "Review penalty terms",
-                        "confidence": 0.7
-                    })
-                
-                # Add risk based on contract value
-                financial = extraction_data.get("financial", {})
-                if financial.get("total_value", 0) > 1000000:
-                    risk_factors.append({
-                        "factor": "High Contract Value",
-                        "severity": "high" if financial.get("total_value", 0) > 5000000 else "medium",
-                        "mitigation": "Additional review required",
-                        "confidence": 1.0
-                    })
-                
-                # Add risk based on expiration
-                dates = extraction_data.get("dates", {})
-                if dates.get("expiration_date"):
-                    try:
-                        exp_date = datetime.fromisoformat(dates["expiration_date"].replace('Z', '+00:00'))
-                        days_remaining = (exp_date - datetime.now()).days
-                        if days_remaining < 90:
-                            risk_factors.append({
-                                "factor": "Contract Expiring Soon",
-                                "severity": "high" if days_remaining < 30 else "medium",
-                                "mitigation": "Initiate renewal process",
-                                "confidence": 1.0
-                            })
-                    except:
-                        pass
-                
-                return risk_factors
-            
-            # Get risk factors
-            risk_factors_list = extract_risk_factors(extraction)
-            
-            # Helper function to clean date values
-            def clean_date(date_value):
-                """Convert empty strings to None for date fields"""
-                if not date_value or date_value == "" or date_value == "Unknown":
-                    return None
-                return date_value
-
-            # Save contract with all extracted fields
-            contract = models.Contract(
-                document_id=document_id,
-                contract_type=extraction.get("contract_type", "Unknown"),
-                contract_subtype=extraction.get("contract_subtype"),
-                master_agreement_id=extraction.get("master_agreement_id"),
-                parties=extraction.get("parties", []),
-                effective_date=clean_date(extraction.get("dates", {}).get("effective_date")),
-                expiration_date=clean_date(extraction.get("dates", {}).get("expiration_date")),
-                execution_date=clean_date(extraction.get("dates", {}).get("execution_date")),
-                termination_date=clean_date(extraction.get("dates", {}).get("termination_date")),
-                total_value=extraction.get("financial", {}).get("total_value"),
-                currency=extraction.get("financial", {}).get("currency"),
-                payment_terms=extraction.get("financial", {}).get("payment_terms"),
-                billing_frequency=extraction.get("financial", {}).get("billing_frequency"),
-                signatories=signatories_list,
-                contacts=contacts_list,
-                auto_renewal=extraction.get("risk_indicators", {}).get("auto_renewal"),
-                renewal_notice_period=extraction.get("dates", {}).get("notice_period_days"),
-                termination_notice_period=extraction.get("dates", {}).get("notice_period_days"),
-                governing_law=extraction.get("key_fields", {}).get("governing_law", {}).get("value") if extraction.get("key_fields", {}).get("governing_law") else None,
-                jurisdiction=extraction.get("key_fields", {}).get("governing_law", {}).get("value") if extraction.get("key_fields", {}).get("governing_law") else None,
-                confidentiality=extraction.get("clauses", {}).get("confidentiality") is not None,
-                indemnification=extraction.get("clauses", {}).get("indemnification") is not None,
-                liability_cap=extraction.get("key_fields", {}).get("liability_cap", {}).get("value") if extraction.get("key_fields", {}).get("liability_cap") else None,
-                insurance_requirements=extraction.get("compliance_requirements", {}).get("minimum_coverage"),
-                service_levels=extraction.get("service_levels", {}),
-                deliverables=extraction.get("deliverables", []),
-                risk_score=extraction.get("risk_score", 0.0),
-                risk_factors=risk_factors_list,
-                clauses=extraction.get("clauses", {}),
-                key_fields=extraction.get("key_fields", {}),
-                extracted_metadata=extraction.get("metadata", {}),
-                confidence_score=extraction.get("confidence_score", 0.0),
-                version=version,
-                previous_version_id=previous_contract.id if previous_contract else None,
-                change_summary=f"Amendment detected with {len(extraction.get('clauses', {}))} clauses" if is_amendment else "Initial extraction",
-                needs_review=True,
-            )
-
-            local_db.add(contract)
-            local_db.commit()
-            local_db.refresh(contract)
+            print(f"Extraction completed, confidence: {extraction.get('confidence_score')}")
             
-            print(f"Contract saved with ID: {contract.id}, Version: {version}")
+            with timings.stage("save_extraction"):
+                contract = await run_in_threadpool(
+                    save_contract_extraction,
+                    local_db, document_id, extraction, is_amendment, parent_document_id
+                )
+            # Plain values from here on: later commits expire the ORM instance
+            contract_id, version, contract_clauses = contract.id, contract.version, contract.clauses
+            # An amendment adds deltas to the previous version; drop its cached responses
+            response_cache.invalidate_contract(contract.previous_version_id)
             
             # Create embeddings for RAG
-            print(f"Creating embeddings for contract {contract.id}")
-            rag = RAGEngine()
-            embeddings = rag.create_embeddings(text)
+            print(f"Creating embeddings for contract {contract_id}")
+            await status_broker.publish(document_id, "embedding", contract_id=contract_id)
+            with timings.stage("embedding"):
+                embeddings = await rag_engine.create_embeddings(text)
+            with timings.stage("save_embeddings"):
+                await run_in_threadpool(save_rag_embeddings, local_db, contract_id, version, embeddings)
             
-            for emb in embeddings:
-                rag_entry = models.RAGEmbedding(
-                    contract_id=contract.id,
-                    text_chunk=emb["text_chunk"],
-                    embedding=emb["embedding"],
-                    chunk_metadata=emb["metadata"],
-                    version=version
-                )
-                local_db.add(rag_entry)
+            # Clause-level embeddings for the similarity index
+            try:
+                with timings.stage("clause_index"):
+                    clause_count = await index_contract_clauses(contract_id, contract_clauses, local_db, rag_engine)
+                print(f"Indexed {clause_count} clauses for contract {contract_id}")
+            except Exception as e:
+                print(f"Error indexing clauses for contract {contract_id}: {e}")
             
-            local_db.commit()
+            await run_in_threadpool(save_stage_timings, local_db, contract_id, timings.summary())
+            response_cache.invalidate_contract(contract_id)
             
             # Update document status
-            document.status = "completed"
-            document.version = version
-            local_db.commit()
+            await run_in_threadpool(set_document_status, local_db, document_id, "completed", version)
+            await status_broker.publish(document_id, "completed", contract_id=contract_id, version=version)
             
             print(f"Document {document_id} processing completed successfully")
             
@@ -532,16 +739,13 @@ def process_document_async(document_id: int, file_content: bytes, db: Session,
             
             # Update document status to failed
             try:
-                document = local_db.query(models.Document)\
-                    .filter(models.Document.id == document_id)\
-                    .first()
-                if document:
-                    document.status = f"failed: {str(e)[:100]}"
-                    local_db.commit()
+                await run_in_threadpool(local_db.rollback)
+                await run_in_threadpool(set_document_status, local_db, document_id, f"failed: {str(e)[:100]}")
             except:
                 pass
+            await status_broker.publish(document_id, "failed", message=str(e)[:100])
         finally:
-            local_db.close()
+            await run_in_threadpool(local_db.close)
             
     except Exception as e:
         print(f"Outer error in async processing: {str(e)}")
@@ -551,6 +755,7 @@ def process_document_async(document_id: int, file_content: bytes, db: Session,
 # Update the upload endpoint to handle amendments
 @app.post("/upload", response_model=schemas.DocumentResponse)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     is_amendment: bool = False,
     parent_document_id: Optional[int] = None,
@@ -570,9 +775,11 @@ async def upload_document(
         
         # Check parent document if amendment
         if is_amendment and parent_document_id:
-            parent = db.query(models.Document).filter(
-                models.Document.id == parent_document_id
-            ).first()
+            parent = await run_in_threadpool(
+                lambda: db.query(models.Document).filter(
+                    models.Document.id == parent_document_id
+                ).first()
+            )
             if not parent:
                 raise HTTPException(status_code=404, detail="Parent document not found")
         
@@ -586,33 +793,39 @@ async def upload_document(
             parent_document_id=parent_document_id if is_amendment else None,
             amendment_type=amendment_type if is_amendment else None
         )
-        db.add(db_document)
-        db.commit()
-        db.refresh(db_document)
+        
+        def save_document():
+            db.add(db_document)
+            db.commit()
+            db.refresh(db_document)
+        
+        await run_in_threadpool(save_document)
         print(f"Document saved with ID: {db_document.id}")
         
-        # Extract text synchronously for validation
-        text = processor.extract_text_from_pdf(contents)
+        # Validate from the text layer only (CPU-bound, off the event loop). Scanned pages are OCRed by
+        # process_document_async, which reports a failure through the document status and events.
+        pdf_stats = {}
+        text = await run_in_threadpool(processor.extract_text_from_pdf, contents, pdf_stats, False)
+        needs_ocr = bool(pdf_stats.get("pages_without_text")) and pdf_stats.get("ocr") == "available"
 
-        if not text or len(text.strip()) < 50:
-            db_document.status = "failed: Could not extract text"
-            db.commit()
+        if not pdf_stats.get("page_count") or ((not text or len(text.strip()) < 50) and not needs_ocr):
+            await run_in_threadpool(set_document_status, db, db_document.id, "failed: Could not extract text")
+            detail = "Could not extract text from PDF"
+            if pdf_stats.get("pages_without_text") and pdf_stats.get("ocr") == "unavailable":
+                detail += " (scanned pages need OCR, which is not installed on the server)"
             raise HTTPException(
                 status_code=400, 
-                detail="Could not extract text from PDF"
+                detail=detail
             )
         
         print(f"Text extraction successful, starting async processing")
         
-        # Process asynchronously with amendment info
-        import threading
-        thread = threading.Thread(
-            target=process_document_async,
-            args=(db_document.id, contents, db, is_amendment, parent_document_id),
-            kwargs={} 
+        # Process on the event loop after the response is sent, with amendment info
+        background_tasks.add_task(
+            process_document_async,
+            db_document.id, contents, is_amendment, parent_document_id
         )
-        thread.daemon = True
-        thread.start()
+        await status_broker.publish(db_document.id, "queued")
         
         return db_document
         
@@ -625,10 +838,10 @@ async def upload_document(
         raise HTTPException(status_code=500, detail=str(e))
         
 @app.get("/contracts", response_model=List[schemas.ContractResponse])
-async def get_contracts(
+def get_contracts(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all contracts"""
     contracts = db.query(models.Contract)\
@@ -638,58 +851,257 @@ async def get_contracts(
     return contracts
 
 @app.get("/contracts/{contract_id}", response_model=schemas.ContractResponse)
-async def get_contract(
+def get_contract(
     contract_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Get specific contract"""
-    contract = db.query(models.Contract)\
-        .filter(models.Contract.id == contract_id)\
-        .first()
+    stamp, last_modified = contract_cache_stamp(db, contract_id)
     
-    if not contract:
-        raise HTTPException(status_code=404, detail="Contract not found")
+    def load():
+        contract = db.query(models.Contract)\
+            .filter(models.Contract.id == contract_id)\
+            .first()
+        if not contract:
+            raise HTTPException(status_code=404, detail="Contract not found")
+        return schemas.ContractResponse.model_validate(contract), [contract_id]
     
-    return contract
+    return response_cache.respond(request, "contract", f"{contract_id}:{stamp}", last_modified, load)
+
+def sync_chunk_lexical_index(db: Session):
+    """Add RAG chunks stored since the BM25 index was last synced, by any worker (and ones committed out of order)"""
+    max_id, gaps = chunk_lexical_index.pending()
+    new_rows = models.RAGEmbedding.id > max_id
+    rows = db.query(models.RAGEmbedding.id, models.RAGEmbedding.text_chunk)\
+        .filter(or_(new_rows, models.RAGEmbedding.id.in_(gaps)) if gaps else new_rows)\
+        .order_by(models.RAGEmbedding.id)\
+        .all()
+    chunk_lexical_index.add((row.id, row.text_chunk) for row in rows)
+
+# Answers are generated per result, so keep the result count bounded
+MAX_SEARCH_RESULTS = 5
 
 @app.post("/search")
 async def search_contracts(
     query: schemas.SearchQuery,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Search contracts using RAG"""
-    # Get all embeddings
-    embeddings = db.query(models.RAGEmbedding).all()
+    """Search contracts using hybrid BM25 + vector retrieval and RAG"""
+    top_k = min(query.limit, MAX_SEARCH_RESULTS)
+    candidates = max(top_k * 4, 20)
+    rankings = []
+    
+    # Lexical retrieval: exact party names, section numbers and amounts
+    if query.mode in ("hybrid", "lexical"):
+        await run_in_threadpool(sync_chunk_lexical_index, db)
+        lexical = await run_in_threadpool(chunk_lexical_index.search, query.query, candidates)
+        rankings.append([doc_id for doc_id, _ in lexical])
+    
+    # Vector retrieval (the only path that calls the embedding API). Hybrid skips it for exact-match
+    # queries (quoted phrases, section numbers, amounts, single names) unless BM25 found nothing.
+    use_vectors = query.mode == "vector" or (
+        query.mode == "hybrid" and not (is_lexical_query(query.query) and rankings[0])
+    )
+    if use_vectors:
+        embeddings = await run_in_threadpool(
+            lambda: db.query(models.RAGEmbedding.id, models.RAGEmbedding.embedding).all()
+        )
+        if embeddings:
+            similar_indices = await rag_engine.search_similar(
+                query.query,
+                [e.embedding for e in embeddings],
+                top_k=candidates
+            )
+            rankings.append([embeddings[idx].id for idx in similar_indices])
     
-    if not embeddings:
+    fused = reciprocal_rank_fusion(rankings)
+    if not fused:
         return {"results": []}
     
-    # Search similar
-    embedding_list = [e.embedding for e in embeddings]
-    similar_indices = rag_engine.search_similar(query.query, embedding_list)
+    chunk_ids = [doc_id for doc_id, _ in fused[:candidates]]
     
-    # Get relevant contracts
-    results = []
-    for idx in similar_indices:
-        emb = embeddings[idx]
-        contract = db.query(models.Contract)\
-            .filter(models.Contract.id == emb.contract_id)\
-            .first()
-        
-        if contract:
-            # Generate answer
-            answer = rag_engine.answer_query(query.query, emb.text_chunk)
-            results.append({
-                "contract_id": contract.id,
-                "contract_type": contract.contract_type,
-                "relevance_text": answer,
-                "confidence": 0.85  # Placeholder
-            })
+    def load_chunks():
+        rows = db.query(models.RAGEmbedding, models.Contract)\
+            .join(models.Contract, models.Contract.id == models.RAGEmbedding.contract_id)\
+            .filter(models.RAGEmbedding.id.in_(chunk_ids))\
+            .all()
+        return {chunk.id: (chunk, contract) for chunk, contract in rows}
+    
+    chunks = await run_in_threadpool(load_chunks)
+    
+    if query.rerank:
+        ranked = rerank(
+            query.query,
+            [(chunk_id, chunks[chunk_id][0].text_chunk) for chunk_id in chunk_ids if chunk_id in chunks],
+            top_k=top_k
+        )
+    else:
+        ranked = fused[:top_k]
+    
+    # Get relevant contracts and generate the answers concurrently
+    hits = [(chunks[chunk_id], score) for chunk_id, score in ranked if chunk_id in chunks]
+    answers = await asyncio.gather(*[
+        rag_engine.answer_query(query.query, emb.text_chunk) for (emb, _), _ in hits
+    ])
+    
+    results = [
+        {
+            "contract_id": contract.id,
+            "contract_type": contract.contract_type,
+            "relevance_text": answer,
+            "confidence": 0.85,  # Placeholder
+            "retrieval_score": round(score, 4)
+        }
+        for ((_, contract), score), answer in zip(hits, answers)
+    ]
     
     return {"results": results[:query.limit]}
 
+@app.post("/clauses/similar", response_model=List[schemas.ClauseMatch])
+async def find_similar_clauses(
+    query: schemas.ClauseSearchQuery,
+    db: Session = Depends(get_read_db)
+):
+    """Find clauses across the portfolio most similar to a given clause"""
+    await run_in_threadpool(sync_clause_index, db)
+    
+    exclude_ids = []
+    clause_type = canonical_clause_type(query.clause_type) if query.clause_type else None
+    if query.contract_id is not None and query.clause_name:
+        # Reuse the stored vector of an existing clause instead of embedding it again
+        source = await run_in_threadpool(
+            lambda: db.query(models.ClauseEmbedding).filter(
+                models.ClauseEmbedding.contract_id == query.contract_id,
+                models.ClauseEmbedding.clause_name == query.clause_name
+            ).first()
+        )
+        if not source:
+            raise HTTPException(status_code=404, detail="Clause not found")
+        vector = source.embedding
+        exclude_ids.append(source.id)
+    elif query.text:
+        vector = (await rag_engine.embed_texts([query.text]))[0]
+    else:
+        raise HTTPException(status_code=400, detail="Provide clause text or contract_id and clause_name")
+    
+    matches = await run_in_threadpool(
+        clause_index.search,
+        vector,
+        top_k=query.limit,
+        contract_ids=query.contract_ids,
+        clause_type=clause_type,
+        exclude_ids=exclude_ids
+    )
+    if not matches:
+        return []
+    
+    scores = dict(matches)
+    rows = await run_in_threadpool(
+        lambda: db.query(models.ClauseEmbedding, models.Contract.contract_type)
+            .join(models.Contract, models.Contract.id == models.ClauseEmbedding.contract_id)
+            .filter(models.ClauseEmbedding.id.in_(list(scores)))
+            .all()
+    )
+    
+    results = [
+        {
+            "clause_id": row.id,
+            "contract_id": row.contract_id,
+            "contract_type": contract_type,
+            "clause_name": row.clause_name,
+            "clause_type": row.clause_type,
+            "text": row.text,
+            "score": round(scores[row.id], 4)
+        }
+        for row, contract_type in rows
+    ]
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results
+
+@app.post("/clauses/reindex")
+async def reindex_clauses(
+    limit: int = 100,
+    after_id: int = 0,
+    db: Session = Depends(get_db)
+):
+    """Backfill clause embeddings for contracts that have none yet.
+
+    Pages by contract id: pass the returned next_after_id to continue, until
+    it is null. Contracts without clauses never get rows, so without the
+    cursor they would fill every page.
+    """
+    indexed_contracts = db.query(models.ClauseEmbedding.contract_id).distinct()
+    contracts = await run_in_threadpool(
+        lambda: db.query(models.Contract.id, models.Contract.clauses)
+            .filter(models.Contract.id > after_id, ~models.Contract.id.in_(indexed_contracts))
+            .order_by(models.Contract.id)
+            .limit(limit)
+            .all()
+    )
+    
+    contracts_indexed = clause_count = 0
+    for contract_id, contract_clauses in contracts:
+        added = await index_contract_clauses(contract_id, contract_clauses, db, rag_engine)
+        contracts_indexed += 1 if added else 0
+        clause_count += added
+    
+    return {
+        "contracts_scanned": len(contracts),
+        "contracts_indexed": contracts_indexed,
+        "clauses_indexed": clause_count,
+        "next_after_id": contracts[-1].id if len(contracts) == limit else None,
+    }
+
+@app.post("/parties/reindex")
+def reindex_parties(
+    limit: int = 500,
+    after_id: int = 0,
+    db: Session = Depends(get_db)
+):
+    """Backfill normalized parties and signatories for contracts that have none yet; page with next_after_id"""
+    return backfill_parties(db, limit, after_id)
+
+@app.get("/risk/rules")
+def get_risk_rules():
+    """The risk rule set contracts are scored with"""
+    return processor.risk_rules.spec
+
+def run_rescore(run_id: int):
+    db = WorkerSessionLocal()
+    try:
+        def invalidate(contract_ids):
+            for contract_id in contract_ids:
+                response_cache.invalidate_contract(contract_id)
+        rescore_contracts(db, processor.risk_rules, run_id, on_batch=invalidate)
+    finally:
+        db.close()
+
+@app.post("/risk/rescore")
+def rescore_portfolio(
+    background_tasks: BackgroundTasks,
+    reload_rules: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Re-score every stored contract in the background, re-reading RISK_RULES_PATH first by default"""
+    if reload_rules:
+        processor.risk_rules = load_risk_rules()
+    run_id = start_rescore_run(db, processor.risk_rules)
+    background_tasks.add_task(run_rescore, run_id)
+    return run_to_dict(db.query(models.RiskRescoreRun).filter(models.RiskRescoreRun.id == run_id).one())
+
+@app.get("/risk/rescore/{run_id}")
+def get_rescore_run(run_id: int, db: Session = Depends(get_db)):
+    """Progress and timing of a re-score run"""
+    run = db.query(models.RiskRescoreRun)\
+        .filter(models.RiskRescoreRun.id == run_id)\
+        .first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Re-score run not found")
+    return run_to_dict(run)
+
 @app.post("/contracts/{contract_id}/review")
-async def review_contract(
+def review_contract(
     contract_id: int,
     reviewed: bool = True,
     db: Session = Depends(get_db)
@@ -704,12 +1116,14 @@ async def review_contract(
     
     contract.needs_review = not reviewed
     db.commit()
+    comparison_cache.invalidate_contract(contract_id)
+    response_cache.invalidate_contract(contract_id)
     
     return {"status": "success"}
 
 
 @app.post("/contracts/compare")
-async def compare_contracts(
+def compare_contracts(
     compare_request: schemas.ContractCompareRequest,
     db: Session = Depends(get_db)
 ):
@@ -726,53 +1140,22 @@ async def compare_contracts(
         if not contract1 or not contract2:
             raise HTTPException(status_code=404, detail="One or both contracts not found")
         
-        # Prepare extraction data for comparison
-        extraction1 = {
-            "contract_type": contract1.contract_type,
-            "contract_subtype": contract1.contract_subtype,
-            "master_agreement_id": contract1.master_agreement_id,
-            "parties": contract1.parties,
-            "dates": {
-                "effective_date": contract1.effective_date,
-                "expiration_date": contract1.expiration_date,
-                "execution_date": contract1.execution_date,
-                "termination_date": contract1.termination_date,
-            },
-            "financial": {
-                "total_value": contract1.total_value,
-                "currency": contract1.currency,
-                "payment_terms": contract1.payment_terms,
-                "billing_frequency": contract1.billing_frequency,
-            },
-            "clauses": contract1.clauses or {},
-            "key_fields": contract1.key_fields or {},
-            "confidence_score": contract1.confidence_score,
-        }
+        fingerprints1 = ensure_fingerprints(contract1, db)
+        fingerprints2 = ensure_fingerprints(contract2, db)
+        digest1 = fingerprint_digest(fingerprints1)
+        digest2 = fingerprint_digest(fingerprints2)
         
-        extraction2 = {
-            "contract_type": contract2.contract_type,
-            "contract_subtype": contract2.contract_subtype,
-            "master_agreement_id": contract2.master_agreement_id,
-            "parties": contract2.parties,
-            "dates": {
-                "effective_date": contract2.effective_date,
-                "expiration_date": contract2.expiration_date,
-                "execution_date": contract2.execution_date,
-                "termination_date": contract2.termination_date,
-            },
-            "financial": {
-                "total_value": contract2.total_value,
-                "currency": contract2.currency,
-                "payment_terms": contract2.payment_terms,
-                "billing_frequency": contract2.billing_frequency,
-            },
-            "clauses": contract2.clauses or {},
-            "key_fields": contract2.key_fields or {},
-            "confidence_score": contract2.confidence_score,
-        }
+        cached = comparison_cache.get(contract1.id, contract2.id, digest1, digest2)
+        if cached is not None:
+            return cached
         
-        # Use the processor to compare
-        comparison = processor.compare_versions(extraction1, extraction2)
+        # Use the processor to compare, skipping sections whose fingerprints match
+        comparison = processor.compare_versions(
+            contract_to_extraction(contract1),
+            contract_to_extraction(contract2),
+            old_fingerprints=fingerprints1,
+            new_fingerprints=fingerprints2
+        )
         
         # Generate AI-powered comparison summary
         comparison_summary = generate_comparison_summary(
@@ -781,7 +1164,7 @@ async def compare_contracts(
             comparison.get("deltas", [])
         )
         
-        return {
+        result = {
             "contract1": {
                 "id": contract1.id,
                 "contract_type": contract1.contract_type,
@@ -798,58 +1181,118 @@ async def compare_contracts(
             "summary": comparison_summary,
             "suggested_actions": generate_suggested_actions(comparison)
         }
+        comparison_cache.set(contract1.id, contract2.id, digest1, digest2, result)
+        return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error comparing contracts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/contracts/compare/batch")
+def compare_contracts_batch(
+    batch_request: schemas.BatchCompareRequest,
+    db: Session = Depends(get_db)
+):
+    """Compare one baseline contract against many, streaming NDJSON results"""
+    baseline = db.query(models.Contract)\
+        .filter(models.Contract.id == batch_request.baseline_id)\
+        .first()
+    
+    if not baseline:
+        raise HTTPException(status_code=404, detail="Baseline contract not found")
+    
+    # Load every target in a single query
+    targets_query = db.query(models.Contract).filter(models.Contract.id != baseline.id)
+    if batch_request.contract_ids is not None:
+        targets_query = targets_query.filter(models.Contract.id.in_(batch_request.contract_ids))
+    if batch_request.contract_type:
+        targets_query = targets_query.filter(models.Contract.contract_type == batch_request.contract_type)
+    if batch_request.master_agreement_id:
+        targets_query = targets_query.filter(
+            models.Contract.master_agreement_id == batch_request.master_agreement_id
+        )
+    if batch_request.party_name:
+        targets_query = targets_query.filter(
+            models.Contract.id.in_(contracts_with_party(db, batch_request.party_name))
+        )
+    targets = targets_query.order_by(models.Contract.id).limit(batch_request.limit).all()
+    
+    # Backfill missing fingerprints with a single commit
+    missing = [c for c in [baseline] + targets if not c.fingerprints]
+    for contract in missing:
+        contract.fingerprints = section_fingerprints(contract_to_extraction(contract))
+    if missing:
+        db.commit()
+    
+    # Detach plain data from the session before streaming
+    baseline_extraction = contract_to_extraction(baseline)
+    baseline_fingerprints = baseline.fingerprints
+    target_data = [
+        (contract.id, contract_to_extraction(contract), contract.fingerprints)
+        for contract in targets
+    ]
+    
+    def stream_results():
+        tally = DeviationTally()
+        for result in compare_portfolio(
+            baseline_extraction,
+            target_data,
+            baseline_fingerprints=baseline_fingerprints,
+            max_deltas=batch_request.max_deltas,
+            tally=tally
+        ):
+            yield json.dumps({"type": "result", **result}, default=str) + "\n"
+        
+        yield json.dumps({
+            "type": "summary",
+            "baseline_id": batch_request.baseline_id,
+            **tally.summary()
+        }, default=str) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+COMPARISON_CATEGORIES = ["financial", "legal", "dates", "parties", "clauses", "other"]
+
+@lru_cache(maxsize=4096)
+def categorize_field(field_name: str) -> str:
+    """Map a delta field path to a summary category (paths repeat, so results are cached)"""
+    field_name = field_name.lower()
+    if any(term in field_name for term in ["financial", "payment", "value", "amount", "currency"]):
+        return "financial"
+    if any(term in field_name for term in ["clause", "legal", "liability", "indemn", "confidential"]):
+        return "legal"
+    if "date" in field_name:
+        return "dates"
+    if any(term in field_name for term in ["party", "parties", "signatory", "contact"]):
+        return "parties"
+    return "other"
+
 def generate_comparison_summary(contract1, contract2, deltas):
     """Generate detailed comparison summary"""
     if not deltas:
         return "No changes detected between the two versions."
     
-    # Group changes by category
-    changes_by_category = {
-        "financial": [],
-        "legal": [],
-        "dates": [],
-        "parties": [],
-        "clauses": [],
-        "other": []
-    }
-    
+    # Count changes per category and change type in a single pass
+    counts = {category: {"total": 0, "added": 0, "removed": 0, "modified": 0}
+              for category in COMPARISON_CATEGORIES}
     for delta in deltas:
-        field_name = delta["field_name"].lower()
-        
-        if any(term in field_name for term in ["financial", "payment", "value", "amount", "currency"]):
-            changes_by_category["financial"].append(delta)
-        elif any(term in field_name for term in ["clause", "legal", "liability", "indemn", "confidential"]):
-            changes_by_category["legal"].append(delta)
-        elif "date" in field_name:
-            changes_by_category["dates"].append(delta)
-        elif any(term in field_name for term in ["party", "signatory", "contact"]):
-            changes_by_category["parties"].append(delta)
-        elif "clause" in field_name:
-            changes_by_category["clauses"].append(delta)
-        else:
-            changes_by_category["other"].append(delta)
+        category_counts = counts[categorize_field(delta["field_name"])]
+        category_counts["total"] += 1
+        change_type = delta.get("change_type")
+        if change_type in category_counts:
+            category_counts[change_type] += 1
     
     # Build summary
     summary_parts = []
     
-    for category, changes in changes_by_category.items():
-        if changes:
-            count = len(changes)
-            added = sum(1 for c in changes if c.get("change_type") == "added")
-            removed = sum(1 for c in changes if c.get("change_type") == "removed")
-            modified = sum(1 for c in changes if c.get("change_type") == "modified")
-            
-            category_summary = f"{count} {category} changes"
-            if added or removed or modified:
-                details = []
-                if added: details.append(f"{added} added")
-                if removed: details.append(f"{removed} removed")
-                if modified: details.append(f"{modified} modified")
+    for category in COMPARISON_CATEGORIES:
+        category_counts = counts[category]
+        if category_counts["total"]:
+            category_summary = f"{category_counts['total']} {category} changes"
+            details = [f"{category_counts[t]} {t}" for t in ("added", "removed", "modified") if category_counts[t]]
+            if details:
                 category_summary += f" ({', '.join(details)})"
             
             summary_parts.append(category_summary)
@@ -883,7 +1326,7 @@ def generate_suggested_actions(comparison):
     return actions
 
 @app.get("/documents/{document_id}/status")
-async def get_document_status(
+def get_document_status(
     document_id: int,
     db: Session = Depends(get_db)
 ):
@@ -907,4 +1350,72 @@ async def get_document_status(
         "has_contract": contract is not None,
         "contract_id": contract.id if contract else None,
         "upload_date": document.upload_date
-    }    
\ No newline at end of file
+    }    
+
+@app.get("/alerts", response_model=List[schemas.ContractAlert])
+def get_alerts(
+    status: str = Query("open", pattern="^(open|fired|upcoming)$"),
+    kind: Optional[str] = None,
+    days: int = Query(30, ge=0, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """Contract deadline alerts: open (fired, unacknowledged), fired, or upcoming within `days`"""
+    return list_alerts(db, status, kind, days, limit)
+
+@app.post("/alerts/{alert_id}/acknowledge")
+def acknowledge_alert(
+    alert_id: int,
+    acknowledged_by: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Mark a fired alert as handled"""
+    deadline = db.query(models.ContractDeadline)\
+        .filter(models.ContractDeadline.id == alert_id)\
+        .first()
+    
+    if not deadline or deadline.fired_at is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    
+    deadline.acknowledged_at = datetime.now()
+    deadline.acknowledged_by = acknowledged_by
+    db.commit()
+    
+    return {"status": "success"}
+
+def document_status_event(document_id: int) -> Optional[dict]:
+    """Status event built from the database, for documents the broker has no event for"""
+    with SessionLocal() as db:
+        document = db.query(models.Document.status)\
+            .filter(models.Document.id == document_id)\
+            .first()
+        if not document:
+            return None
+        status = document.status or "uploaded"
+        if status == "completed":
+            contract = db.query(models.Contract.id)\
+                .filter(models.Contract.document_id == document_id)\
+                .order_by(models.Contract.version.desc())\
+                .first()
+            return make_status_event(document_id, "completed", contract_id=contract.id if contract else None)
+        if status.startswith("failed"):
+            return make_status_event(document_id, "failed", message=status)
+        return make_status_event(document_id, "queued" if status == "uploaded" else status)
+
+@app.get("/documents/{document_id}/events")
+async def stream_document_status(document_id: int):
+    """Server-sent processing status events (queued, extracting, chunk, embedding, completed/failed).
+    
+    Sends the current state first and closes after completed or failed.
+    """
+    initial = await status_broker.latest(document_id)
+    if initial is None:
+        initial = await run_in_threadpool(document_status_event, document_id)
+        if initial is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+    return StreamingResponse(
+        status_broker.stream(document_id, initial),
+        media_type="text/event-stream",
+        # Stop reverse proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
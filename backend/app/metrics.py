@@ -0,0 +1,199 @@
+"""In-process metrics with Prometheus text exposition.
+
+Each worker process keeps its own registry; scrape every worker (or run a
+single worker) to see the whole picture.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Starlette appends the charset for text/* responses
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        values = self.collect() if self.collect else {}
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[len(self.buckets)] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        lines = []
+        for key, counts in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.setdefault(metric.name, metric)
+            return self._metrics[metric.name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = (),
+          collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames, collect))
+
+
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+PIPELINE_STAGE_LATENCY = histogram(
+    "pipeline_stage_duration_seconds", "Document processing time per pipeline stage", ("stage",))
+LLM_CALL_LATENCY = histogram(
+    "llm_call_duration_seconds", "Chat completion latency per pipeline stage and model, retries included",
+    ("stage", "model"))
+LLM_TOKENS = counter("llm_tokens_total", "Tokens used per pipeline stage and model", ("stage", "model", "type"))
+OPENAI_ATTEMPT_LATENCY = histogram(
+    "openai_attempt_duration_seconds", "Latency of single OpenAI API attempts", ("kind", "outcome"))
+OPENAI_RETRIES = counter("openai_retries_total", "OpenAI calls retried after a transient error", ("kind", "error"))
+OPENAI_FAILURES = counter("openai_failures_total", "OpenAI calls that failed after all retries", ("kind",))
+OPENAI_TOKENS = counter("openai_tokens_total", "Tokens consumed per OpenAI request kind", ("kind",))
+
+
+class StageTimings:
+    """Wall-clock timings of one document's pipeline stages, also exported as metrics"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        # Stages that run more than once (e.g. per retry) accumulate
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        PIPELINE_STAGE_LATENCY.observe(seconds, stage=name)
+
+    def summary(self) -> Dict[str, float]:
+        summary = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        summary["total"] = round(time.perf_counter() - self._started, 4)
+        return summary
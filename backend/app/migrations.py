@@ -0,0 +1,237 @@
+"""Schema migrations: create and upgrade the database from the models.
+
+Applied versions are recorded in `schema_migrations`. `migrate` runs the
+pending ones in order inside a single transaction, holding a PostgreSQL
+advisory lock so several workers starting together don't race. On
+PostgreSQL the search indexes are then built outside that transaction
+with CREATE INDEX CONCURRENTLY, so upgrading a large database doesn't
+block writes to contracts. Run it by hand with:
+
+    cd backend && python -m app.migrations
+
+Migrations must be idempotent (check before creating) because version 1
+creates whatever the current models define: a fresh database already has
+the tables and indexes later versions add to older ones. They must also
+not load whole ORM entities: the models describe the newest schema, and
+columns added by later versions don't exist yet when an older database is
+upgraded. Query the columns a migration needs instead.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+from . import models
+
+# Arbitrary constant identifying this application's migration lock
+ADVISORY_LOCK_ID = 4_207_310_042
+# Held by the worker building indexes concurrently; separate so it never waits on a migrating worker
+INDEX_LOCK_ID = ADVISORY_LOCK_ID + 1
+
+_bookkeeping = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _bookkeeping,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def _create_tables(conn: Connection):
+    models.Base.metadata.create_all(bind=conn)
+
+
+def _add_missing_columns(conn: Connection):
+    """Columns the models gained after a table was created (by database/init.sql or an older release).
+
+    Added as plain nullable columns; server defaults such as now() are left
+    out because SQLite can't add a column with a non-constant default.
+    As version 2 this also ships contracts.fingerprints, which was added to
+    the model before migrations existed (create_all never altered existing
+    tables, so older databases lack it).
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+                print(f"Added column {table.name}.{column.name}")
+
+
+def _jsonb_clauses(conn: Connection):
+    """PostgreSQL only: GIN indexes need JSONB, create_all used to make `clauses` plain JSON"""
+    if conn.dialect.name != "postgresql":
+        return
+    columns = {column["name"]: column["type"] for column in inspect(conn).get_columns("contracts")}
+    if "clauses" in columns and columns["clauses"].__class__.__name__ != "JSONB":
+        conn.exec_driver_sql("ALTER TABLE contracts ALTER COLUMN clauses TYPE jsonb USING clauses::jsonb")
+
+
+# Tables whose indexes migration 4 adds to existing (possibly large) databases
+SEARCH_INDEX_TABLES = (models.Contract.__table__, models.Party.__table__)
+
+
+def _search_indexes(conn: Connection):
+    """Composite and partial indexes declared on Contract and Party (dialect-specific ones only where they apply).
+
+    PostgreSQL can't build an index concurrently inside a transaction, and
+    a plain CREATE INDEX blocks writes for the whole build, so there they
+    are left to create_indexes_concurrently, which migrate runs after
+    committing.
+    """
+    if conn.dialect.name == "postgresql":
+        return
+    for table in SEARCH_INDEX_TABLES:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _contract_deadlines(conn: Connection):
+    """Deadline table for the alert scheduler, filled from the latest version of existing contracts"""
+    from sqlalchemy.orm import Session
+
+    from .alerts import backfill_deadlines
+
+    models.ContractDeadline.__table__.create(bind=conn, checkfirst=True)
+    for index in models.ContractDeadline.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+    session = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        created = backfill_deadlines(session)
+    finally:
+        session.close()
+    if created:
+        print(f"Backfilled {created} contract deadlines")
+
+
+def _risk_rules(conn: Connection):
+    """Rule version and indicator columns on contracts, and the re-score run log"""
+    _add_missing_columns(conn)
+    models.RiskRescoreRun.__table__.create(bind=conn, checkfirst=True)
+
+
+def _backfill_risk_indicators(conn: Connection):
+    """risk_indicators for contracts stored before migration 6, read back from their risk factors"""
+    from sqlalchemy import bindparam, update
+
+    from .agents.risk_rules import indicators_from_factors
+
+    contracts = models.Contract.__table__
+    last_id = 0
+    filled = 0
+    while True:
+        rows = conn.execute(
+            select(contracts.c.id, contracts.c.risk_factors, contracts.c.auto_renewal)
+            .where(contracts.c.risk_indicators.is_(None), contracts.c.id > last_id)
+            .order_by(contracts.c.id)
+            .limit(1000)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update(contracts).where(contracts.c.id == bindparam("contract_id")),
+            [{"contract_id": row.id, "risk_indicators": indicators_from_factors(row.risk_factors, row.auto_renewal)}
+             for row in rows],
+        )
+        filled += len(rows)
+        last_id = rows[-1].id
+    if filled:
+        print(f"Backfilled risk indicators for {filled} contracts")
+
+
+# (version, description, upgrade); append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables defined by the models", _create_tables),
+    (2, "add columns missing from tables created by init.sql or older releases", _add_missing_columns),
+    (3, "store contracts.clauses as JSONB on PostgreSQL", _jsonb_clauses),
+    (4, "composite and partial indexes for the dashboard and search filters", _search_indexes),
+    (5, "contract deadlines for renewal, termination and expiry alerts", _contract_deadlines),
+    (6, "risk rule versions on contracts and the re-score run log", _risk_rules),
+    (7, "risk indicators for contracts stored before they were kept", _backfill_risk_indicators),
+]
+
+
+def concurrent_indexes() -> List[Index]:
+    """Copies of the search indexes that compile to CREATE INDEX CONCURRENTLY on PostgreSQL"""
+    scratch = MetaData()
+    indexes = []
+    for table in SEARCH_INDEX_TABLES:
+        for index in table.to_metadata(scratch).indexes:
+            index.dialect_options["postgresql"]["concurrently"] = True
+            indexes.append(index)
+    return indexes
+
+
+def create_indexes_concurrently(engine: Engine) -> List[str]:
+    """PostgreSQL: build search indexes that are missing or were left invalid by an interrupted build.
+
+    Runs on an autocommit connection after the migration transaction, on
+    every start, so a build cut short is retried. One worker builds at a
+    time; the others skip rather than wait, since a worker blocked on the
+    lock would hold a snapshot the build has to wait out. Returns the
+    names built.
+    """
+    built: List[str] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not conn.exec_driver_sql(f"SELECT pg_try_advisory_lock({INDEX_LOCK_ID})").scalar():
+            return built
+        try:
+            valid = dict(conn.exec_driver_sql(
+                "SELECT index_class.relname, pg_index.indisvalid FROM pg_index"
+                " JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid"
+                " JOIN pg_class table_class ON table_class.oid = pg_index.indrelid"
+                " WHERE table_class.relname = ANY(%(tables)s)",
+                {"tables": [table.name for table in SEARCH_INDEX_TABLES]},
+            ).all())
+            quote = conn.dialect.identifier_preparer.quote
+            for index in concurrent_indexes():
+                if valid.get(index.name):
+                    continue
+                if index.name in valid:
+                    conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(index.name)}")
+                print(f"Building index {index.name} concurrently")
+                index.create(bind=conn)
+                built.append(index.name)
+        finally:
+            conn.exec_driver_sql(f"SELECT pg_advisory_unlock({INDEX_LOCK_ID})")
+    return built
+
+
+def applied_versions(conn: Connection) -> List[int]:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return []
+    return list(conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version)).scalars())
+
+
+def migrate(engine: Engine) -> List[int]:
+    """Apply pending migrations; returns the versions applied"""
+    applied: List[int] = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Released at commit; a second worker waits here, then finds nothing pending
+            conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({ADVISORY_LOCK_ID})")
+        _bookkeeping.create_all(bind=conn)
+        done = set(applied_versions(conn))
+        for version, description, upgrade in MIGRATIONS:
+            if version in done:
+                continue
+            print(f"Applying migration {version}: {description}")
+            upgrade(conn)
+            conn.execute(insert(schema_migrations).values(version=version, description=description))
+            applied.append(version)
+    if engine.dialect.name == "postgresql":
+        create_indexes_concurrently(engine)
+    return applied
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    versions = migrate(engine)
+    print(f"Applied migrations: {versions}" if versions else "Database schema is up to date")
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# JSON everywhere, JSONB on PostgreSQL so the column can carry a GIN index
+SearchableJSON = JSON().with_variant(JSONB(), "postgresql")
+
 class Document(Base):
     __tablename__ = "documents"
     
@@ -23,6 +27,25 @@ class Document(Base):
 
 class Contract(Base):
     __tablename__ = "contracts"
+    __table_args__ = (
+        # Dashboard counts (/contracts/summary) and /contracts/search filters.
+        # Created on existing databases by app.migrations; benchmarks.check_query_plans asserts they are used.
+        Index("ix_contracts_expiration_date", "expiration_date",
+              postgresql_where=text("expiration_date IS NOT NULL"),
+              sqlite_where=text("expiration_date IS NOT NULL")),
+        Index("ix_contracts_termination_date", "termination_date",
+              postgresql_where=text("termination_date IS NOT NULL"),
+              sqlite_where=text("termination_date IS NOT NULL")),
+        Index("ix_contracts_effective_expiration", "effective_date", "expiration_date"),
+        Index("ix_contracts_risk_score", "risk_score"),
+        # The review queue is small next to the reviewed backlog; covers "needs review" counts and risk filters on it
+        Index("ix_contracts_review_queue", "risk_score",
+              postgresql_where=text("needs_review"),
+              sqlite_where=text("needs_review = 1")),
+        Index("ix_contracts_total_value", "total_value"),
+        Index("ix_contracts_currency_total_value", "currency", "total_value"),
+        Index("ix_contracts_clauses_gin", "clauses", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey('documents.id'), index=True)
@@ -65,11 +88,15 @@ class Contract(Base):
     # Risk Indicators
     risk_score = Column(Float, default=0.0)
     risk_factors = Column(JSON, nullable=True)
+    risk_indicators = Column(JSON, nullable=True)  # As extracted; input to the risk rules on re-score
+    risk_rules_version = Column(String, nullable=True)  # Rule set that produced risk_score (app.agents.risk_rules)
+    risk_scored_at = Column(DateTime(timezone=True), nullable=True)
     
     # Clauses and Fields - CHANGED: metadata -> extracted_metadata
-    clauses = Column(JSON)
+    clauses = Column(SearchableJSON)
     key_fields = Column(JSON)
     extracted_metadata = Column(JSON, nullable=True)  # Changed from 'metadata' to 'extracted_metadata'
+    fingerprints = Column(JSON, nullable=True)  # Per-section content digests, computed at ingest; migration 2 adds it
     
     # Tracking
     extraction_date = Column(DateTime(timezone=True), server_default=func.now())
@@ -114,4 +141,107 @@ class RAGEmbedding(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
-    contract = relationship("Contract")
\ No newline at end of file
+    contract = relationship("Contract")
+
+class ClauseEmbedding(Base):
+    __tablename__ = "clause_embeddings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contract_id = Column(Integer, ForeignKey('contracts.id'), index=True)
+    clause_name = Column(String)
+    clause_type = Column(String, index=True)
+    text = Column(Text)
+    embedding = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationship
+    contract = relationship("Contract")
+
+class Party(Base):
+    __tablename__ = "parties"
+    __table_args__ = (
+        # Prefix LIKE on a non-C collation needs pattern ops to use a btree (app.parties.contracts_with_party)
+        Index("ix_parties_normalized_name_pattern", "normalized_name",
+              postgresql_ops={"normalized_name": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_name = Column(String, nullable=False, unique=True, index=True)  # See app.parties.normalize_party_name
+    display_name = Column(String, nullable=False)
+    aliases = Column(JSON, nullable=True)  # Every spelling seen in extractions
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    contracts = relationship("ContractParty", back_populates="party")
+
+class ContractParty(Base):
+    __tablename__ = "contract_parties"
+    __table_args__ = (
+        UniqueConstraint("contract_id", "party_id", name="uq_contract_parties_contract_party"),
+        # Counterparty lookups go party -> contracts
+        Index("ix_contract_parties_party_contract", "party_id", "contract_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contract_id = Column(Integer, ForeignKey('contracts.id', ondelete="CASCADE"), nullable=False, index=True)
+    party_id = Column(Integer, ForeignKey('parties.id', ondelete="CASCADE"), nullable=False)
+    name_as_written = Column(String, nullable=True)
+    role = Column(String, nullable=True)
+    
+    # Relationships
+    contract = relationship("Contract")
+    party = relationship("Party", back_populates="contracts")
+
+class Signatory(Base):
+    __tablename__ = "signatories"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contract_id = Column(Integer, ForeignKey('contracts.id', ondelete="CASCADE"), nullable=False, index=True)
+    party_id = Column(Integer, ForeignKey('parties.id'), nullable=True, index=True)
+    name = Column(String, nullable=True)
+    normalized_name = Column(String, nullable=True, index=True)
+    title = Column(String, nullable=True)
+    email = Column(String, nullable=True, index=True)
+    signature_date = Column(String, nullable=True)
+    
+    # Relationships
+    contract = relationship("Contract")
+    party = relationship("Party")
+
+class ContractDeadline(Base):
+    __tablename__ = "contract_deadlines"
+    __table_args__ = (
+        # The alert scheduler reads the next window of pending alerts (app.alerts); fired rows drop out of it
+        Index("ix_contract_deadlines_pending", "alert_at",
+              postgresql_where=text("fired_at IS NULL"),
+              sqlite_where=text("fired_at IS NULL")),
+        # Open alerts for /alerts
+        Index("ix_contract_deadlines_open", "fired_at",
+              postgresql_where=text("fired_at IS NOT NULL AND acknowledged_at IS NULL"),
+              sqlite_where=text("fired_at IS NOT NULL AND acknowledged_at IS NULL")),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    contract_id = Column(Integer, ForeignKey('contracts.id', ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String, nullable=False)  # renewal_notice, termination_notice, expiration
+    deadline_at = Column(DateTime, nullable=False, index=True)  # The date itself, e.g. last day to give notice
+    alert_at = Column(DateTime, nullable=False)  # deadline_at minus the lead time for its kind
+    fired_at = Column(DateTime, nullable=True)
+    acknowledged_at = Column(DateTime, nullable=True)
+    acknowledged_by = Column(String, nullable=True)
+    
+    # Relationship
+    contract = relationship("Contract")
+
+class RiskRescoreRun(Base):
+    __tablename__ = "risk_rescore_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    rules_version = Column(String, nullable=False)
+    status = Column(String, default="running")  # running, completed, failed
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    contracts_scored = Column(Integer, default=0)
+    contracts_changed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
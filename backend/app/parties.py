@@ -0,0 +1,162 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session
+
+from . import models
+
+# Trailing corporate designators that don't distinguish one party from another
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "l l c", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "s a", "bv", "nv", "lp", "llp", "pllc", "pte", "pty", "srl", "spa",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_SUFFIX = re.compile(r"(?:\s+(?:" + "|".join(sorted((re.escape(s) for s in LEGAL_SUFFIXES), key=len, reverse=True)) + r"))+$")
+
+
+def normalize_party_name(name: str) -> str:
+    """Canonical key for an organisation: "ACME Holdings, L.L.C." and "Acme Holdings LLC" -> "acme holdings" """
+    text = _NON_ALNUM.sub(" ", str(name).lower()).strip()
+    text = re.sub(r"^the\s+", "", text)
+    stripped = _SUFFIX.sub("", text).strip()
+    # A name that is nothing but a suffix ("Company") keeps it
+    return stripped or text
+
+
+def normalize_person_name(name: str) -> str:
+    return _NON_ALNUM.sub(" ", str(name).lower()).strip()
+
+
+def _party_entries(parties: Any) -> List[Tuple[str, Optional[str]]]:
+    """(name as written, role) from a list of strings or {"name", "role"} dicts"""
+    entries = []
+    for party in parties or []:
+        if isinstance(party, dict):
+            name = party.get("name") or party.get("legal_name") or party.get("party")
+            role = party.get("role") or party.get("type")
+        else:
+            name, role = party, None
+        if isinstance(name, str) and name.strip():
+            entries.append((name.strip(), role if isinstance(role, str) else None))
+    return entries
+
+
+def get_or_create_parties(db: Session, names: Iterable[str]) -> Dict[str, models.Party]:
+    """Party rows keyed by normalized name, created where missing and with new spellings added as aliases"""
+    by_key: Dict[str, List[str]] = {}
+    for name in names:
+        key = normalize_party_name(name)
+        if key:
+            by_key.setdefault(key, [])
+            if name not in by_key[key]:
+                by_key[key].append(name)
+    if not by_key:
+        return {}
+
+    found = {
+        party.normalized_name: party
+        for party in db.query(models.Party).filter(models.Party.normalized_name.in_(list(by_key)))
+    }
+    for key, spellings in by_key.items():
+        party = found.get(key)
+        if party is None:
+            party = models.Party(normalized_name=key, display_name=spellings[0], aliases=spellings)
+            try:
+                # Another worker may insert the same party concurrently; the unique index decides
+                with db.begin_nested():
+                    db.add(party)
+            except IntegrityError:
+                party = db.query(models.Party).filter(models.Party.normalized_name == key).one()
+            found[key] = party
+        aliases = list(party.aliases or [])
+        new_aliases = [spelling for spelling in spellings if spelling not in aliases]
+        if new_aliases:
+            # Reassign so the JSON column change is detected
+            party.aliases = aliases + new_aliases
+    return found
+
+
+def link_contract_parties(db: Session, contract_id: int, parties: Any, signatories: Any) -> int:
+    """Write contract_parties and signatories rows for a contract; the caller commits.
+
+    Returns the number of parties linked.
+    """
+    entries = _party_entries(parties)
+    signatory_dicts = [s for s in (signatories or []) if isinstance(s, dict)]
+    signatory_companies = [
+        s.get("party") or s.get("company") or s.get("organization")
+        for s in signatory_dicts
+    ]
+    party_rows = get_or_create_parties(
+        db, [name for name, _ in entries] + [c for c in signatory_companies if isinstance(c, str) and c.strip()]
+    )
+
+    linked = {}
+    for name, role in entries:
+        party = party_rows.get(normalize_party_name(name))
+        if party is not None and party.id not in linked:
+            linked[party.id] = models.ContractParty(
+                contract_id=contract_id, party_id=party.id, name_as_written=name, role=role
+            )
+    db.add_all(linked.values())
+
+    for signatory, company in zip(signatory_dicts, signatory_companies):
+        name = signatory.get("name")
+        party = party_rows.get(normalize_party_name(company)) if isinstance(company, str) else None
+        db.add(models.Signatory(
+            contract_id=contract_id,
+            party_id=party.id if party is not None else None,
+            name=name,
+            normalized_name=normalize_person_name(name) if name else None,
+            title=signatory.get("title"),
+            email=signatory.get("email"),
+            signature_date=str(signatory["signature_date"]) if signatory.get("signature_date") else None,
+        ))
+    return len(linked)
+
+
+def contracts_with_party(db: Session, name: str) -> Query:
+    """Subquery of contract ids linked to parties matching `name`.
+
+    Prefix matches on the normalized name ("acme" -> "acme holdings") are
+    index range scans; when nothing matches, fall back to a substring match
+    over the (small) parties table rather than the contracts' JSON.
+    """
+    key = normalize_party_name(name)
+    party_ids = db.query(models.Party.id).filter(models.Party.normalized_name.like(f"{key}%"))
+    if not db.query(party_ids.exists()).scalar():
+        party_ids = db.query(models.Party.id).filter(models.Party.normalized_name.like(f"%{key}%"))
+    return db.query(models.ContractParty.contract_id).filter(models.ContractParty.party_id.in_(party_ids))
+
+
+def backfill_parties(db: Session, limit: int = 500, after_id: int = 0) -> Dict[str, Optional[int]]:
+    """Link parties and signatories for contracts ingested before the tables existed.
+
+    Pages by contract id from `after_id`; next_after_id continues the scan and
+    is None once it reaches the end. Contracts with no usable parties or
+    signatories get no rows, so without the cursor every page would pick
+    them again.
+    """
+    linked_contracts = db.query(models.ContractParty.contract_id)
+    signed_contracts = db.query(models.Signatory.contract_id)
+    contracts = db.query(models.Contract.id, models.Contract.parties, models.Contract.signatories)\
+        .filter(models.Contract.id > after_id)\
+        .filter(~models.Contract.id.in_(linked_contracts), ~models.Contract.id.in_(signed_contracts))\
+        .order_by(models.Contract.id)\
+        .limit(limit)\
+        .all()
+    links = contracts_linked = 0
+    for contract_id, parties, signatories in contracts:
+        added = link_contract_parties(db, contract_id, parties, signatories)
+        links += added
+        if added or any(isinstance(s, dict) for s in (signatories or [])):
+            contracts_linked += 1
+    db.commit()
+    return {
+        "contracts_scanned": len(contracts),
+        "contracts_linked": contracts_linked,
+        "party_links": links,
+        "next_after_id": contracts[-1].id if len(contracts) == limit else None,
+    }
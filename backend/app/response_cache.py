@@ -0,0 +1,190 @@
+"""Read-through cache of serialized GET responses with ETag / Last-Modified validation.
+
+Entries hold the encoded JSON body, so a hit skips both the large JSON
+columns and pydantic serialization. Keys carry the contract's version and
+last-modified stamp (deltas also the newest delta id, since ingesting a
+new version adds deltas without touching the parent row), and entries are tagged with the contract ids they were
+built from so a review or an ingest can drop them.
+
+The default backend is an in-process LRU. With several workers each one
+only sees the invalidations it performed itself (entries still expire after
+RESPONSE_CACHE_TTL seconds); set RESPONSE_CACHE_URL=redis://... to share
+entries and invalidations between workers. That backend needs the `redis`
+package, which is not a hard dependency.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from . import metrics, serialization
+
+# (etag, last-modified http date or "", encoded body)
+CachedResponse = Tuple[str, str, bytes]
+
+CACHE_REQUESTS = metrics.counter(
+    "response_cache_requests_total", "Cached GET endpoints by outcome (hit, miss, not_modified)", ("kind", "result"))
+
+
+class LRUBackend:
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str]):
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tag: str):
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+            self._tags.pop(tag, None)
+
+    def _drop(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared backend; a tag is a Redis set of the keys built from that contract"""
+
+    def __init__(self, url: str, ttl: float = 300.0, prefix: str = "response-cache:"):
+        import redis  # optional dependency, only needed when RESPONSE_CACHE_URL is set
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        etag, last_modified, body = raw.split(b"\n", 2)
+        return etag.decode(), last_modified.decode(), body
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str]):
+        etag, last_modified, body = value
+        pipe = self.client.pipeline()
+        pipe.setex(self.prefix + key, self.ttl, etag.encode() + b"\n" + last_modified.encode() + b"\n" + body)
+        for tag in tags:
+            pipe.sadd(self.prefix + "tag:" + tag, self.prefix + key)
+            pipe.expire(self.prefix + "tag:" + tag, self.ttl)
+        pipe.execute()
+
+    def invalidate(self, tag: str):
+        tag_key = self.prefix + "tag:" + tag
+        keys = self.client.smembers(tag_key)
+        self.client.delete(tag_key, *keys)
+
+    def __len__(self) -> int:
+        return -1  # unknown without a scan
+
+
+def backend_from_env():
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    url = os.getenv("RESPONSE_CACHE_URL")
+    if url:
+        return RedisBackend(url, ttl)
+    return LRUBackend(max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")), ttl=ttl)
+
+
+def http_date(value: Optional[datetime]) -> str:
+    if value is None:
+        return ""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def encode_json(content: Any) -> bytes:
+    """The same JSON the API's default response class would send"""
+    if isinstance(content, BaseModel):
+        # pydantic's own serializer skips jsonable_encoder's Python-level walk of large JSON columns
+        return content.model_dump_json().encode("utf-8")
+    return serialization.dumps(jsonable_encoder(content))
+
+
+def _not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else backend_from_env()
+
+    def respond(self, request: Request, kind: str, key: str, last_modified: Optional[datetime],
+                load: Callable[[], Tuple[Any, Iterable[int]]]) -> Response:
+        """Serve `kind:key` from the cache, or call `load` -> (content, contract ids it depends on) and store it"""
+        cache_key = f"{kind}:{key}"
+        entry = self.backend.get(cache_key)
+        result = "hit"
+        if entry is None:
+            result = "miss"
+            content, contract_ids = load()
+            body = encode_json(content)
+            etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+            entry = (etag, http_date(last_modified), body)
+            self.backend.set(cache_key, entry, [f"contract:{contract_id}" for contract_id in contract_ids])
+
+        etag, last_modified_header, body = entry
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if last_modified_header:
+            headers["Last-Modified"] = last_modified_header
+        if _not_modified(request, etag, last_modified_header):
+            CACHE_REQUESTS.inc(kind=kind, result="not_modified")
+            return Response(status_code=304, headers=headers)
+        CACHE_REQUESTS.inc(kind=kind, result=result)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate_contract(self, contract_id: Optional[int]):
+        if contract_id is not None:
+            self.backend.invalidate(f"contract:{contract_id}")
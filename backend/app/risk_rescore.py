@@ -0,0 +1,126 @@
+"""Portfolio risk re-scoring: apply the current risk rules to every stored contract.
+
+Contracts are read in primary-key order, RESCORE_BATCH_SIZE at a time and
+only the columns the rules use, scored column-wise by
+app.agents.risk_rules, and written back with one executemany UPDATE per
+batch. Each run is logged in risk_rescore_runs with the rule version, the
+counts and how long it took; every contract records the rule version that
+produced its score. Run it after changing the rules (or on a schedule,
+since expiry-based rules move with the calendar):
+
+    cd backend && python -m app.risk_rescore
+"""
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from . import metrics, models
+from .agents.risk_rules import RiskRules, indicators_from_factors
+
+RESCORE_BATCH_SIZE = int(os.getenv("RISK_RESCORE_BATCH_SIZE", "2000"))
+
+RESCORE_SECONDS = metrics.histogram("risk_rescore_seconds", "Duration of portfolio risk re-scoring runs",
+                                    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+
+
+def run_to_dict(run: models.RiskRescoreRun) -> Dict:
+    return {
+        "id": run.id,
+        "rules_version": run.rules_version,
+        "status": run.status,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "duration_seconds": run.duration_seconds,
+        "contracts_scored": run.contracts_scored,
+        "contracts_changed": run.contracts_changed,
+        "error": run.error,
+    }
+
+
+def start_run(db: Session, rules: RiskRules) -> int:
+    run = models.RiskRescoreRun(rules_version=rules.version, status="running")
+    db.add(run)
+    db.commit()
+    return run.id
+
+
+def rescore_contracts(db: Session, rules: RiskRules, run_id: Optional[int] = None,
+                      batch_size: int = RESCORE_BATCH_SIZE,
+                      on_batch: Optional[Callable[[List[int]], None]] = None) -> Dict:
+    """Re-score every contract; returns the finished run. `on_batch(contract ids)` follows each committed batch."""
+    if run_id is None:
+        run_id = start_run(db, rules)
+    columns = [getattr(models.Contract, name) for name in rules.columns]
+    started = time.perf_counter()
+    scored = changed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.query(models.Contract.id, models.Contract.risk_score, models.Contract.risk_factors, *columns)\
+                .filter(models.Contract.id > last_id)\
+                .order_by(models.Contract.id)\
+                .limit(batch_size)\
+                .all()
+            if not rows:
+                break
+            records = [row._mapping for row in rows]
+            if "risk_indicators" in rules.columns:
+                # Contracts saved before indicators were stored would otherwise lose their indicator factors
+                records = [
+                    {**record, "risk_indicators": indicators_from_factors(record["risk_factors"], record.get("auto_renewal"))}
+                    if record["risk_indicators"] is None else record
+                    for record in records
+                ]
+            scores, factors = rules.evaluate(records)
+            scored_at = datetime.now(timezone.utc)
+            params = []
+            changed_ids = []
+            for row, score, row_factors in zip(rows, scores.tolist(), factors):
+                values = {"id": row.id, "risk_rules_version": rules.version, "risk_scored_at": scored_at}
+                if score != row.risk_score or row_factors != (row.risk_factors or []):
+                    # Only rows whose result moved get a new last_updated (and so fresh cached responses)
+                    values.update(risk_score=score, risk_factors=row_factors, last_updated=scored_at)
+                    changed_ids.append(row.id)
+                params.append(values)
+            # ORM bulk UPDATE by primary key: one executemany per distinct set of columns
+            db.execute(update(models.Contract), params)
+            db.commit()
+            scored += len(rows)
+            changed += len(changed_ids)
+            last_id = rows[-1].id
+            if on_batch is not None and changed_ids:
+                on_batch(changed_ids)
+        status, error = "completed", None
+    except Exception as e:
+        db.rollback()
+        status, error = "failed", str(e)[:500]
+        print(f"Error re-scoring contracts: {e}")
+
+    duration = time.perf_counter() - started
+    RESCORE_SECONDS.observe(duration)
+    run = db.query(models.RiskRescoreRun).filter(models.RiskRescoreRun.id == run_id).one()
+    run.status = status
+    run.error = error
+    run.finished_at = datetime.now(timezone.utc)
+    run.duration_seconds = round(duration, 3)
+    run.contracts_scored = scored
+    run.contracts_changed = changed
+    db.commit()
+    print(f"Risk re-score {run_id} {status}: rules v{rules.version}, {scored} contracts, "
+          f"{changed} changed in {duration:.1f}s")
+    return run_to_dict(run)
+
+
+if __name__ == "__main__":
+    from .agents.risk_rules import load_rules
+    from .database import WorkerSessionLocal
+
+    session = WorkerSessionLocal()
+    try:
+        rescore_contracts(session, load_rules())
+    finally:
+        session.close()
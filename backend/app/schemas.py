@@ -37,6 +37,112 @@ class Contact(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
 
+# Extraction output shape, rendered into the extraction prompt by agents/prompts.py
+
+class ExtractedDates(BaseModel):
+    effective_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    expiration_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    execution_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    termination_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    renewal_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    notice_period_days: Optional[int] = None
+    other_dates: Dict[str, str] = {}
+
+class ExtractedFinancial(BaseModel):
+    total_value: Optional[float] = None
+    currency: Optional[str] = None
+    payment_terms: Optional[str] = None
+    billing_frequency: Optional[str] = None
+    late_payment_fee: Optional[str] = None
+    advance_payment: Optional[float] = None
+    retention_amount: Optional[float] = None
+    other_financial_terms: Dict[str, Any] = {}
+
+class PaymentMilestone(BaseModel):
+    milestone: str
+    percentage: Optional[float] = None
+    amount: Optional[float] = None
+    due_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    conditions: Optional[str] = None
+
+class Deliverable(BaseModel):
+    item: str
+    due_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+    milestone: Optional[str] = None
+    acceptance_criteria: Optional[str] = None
+    status: Optional[str] = None
+
+class ServiceLevel(BaseModel):
+    target: str
+    measurement_period: Optional[str] = None
+    remedies: Optional[str] = None
+
+class ExtractedClause(BaseModel, extra="allow"):
+    text: str
+    category: Optional[str] = None
+
+class KeyField(BaseModel):
+    value: Any
+    data_type: str
+    confidence: float
+    source_section: Optional[str] = None
+
+class RiskIndicators(BaseModel):
+    auto_renewal: Optional[bool] = None
+    unlimited_liability: Optional[bool] = None
+    penalty_clauses: Optional[bool] = None
+    confidentiality_period_years: Optional[int] = None
+    termination_for_convenience: Optional[bool] = None
+
+class ComplianceRequirements(BaseModel):
+    insurance_required: Optional[bool] = None
+    minimum_coverage: Optional[str] = None
+    audit_rights: Optional[bool] = None
+    audit_frequency: Optional[str] = None
+    reporting_requirements: List[str] = []
+
+class ExtractedSignatory(BaseModel):
+    name: str
+    title: Optional[str] = None
+    email: Optional[str] = None
+    signature_date: Optional[str] = Field(None, json_schema_extra={"format": "date"})
+
+class ContactInformation(BaseModel):
+    signatories: List[ExtractedSignatory] = []
+    administrative_contacts: List[Contact] = []
+
+class Attachment(BaseModel):
+    name: str
+    reference: Optional[str] = None
+    description: Optional[str] = None
+
+class ExtractedSection(BaseModel):
+    text: str
+    page_number: Optional[int] = None
+    category: Optional[str] = None
+    importance: Optional[str] = None
+
+class ContractExtraction(BaseModel):
+    contract_type: str
+    contract_subtype: Optional[str] = None
+    master_agreement_id: Optional[str] = None
+    parties: List[str]
+    dates: ExtractedDates
+    financial: ExtractedFinancial
+    payment_schedule: List[PaymentMilestone] = []
+    deliverables: List[Deliverable] = []
+    service_levels: Dict[str, ServiceLevel] = {}
+    clauses: Dict[str, ExtractedClause] = {}
+    tables_and_schedules: Dict[str, Any] = {}
+    key_fields: Dict[str, KeyField] = {}
+    risk_indicators: RiskIndicators
+    compliance_requirements: ComplianceRequirements
+    contact_information: ContactInformation
+    attachments_and_exhibits: List[Attachment] = []
+    miscellaneous: Dict[str, Any] = {}
+    extracted_sections: Dict[str, ExtractedSection] = {}
+    confidence_score: float
+
 class RiskFactor(BaseModel):
     factor: str
     severity: str
@@ -150,6 +256,9 @@ class SearchQuery(BaseModel):
     query: str
     limit: int = 10
     filter_by: Optional[Dict[str, Any]] = None
+    # "lexical" makes no embedding call; "hybrid" skips it too for exact-match queries BM25 can answer
+    mode: str = Field(default="hybrid", pattern="^(hybrid|lexical|vector)$")
+    rerank: bool = False
 
 class ContractSummary(BaseModel):
     total_contracts: int
@@ -163,4 +272,44 @@ class ContractSummary(BaseModel):
 class ContractCompareRequest(BaseModel):
     contract_id_1: int
     contract_id_2: int
-    compare_type: Optional[str] = "detailed"  # "quick", "detailed", "financial"    
\ No newline at end of file
+    compare_type: Optional[str] = "detailed"  # "quick", "detailed", "financial"
+
+class BatchCompareRequest(BaseModel):
+    baseline_id: int
+    contract_ids: Optional[List[int]] = None  # Explicit targets; otherwise the filters below apply
+    contract_type: Optional[str] = None
+    party_name: Optional[str] = None
+    master_agreement_id: Optional[str] = None
+    limit: int = Field(default=500, ge=1, le=5000)
+    max_deltas: int = Field(default=20, ge=0, le=500)  # Per-contract deltas included in the stream
+
+class ClauseSearchQuery(BaseModel):
+    text: Optional[str] = None  # Clause text to match, or...
+    contract_id: Optional[int] = None  # ...an existing clause, by contract and clause name
+    clause_name: Optional[str] = None
+    clause_type: Optional[str] = None
+    contract_ids: Optional[List[int]] = None
+    limit: int = Field(default=10, ge=1, le=100)
+
+class ClauseMatch(BaseModel):
+    clause_id: int
+    contract_id: int
+    contract_type: Optional[str] = None
+    clause_name: str
+    clause_type: str
+    text: str
+    score: float
+
+class ContractAlert(BaseModel):
+    id: int
+    contract_id: int
+    kind: str  # renewal_notice, termination_notice, expiration
+    deadline_at: datetime
+    alert_at: datetime
+    days_left: int
+    fired_at: Optional[datetime] = None
+    acknowledged_at: Optional[datetime] = None
+    acknowledged_by: Optional[str] = None
+    contract_type: Optional[str] = None
+    parties: Optional[Any] = None
+    auto_renewal: Optional[bool] = None
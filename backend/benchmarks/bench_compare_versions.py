@@ -0,0 +1,43 @@
+"""Benchmark the structural diff behind ContractProcessor.compare_versions.
+
+Run from backend/:  python -m benchmarks.bench_compare_versions
+"""
+import argparse
+import copy
+import time
+
+from app.agents.diff_engine import diff_extractions
+from benchmarks.synthetic import amend, make_extraction
+
+SIZES = [(50, 50), (500, 500), (2000, 2000), (10000, 5000)]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'clauses':>8} {'deliv.':>7} {'identical ms':>13} {'amended ms':>11} {'deltas':>7} {'skipped':>8}")
+    for n_clauses, n_deliverables in SIZES:
+        old = make_extraction(n_clauses=n_clauses, n_deliverables=n_deliverables)
+        same = copy.deepcopy(old)
+        new = amend(old)
+
+        identical = _time(lambda: diff_extractions(old, same), args.repeat)
+        amended = _time(lambda: diff_extractions(old, new), args.repeat)
+        deltas, skipped = diff_extractions(old, new)
+        print(f"{n_clauses:>8} {n_deliverables:>7} {identical * 1000:>13.1f} {amended * 1000:>11.1f} "
+              f"{len(deltas):>7} {skipped:>8}")
+
+
+if __name__ == "__main__":
+    main()
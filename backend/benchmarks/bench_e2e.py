@@ -0,0 +1,221 @@
+"""End-to-end benchmark: ingest synthetic PDFs and query the API against a fake OpenAI server.
+
+Run from backend/:
+    python -m benchmarks.bench_e2e --docs 20 --pages 10 --concurrency 4 --output results/e2e.json
+
+Starts benchmarks.fake_openai and app.main with uvicorn on free local ports,
+uploads the documents, waits for processing, then drives /search,
+/contracts/compare and /contracts/summary. Reports p50/p95/p99 latency per
+endpoint, ingest throughput (docs/minute) and the API server's peak RSS.
+By default a fresh SQLite database is used; pass --database-url to
+benchmark against PostgreSQL. Compare --output files across changes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from .pdf_writer import make_contract_pdf
+
+QUERIES = ["payment schedule milestones", "termination notice period", "limitation of liability cap",
+           "confidential information", "governing law", "indemnify the customer", "renewal term",
+           "acceptance criteria for deliverables", "insurance coverage", "audit rights"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {"count": len(ordered), "p50_ms": round(pick(0.50) * 1000, 1), "p95_ms": round(pick(0.95) * 1000, 1),
+            "p99_ms": round(pick(0.99) * 1000, 1), "max_ms": round(ordered[-1] * 1000, 1)}
+
+
+def peak_rss_mb(pid: int) -> float:
+    """High-water resident set size of a process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return float("nan")
+
+
+def start_server(module: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env}, stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def timed_calls(client: httpx.AsyncClient, concurrency: int, calls) -> List[float]:
+    """Run (method, url, kwargs) calls with bounded concurrency; return latencies of successful ones"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def run(method, url, kwargs):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - started
+            if response.status_code < 400:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    await asyncio.gather(*[run(*call) for call in calls])
+    if errors:
+        print(f"  {errors} requests failed")
+    return latencies
+
+
+async def ingest(client: httpx.AsyncClient, args) -> Dict[str, object]:
+    pdfs = [make_contract_pdf(pages=args.pages, seed=i) for i in range(args.docs)]
+    upload_latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    started = time.perf_counter()
+
+    async def upload(i: int, pdf: bytes):
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.post("/upload", files={"file": (f"contract_{i}.pdf", pdf, "application/pdf")})
+            upload_latencies.append(time.perf_counter() - t0)
+            response.raise_for_status()
+            return response.json()["id"]
+
+    document_ids = await asyncio.gather(*[upload(i, pdf) for i, pdf in enumerate(pdfs)])
+
+    pending = set(document_ids)
+    statuses: Dict[int, str] = {}
+    while pending:
+        await asyncio.sleep(0.5)
+        for document_id in list(pending):
+            status = (await client.get(f"/documents/{document_id}/status")).json()
+            if status["status"] == "completed" or status["status"].startswith("failed"):
+                statuses[document_id] = status["status"]
+                pending.discard(document_id)
+        if time.perf_counter() - started > args.ingest_timeout:
+            print(f"  timed out with {len(pending)} documents still processing")
+            break
+    elapsed = time.perf_counter() - started
+    completed = sum(1 for status in statuses.values() if status == "completed")
+    return {
+        "documents": args.docs,
+        "pages_per_document": args.pages,
+        "completed": completed,
+        "failed": len(statuses) - completed,
+        "seconds": round(elapsed, 2),
+        "docs_per_minute": round(completed / elapsed * 60, 2) if elapsed else 0.0,
+        "upload": percentiles(upload_latencies),
+    }
+
+
+async def run(args) -> Dict[str, object]:
+    fake_port, api_port = free_port(), free_port()
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench_e2e_')}/bench.db"
+    fake = start_server("benchmarks.fake_openai:app", fake_port, {
+        "FAKE_OPENAI_LATENCY": str(args.latency),
+        "FAKE_OPENAI_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_OPENAI_RATE_LIMIT_EVERY": str(args.rate_limit_every),
+    })
+    api = start_server("app.main:app", api_port, {
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "OPENAI_API_KEY": "benchmark",
+        "DATABASE_URL": database_url,
+    })
+    try:
+        await wait_until_up(f"http://127.0.0.1:{fake_port}/docs")
+        await wait_until_up(f"http://127.0.0.1:{api_port}/contracts/summary")
+        rss_idle = peak_rss_mb(api.pid)
+
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", timeout=300) as client:
+            print(f"Ingesting {args.docs} x {args.pages}-page documents")
+            results: Dict[str, object] = {"ingest": await ingest(client, args)}
+
+            contracts = (await client.get("/contracts", params={"limit": 1000})).json()
+            contract_ids = [contract["id"] for contract in contracts]
+            rng = random.Random(0)
+
+            print(f"Running {args.requests} requests per endpoint")
+            searches = [("POST", "/search", {"json": {"query": rng.choice(QUERIES), "limit": 5}})
+                        for _ in range(args.requests)]
+            results["search"] = percentiles(await timed_calls(client, args.concurrency, searches))
+
+            if len(contract_ids) >= 2:
+                compares = []
+                for _ in range(args.requests):
+                    first, second = rng.sample(contract_ids, 2)
+                    compares.append(("POST", "/contracts/compare",
+                                     {"json": {"contract_id_1": first, "contract_id_2": second}}))
+                results["compare"] = percentiles(await timed_calls(client, args.concurrency, compares))
+
+            summaries = [("GET", "/contracts/summary", {}) for _ in range(args.requests)]
+            results["summary"] = percentiles(await timed_calls(client, args.concurrency, summaries))
+
+        results["api_rss_mb"] = {"idle": rss_idle, "peak": peak_rss_mb(api.pid)}
+        results["config"] = {key: value for key, value in vars(args).items() if key != "output"}
+        return results
+    finally:
+        for process in (api, fake):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="requests per query endpoint")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake OpenAI seconds per request")
+    parser.add_argument("--tokens-per-second", type=float, default=400, help="fake OpenAI generation rate")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth OpenAI call with 429")
+    parser.add_argument("--ingest-timeout", type=float, default=1800)
+    parser.add_argument("--database-url")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Micro-benchmarks for ContractProcessor's CPU paths, with a stored baseline and regression check.
+
+Run from backend/:
+    python -m benchmarks.bench_processor                      # compare against the baseline
+    python -m benchmarks.bench_processor --update-baseline    # record a new baseline
+    python -m benchmarks.bench_processor --only merge --skip-large
+
+Every corpus is generated deterministically from fixed seeds: a small
+contract, a 100-page and a 1000-page contract, and a heavily amended
+version pair. Each case reports the best of several repeats. The command
+exits with status 1 if any case is slower than baseline * --threshold.
+Baselines are machine specific; refresh them when the hardware changes.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.agents.contract_processor import ContractProcessor
+
+from .pdf_writer import make_contract_pdf
+from .synthetic import amend, make_extraction
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "processor.json")
+DEFAULT_THRESHOLD = 1.25
+
+# name -> pages of the synthetic PDF
+CORPORA = {"small": 3, "100_pages": 100, "1000_pages": 1000}
+LARGE_CORPORA = ("1000_pages",)
+
+
+def best_of(fn: Callable[[], object], repeats: int, min_time: float = 0.2) -> float:
+    """Best wall time over `repeats` runs; fast cases loop until min_time so timer noise averages out.
+
+    The garbage collector is paused while timing, as timeit does, so collections
+    triggered by earlier cases don't land in later ones.
+    """
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            loops = 0
+            started = time.perf_counter()
+            while True:
+                fn()
+                loops += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time:
+                    break
+            best = min(best, elapsed / loops)
+    finally:
+        gc.enable()
+    return best
+
+
+def build_cases(processor: ContractProcessor, skip_large: bool) -> List[Tuple[str, Callable[[], object], int]]:
+    """(case name, callable, repeats); corpora are built here so generation is never timed"""
+    cases = []
+    for name, pages in CORPORA.items():
+        if skip_large and name in LARGE_CORPORA:
+            continue
+        repeats = 1 if name in LARGE_CORPORA else 5
+        pdf = make_contract_pdf(pages=pages, seed=7)
+        text = processor.extract_text_from_pdf(pdf)
+        chunks = processor._split_into_chunks(text)
+        # One extraction per chunk, as the chunked pipeline would produce
+        chunk_extractions = [make_extraction(n_clauses=6, n_deliverables=4, n_payments=4, seed=i)
+                             for i in range(len(chunks))]
+
+        cases += [
+            (f"extract_text_from_pdf[{name}]", lambda pdf=pdf: processor.extract_text_from_pdf(pdf), repeats),
+            (f"extract_tables_from_text[{name}]", lambda text=text: processor.extract_tables_from_text(text), repeats),
+            (f"split_into_chunks[{name}]", lambda text=text: processor._split_into_chunks(text), repeats),
+            (f"merge_chunk_extractions[{name}]",
+             lambda results=chunk_extractions: processor._merge_chunk_extractions(results), repeats),
+        ]
+
+    for name, size, edit_ratio in (("small", 20, 0.05), ("large", 1000, 0.05), ("heavily_amended", 1000, 0.5)):
+        old = make_extraction(n_clauses=size, n_deliverables=size // 2, n_payments=24, seed=3)
+        new = amend(old, edit_ratio=edit_ratio, seed=4)
+        cases.append((f"compare_versions[{name}]", lambda old=old, new=new: processor.compare_versions(old, new), 5))
+        cases.append((f"calculate_risk_score[{name}]", lambda new=new: processor._calculate_risk_score(new), 5))
+    return cases
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fail when a case takes longer than baseline * threshold")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--skip-large", action="store_true", help="skip the 1000-page corpus")
+    parser.add_argument("--only", help="run cases whose name contains this string")
+    args = parser.parse_args()
+
+    processor = ContractProcessor()
+    print("Building corpora...")
+    cases = build_cases(processor, args.skip_large)
+    if args.only:
+        cases = [case for case in cases if args.only in case[0]]
+
+    baseline = load_baseline(args.baseline)
+    results: Dict[str, float] = {}
+    regressions = []
+    print(f"{'case':48s} {'time':>10s} {'baseline':>10s} {'ratio':>7s}")
+    for name, fn, repeats in cases:
+        seconds = best_of(fn, repeats)
+        results[name] = round(seconds, 6)
+        reference = baseline.get(name)
+        ratio = seconds / reference if reference else None
+        flag = ""
+        if ratio is not None and ratio > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        reference_text = f"{reference * 1000:8.2f}ms" if reference else f"{'-':>10s}"
+        ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7s}"
+        print(f"{name:48s} {seconds * 1000:8.2f}ms {reference_text} {ratio_text}{flag}")
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": dict(sorted(merged.items()))}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than {args.threshold}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the single-pass section scanner against the former six-regex table extraction.
+
+Run from backend/:  python -m benchmarks.bench_section_scanner [--sections 2000]
+"""
+import argparse
+import re
+import time
+
+from app.agents.section_scanner import has_table_layout, scan_sections
+
+from .synthetic import make_contract_text
+
+LEGACY_TABLE_PATTERNS = [
+    r"(PAYMENT\s+SCHEDULE[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+    r"(REPORTING\s+REQUIREMENTS[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+    r"(DELIVERABLES[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+    r"(MILESTONES[\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+    r"(SCHEDULE\s+[A-Z][\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+    r"(EXHIBIT\s+[A-Z][\s\S]*?)(?=\n\n|\n[A-Z]|$)",
+]
+
+
+def legacy_extract_tables(text):
+    tables = {}
+    for pattern in LEGACY_TABLE_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            tables[match.group(1).split('\n')[0].strip()] = match.group(1)
+    return tables
+
+
+def legacy_detect_tables(text):
+    for line in text.split('\n'):
+        if any(pattern in line for pattern in ['|', '\t', '  ', '    ']):
+            return True
+    return False
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=2000)
+    args = parser.parse_args()
+
+    text = make_contract_text(n_sections=args.sections)
+    # Table rows that start with digits never satisfy the legacy lookahead, so each match runs long
+    numeric = "PAYMENT SCHEDULE\n" + "".join(f"{i} | 2024-01-01 | ${i * 100:,}\n" for i in range(100000))
+    # No table separators anywhere: the detector has to look at every line
+    prose = text.replace("|", ";").replace("  ", " ")
+
+    for label, corpus in (("contract", text), ("numeric table", numeric)):
+        legacy_time, legacy = timed(legacy_extract_tables, corpus)
+        scan_time, spans = timed(scan_sections, corpus)
+        print(f"{label:14s} {len(corpus) / 1e6:6.1f} MB  legacy={legacy_time * 1000:8.1f} ms "
+              f"({len(legacy)} tables)  scanner={scan_time * 1000:8.1f} ms ({len(spans)} spans)  "
+              f"x{legacy_time / scan_time:.1f}")
+
+    legacy_time, _ = timed(legacy_detect_tables, prose)
+    scan_time, _ = timed(has_table_layout, prose)
+    print(f"{'detect tables':14s} {len(prose) / 1e6:6.1f} MB  legacy={legacy_time * 1000:8.1f} ms  "
+          f"scanner={scan_time * 1000:8.1f} ms  x{legacy_time / scan_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
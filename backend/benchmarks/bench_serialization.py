@@ -0,0 +1,126 @@
+"""Serialization time and payload size of GET /contracts/{id} responses.
+
+Run from backend/:
+    python -m benchmarks.bench_serialization                          # synthetic contracts
+    python -m benchmarks.bench_serialization --database-url postgresql://... --limit 20
+
+With --database-url the largest stored contracts are measured (read only);
+otherwise small/medium/large synthetic contracts are ingested into a
+temporary SQLite database through save_contract_extraction. For each
+contract it reports the time to build the response body the way FastAPI
+does (ContractResponse validation + jsonable_encoder, then stdlib json or
+orjson) versus pydantic's model_dump_json as the response cache does, and
+the body size raw, gzipped and brotli-compressed at the
+levels the compression middleware uses.
+"""
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from .bench_processor import best_of
+from .synthetic import make_contract_text, make_extraction
+
+SYNTHETIC = {"small": (10, 5, 4), "medium": (80, 40, 12), "large": (400, 200, 48)}
+
+
+def stdlib_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def seed_synthetic(db, models, save_contract_extraction) -> List[int]:
+    from app.agents.contract_processor import ContractProcessor
+
+    processor = ContractProcessor()
+    ids = []
+    for seed, (name, (clauses, deliverables, payments)) in enumerate(SYNTHETIC.items()):
+        extraction = make_extraction(n_clauses=clauses, n_deliverables=deliverables, n_payments=payments, seed=seed)
+        text = make_contract_text(n_sections=clauses // 2, seed=seed)
+        extraction["metadata"] = {"tables_and_schedules": processor.extract_tables_from_text(text), "name": name}
+        document = models.Document(filename=f"{name}.pdf", file_type="application/pdf", file_size=len(text))
+        db.add(document)
+        db.commit()
+        ids.append(save_contract_extraction(db, document.id, extraction).id)
+    return ids
+
+
+def measure(contract, schemas, encoders: Dict[str, Callable]) -> Dict[str, object]:
+    from fastapi.encoders import jsonable_encoder
+
+    row = {"contract_id": contract.id}
+    # What FastAPI does before the response class renders: validate against response_model, make jsonable
+    row["validate_encode_ms"] = round(best_of(
+        lambda: jsonable_encoder(schemas.ContractResponse.model_validate(contract)), 3, 0.1) * 1000, 3)
+    # The response cache's path: pydantic serializes the validated model directly
+    row["validate_dump_json_ms"] = round(best_of(
+        lambda: schemas.ContractResponse.model_validate(contract).model_dump_json(), 3, 0.1) * 1000, 3)
+    content = jsonable_encoder(schemas.ContractResponse.model_validate(contract))
+    for name, dumps in encoders.items():
+        row[f"{name}_ms"] = round(best_of(lambda: dumps(content), 5, 0.1) * 1000, 3)
+    body = stdlib_dumps(content)
+    row["bytes"] = len(body)
+
+    from app import compression
+
+    started = time.perf_counter()
+    row["gzip_bytes"] = len(gzip.compress(body, compresslevel=compression.GZIP_LEVEL))
+    row["gzip_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    if compression.brotli is not None:
+        started = time.perf_counter()
+        row["br_bytes"] = len(compression.brotli.compress(body, quality=compression.BROTLI_QUALITY))
+        row["br_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--limit", type=int, default=10, help="stored contracts to measure (--database-url)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    # The app creates its engine at import, so the URL must be set first
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='serialization_')}/bench.db"
+    from sqlalchemy import String, func
+
+    from app import models, schemas, serialization
+    from app.database import SessionLocal, engine
+    from app.main import save_contract_extraction
+    from app.migrations import migrate
+
+    # save_contract_extraction is called directly, without the app's startup
+    migrate(engine)
+
+    encoders = {"json": stdlib_dumps}
+    if serialization.orjson is not None:
+        encoders["orjson"] = serialization.dumps
+    else:
+        print("orjson is not installed; only stdlib json is measured")
+
+    db = SessionLocal()
+    try:
+        if args.database_url:
+            size = func.length(models.Contract.clauses.cast(String)) + func.length(models.Contract.key_fields.cast(String))
+            contracts = db.query(models.Contract).order_by(size.desc()).limit(args.limit).all()
+        else:
+            ids = seed_synthetic(db, models, save_contract_extraction)
+            contracts = db.query(models.Contract).filter(models.Contract.id.in_(ids)).order_by(models.Contract.id).all()
+        rows = [measure(contract, schemas, encoders) for contract in contracts]
+    finally:
+        db.close()
+
+    columns = [key for key in rows[0] if key != "contract_id"] if rows else []
+    print(f"{'contract':>8s} " + " ".join(f"{column:>18s}" for column in columns))
+    for row in rows:
+        print(f"{row['contract_id']:>8} " + " ".join(f"{row.get(column, '-'):>18}" for column in columns))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Startup benchmark: how long `import app.main` and a cold server take, checked against a budget.
+
+Run from backend/:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --import-budget 1.5 --ready-budget 4
+
+Import time is measured in fresh interpreters with DATABASE_URL pointing at
+a database that can't be opened, so a regression that touches the database (or
+builds clients) at import shows up as an error rather than a slow number.
+Time to ready starts uvicorn on a fresh SQLite database, as a new replica
+would, and polls /health until it answers, so it includes the migrations
+run at startup. Each figure is the median of --runs; the command exits
+with status 1 if either is over its budget.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "2.0"))
+READY_BUDGET = float(os.getenv("STARTUP_READY_BUDGET", "5.0"))
+
+# The directory doesn't exist, so any connection made during import fails
+UNREACHABLE_DATABASE_URL = "sqlite:////nonexistent/startup-bench/contracts.db"
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(env: Dict[str, str]) -> float:
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env={**os.environ, **env},
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{result.stderr.strip()}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_to_ready(env: Dict[str, str], timeout: float = 60.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env={**os.environ, **env}, stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client() as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with status {server.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.02)
+        raise RuntimeError(f"server did not become ready within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="seconds")
+    parser.add_argument("--ready-budget", type=float, default=READY_BUDGET, help="seconds")
+    args = parser.parse_args()
+
+    base_env = {"OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-bench"), "ALERTS_ENABLED": "false"}
+    imports = [time_import({**base_env, "DATABASE_URL": UNREACHABLE_DATABASE_URL}) for _ in range(args.runs)]
+
+    readies: List[float] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for run in range(args.runs):
+            # A new database each run, so every start applies the full migration list
+            database_url = f"sqlite:///{os.path.join(workdir, f'startup-{run}.db')}"
+            readies.append(time_to_ready({**base_env, "DATABASE_URL": database_url}))
+
+    failed = False
+    for name, samples, budget in (("import app.main", imports, args.import_budget),
+                                  ("time to ready", readies, args.ready_budget)):
+        median = statistics.median(samples)
+        over = median > budget
+        failed = failed or over
+        print(f"{name:<16} median {median * 1000:7.0f} ms  (min {min(samples) * 1000:.0f}, "
+              f"max {max(samples) * 1000:.0f}, budget {budget * 1000:.0f})" + ("  OVER BUDGET" if over else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
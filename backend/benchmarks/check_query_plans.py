@@ -0,0 +1,168 @@
+"""Query-plan regression check for the dashboard, search and alert indexes.
+
+Run from backend/:
+    python -m benchmarks.check_query_plans                       # fresh SQLite database
+    python -m benchmarks.check_query_plans --database-url postgresql://...
+
+Calls the real /contracts/summary, /contracts/search and /alerts handlers
+and an alert scheduler tick against a seeded database, captures every SELECT they issue, EXPLAINs it and checks
+that the indexes added by app.migrations show up in the plans. On
+PostgreSQL sequential scans are disabled for the session first: with a few
+hundred seeded rows the planner would rightly prefer them, and the check is
+about whether an index *can* serve the query. Exits with status 1 when an
+expected index is missing from a plan. Use --database-url only against a
+scratch database; it seeds rows.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event
+
+from .synthetic import make_extraction
+
+SEED_CONTRACTS = 300
+
+
+def seed(db, models, link_contract_parties, count: int):
+    rng = random.Random(0)
+    now = datetime.now()
+    document = models.Document(filename="plan_check.pdf", file_type="application/pdf", file_size=0, status="completed")
+    db.add(document)
+    db.flush()
+    for i in range(count):
+        extraction = make_extraction(n_clauses=6, n_deliverables=2, n_payments=2, seed=i)
+        effective = now - timedelta(days=rng.randint(0, 1500))
+        contract = models.Contract(
+            document_id=document.id,
+            contract_type=rng.choice(["MSA", "SOW", "NDA", "Lease"]),
+            parties=extraction.get("parties", []),
+            effective_date=effective,
+            expiration_date=effective + timedelta(days=rng.randint(180, 1800)) if rng.random() < 0.9 else None,
+            termination_date=now - timedelta(days=rng.randint(1, 300)) if rng.random() < 0.05 else None,
+            total_value=round(rng.uniform(1e3, 5e6), 2),
+            currency=rng.choice(["USD", "USD", "EUR"]),
+            risk_score=round(rng.random(), 2),
+            clauses=extraction.get("clauses", {}),
+            key_fields=extraction.get("key_fields", {}),
+            needs_review=rng.random() < 0.1,
+        )
+        db.add(contract)
+        db.flush()
+        link_contract_parties(db, contract.id, contract.parties, [])
+    db.commit()
+
+
+def explain(connection, statement: str, parameters) -> str:
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        return "\n".join(row[0] for row in rows)
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def capture_plans(engine, db, call: Callable[[], object]) -> List[Tuple[str, str]]:
+    """(statement, plan) for every SELECT issued while running `call`"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    connection = db.connection()
+    return [(statement, explain(connection, statement, parameters)) for statement, parameters in statements]
+
+
+def plan_cases(db, session_factory, postgres: bool) -> List[Tuple[str, Callable[[], object], List[str]]]:
+    """(case, handler call, indexes that must appear in its plans)"""
+    from app.alerts import AlertScheduler, list_alerts
+    from app.main import advanced_search, get_contracts_summary
+
+    search_year = datetime.now() - timedelta(days=365)
+    cases: List[Tuple[str, Callable[[], object], List[str]]] = [
+        ("summary", lambda: get_contracts_summary(db=db),
+         ["ix_contracts_expiration_date", "ix_contracts_risk_score", "ix_contracts_review_queue",
+          "ix_contracts_termination_date"]),
+        ("search value range", lambda: advanced_search(min_value=1e5, max_value=2e5, db=db),
+         ["ix_contracts_total_value"]),
+        ("search date range", lambda: advanced_search(start_date=search_year, end_date=datetime.now(), db=db),
+         ["ix_contracts_effective_expiration"]),
+        ("search high risk", lambda: advanced_search(risk_level="high", db=db),
+         ["ix_contracts_risk_score"]),
+        ("search review queue", lambda: advanced_search(needs_review=True, db=db),
+         ["ix_contracts_review_queue"]),
+        ("search party", lambda: advanced_search(party_name="Party 1 Holdings", db=db),
+         ["ix_contract_parties_party_contract"]),
+        ("alert scheduler tick", lambda: AlertScheduler(session_factory).tick(datetime.now() + timedelta(days=365)),
+         ["ix_contract_deadlines_pending"]),
+        ("alerts open", lambda: list_alerts(db),
+         ["ix_contract_deadlines_open"]),
+    ]
+    if postgres:
+        cases.append(("search clause", lambda: advanced_search(clause="indemnification", db=db),
+                      ["ix_contracts_clauses_gin"]))
+        cases.append(("search party prefix", lambda: advanced_search(party_name="Party 1", db=db),
+                      ["ix_parties_normalized_name_pattern"]))
+    return cases
+
+
+def missing_indexes(plans: List[Tuple[str, str]], expected: List[str]) -> List[str]:
+    combined = "\n".join(plan for _, plan in plans)
+    return [index for index in expected if index not in combined]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--contracts", type=int, default=SEED_CONTRACTS)
+    parser.add_argument("--verbose", action="store_true", help="print every statement and plan")
+    args = parser.parse_args()
+
+    # The app creates its engine at import, so the URL must be set first
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='plans_')}/plans.db"
+    from app import models
+    from app.alerts import backfill_deadlines
+    from app.database import SessionLocal, engine
+    from app.migrations import migrate
+    from app.parties import link_contract_parties
+
+    # Handlers are called directly, without the app's startup
+    migrate(engine)
+    postgres = engine.dialect.name == "postgresql"
+    db = SessionLocal()
+    try:
+        seed(db, models, link_contract_parties, args.contracts)
+        backfill_deadlines(db)
+        if postgres:
+            db.connection().exec_driver_sql("SET enable_seqscan = off")
+
+        failures: Dict[str, List[str]] = {}
+        for name, call, expected in plan_cases(db, SessionLocal, postgres):
+            plans = capture_plans(engine, db, call)
+            missing = missing_indexes(plans, expected)
+            print(f"{name:24s} {'ok' if not missing else 'MISSING ' + ', '.join(missing)}")
+            if missing:
+                failures[name] = missing
+            if args.verbose or missing:
+                for statement, plan in plans:
+                    print("  " + " ".join(statement.split())[:160])
+                    print("    " + plan.replace("\n", "\n    "))
+    finally:
+        db.close()
+
+    if failures:
+        print(f"{len(failures)} case(s) no longer use their index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
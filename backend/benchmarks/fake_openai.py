@@ -0,0 +1,104 @@
+"""Local stand-in for the OpenAI chat and embeddings endpoints.
+
+Run from backend/:  python -m uvicorn benchmarks.fake_openai:app --port 8900
+Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8900/v1.
+
+Latency is FAKE_OPENAI_LATENCY seconds per request plus completion tokens
+divided by FAKE_OPENAI_TOKENS_PER_SECOND, so slow generations can be
+simulated. FAKE_OPENAI_RATE_LIMIT_EVERY=N answers every Nth request with 429.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .synthetic import make_extraction
+
+LATENCY = float(os.getenv("FAKE_OPENAI_LATENCY", "0.5"))
+TOKENS_PER_SECOND = float(os.getenv("FAKE_OPENAI_TOKENS_PER_SECOND", "400"))
+EMBEDDING_LATENCY = float(os.getenv("FAKE_OPENAI_EMBEDDING_LATENCY", "0.05"))
+RATE_LIMIT_EVERY = int(os.getenv("FAKE_OPENAI_RATE_LIMIT_EVERY", "0"))
+EMBEDDING_DIM = 1536
+
+app = FastAPI(title="Fake OpenAI")
+_requests = itertools.count(1)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=4).digest(), "big")
+
+
+def _throttled():
+    if RATE_LIMIT_EVERY and next(_requests) % RATE_LIMIT_EVERY == 0:
+        return JSONResponse(status_code=429, headers={"retry-after": "0.2"},
+                            content={"error": {"message": "Rate limit reached", "type": "requests"}})
+    return None
+
+
+def _embed(text: str) -> list:
+    """Hashed bag-of-words vector, so similar texts get similar embeddings"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in text.lower().split():
+        vector[_seed(word) % EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    throttled = _throttled()
+    if throttled:
+        return throttled
+    body = await request.json()
+    prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        if "conflicting values" in prompt:
+            content = json.dumps({})
+        else:
+            extraction = make_extraction(n_clauses=8, n_deliverables=4, n_payments=4, seed=_seed(prompt) % 1000)
+            content = json.dumps(extraction)
+    else:
+        content = "Based on the provided contract excerpts, the relevant terms are summarised above."
+
+    completion_tokens = min(_tokens(content), body.get("max_tokens") or 4096)
+    await asyncio.sleep(LATENCY + completion_tokens / TOKENS_PER_SECOND)
+    return {
+        "id": f"chatcmpl-{_seed(prompt)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": _tokens(prompt), "completion_tokens": completion_tokens,
+                  "total_tokens": _tokens(prompt) + completion_tokens},
+    }
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    throttled = _throttled()
+    if throttled:
+        return throttled
+    body = await request.json()
+    texts = body.get("input")
+    texts = [texts] if isinstance(texts, str) else texts
+    await asyncio.sleep(EMBEDDING_LATENCY)
+    vectors = await asyncio.to_thread(lambda: [_embed(text) for text in texts])
+    tokens = sum(_tokens(text) for text in texts)
+    return {
+        "object": "list",
+        "model": body.get("model", "fake-embedding"),
+        "data": [{"object": "embedding", "index": i, "embedding": vector} for i, vector in enumerate(vectors)],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
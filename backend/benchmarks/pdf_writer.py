@@ -0,0 +1,68 @@
+"""Minimal text-only PDF writer for synthetic benchmark documents (no third-party dependency)"""
+from typing import List
+
+from .synthetic import make_contract_text
+
+LINES_PER_PAGE = 54
+CHARS_PER_LINE = 95
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str) -> List[str]:
+    lines = []
+    for line in text.split("\n"):
+        while len(line) > CHARS_PER_LINE:
+            cut = line.rfind(" ", 0, CHARS_PER_LINE)
+            cut = cut if cut > 0 else CHARS_PER_LINE
+            lines.append(line[:cut])
+            line = line[cut:].lstrip()
+        lines.append(line)
+    return lines
+
+
+def text_to_pdf(text: str, header: str = "") -> bytes:
+    """Lay text out on US-letter pages in Helvetica; `header` is repeated on every page with its number"""
+    lines = _wrap(text)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for number, page_lines in enumerate(pages, start=1):
+        ops = ["BT", "/F1 9 Tf", "12 TL", "50 760 Td"]
+        if header:
+            ops += [f"({_escape(header)}) Tj", "T*", "T*"]
+        ops += [f"({_escape(line)}) Tj T*" for line in page_lines]
+        if header:
+            ops += ["T*", f"(Page {number} of {len(pages)}) Tj"]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_contract_pdf(pages: int = 10, seed: int = 0) -> bytes:
+    """Synthetic contract PDF of roughly `pages` pages"""
+    # A section of make_contract_text wraps to ~25 lines once table blocks are averaged in
+    sections = max(1, round(pages * LINES_PER_PAGE / 25))
+    text = make_contract_text(n_sections=sections, seed=seed)
+    return text_to_pdf(text, header=f"MASTER SERVICES AGREEMENT MSA-{seed:05d} - CONFIDENTIAL")
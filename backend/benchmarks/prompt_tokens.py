@@ -0,0 +1,82 @@
+"""Input tokens per extraction request, verbose legacy prompt vs compact schema prompt.
+
+Run from backend/:  python -m benchmarks.prompt_tokens [--sections 120]
+Uses tiktoken when installed, otherwise the 4-characters-per-token estimate.
+"""
+import argparse
+
+from app.agents.contract_processor import ContractProcessor
+from app.agents.prompts import extraction_system_prompt
+
+from .legacy_prompt import LEGACY_SYSTEM_PROMPT
+from .synthetic import make_contract_text
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+# Providers only cache prompt prefixes of at least this many tokens
+CACHE_MIN_PREFIX = 1024
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4
+
+
+def legacy_chunk_prompt(i: int, n: int, chunk: str, tables) -> str:
+    return f"""Analyze this portion of a contract document (chunk {i+1} of {n}).
+                    Focus on extracting contractual elements from this specific section.
+                    
+                    Important tables found in full document: {tables}
+                    
+                    Document text: {chunk[:6000]}"""
+
+
+def chunk_prompt(i: int, n: int, chunk: str, tables) -> str:
+    return f"""Important tables found in full document: {tables}
+                    
+                    Analyze this portion of a contract document (chunk {i+1} of {n}).
+                    Focus on extracting contractual elements from this specific section.
+                    
+                    Document text: {chunk[:6000]}"""
+
+
+def shared_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=120)
+    args = parser.parse_args()
+
+    processor = ContractProcessor()
+    text = make_contract_text(n_sections=args.sections)
+    tables = list(processor.extract_tables_from_text(text).keys())
+    chunks = processor._split_into_chunks(text)
+    n = len(chunks)
+
+    print(f"tokenizer: {'tiktoken cl100k_base' if _encoding else 'chars/4 estimate'}")
+    print(f"document: {len(text):,} chars, {n} chunks")
+    for label, system, build in (("legacy", LEGACY_SYSTEM_PROMPT, legacy_chunk_prompt),
+                                 ("compact", extraction_system_prompt(), chunk_prompt)):
+        prompts = [system + build(i, n, chunk, tables) for i, chunk in enumerate(chunks)]
+        system_tokens = count_tokens(system)
+        total = sum(count_tokens(p) for p in prompts)
+        prefix = min(shared_prefix(prompts[0], p) for p in prompts[1:]) if n > 1 else len(prompts[0])
+        prefix_tokens = count_tokens(prompts[0][:prefix])
+        cacheable = "yes" if prefix_tokens >= CACHE_MIN_PREFIX else "no"
+        print(f"{label:8s} system={system_tokens:5d} tok  per-chunk avg={total / n:7.0f} tok  "
+              f"total={total:8d} tok  shared prefix={prefix_tokens:5d} tok (cacheable: {cacheable})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Synthetic contract data for benchmarks"""
+import copy
+import random
+from typing import Any, Dict
+
+CLAUSE_TYPES = ["confidentiality", "indemnification", "termination", "liability", "warranty",
+                "force_majeure", "assignment", "non_solicitation", "audit", "insurance",
+                "dispute_resolution", "governing_law", "data_protection", "intellectual_property"]
+
+WORDS = ("the party shall provide services under this agreement subject to the terms and "
+         "conditions set forth herein including payment delivery acceptance notice breach "
+         "remedy liability cap indemnify confidential information term renewal").split()
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def make_extraction(n_clauses: int = 50, n_deliverables: int = 50, n_payments: int = 24,
+                    n_parties: int = 4, seed: int = 0) -> Dict[str, Any]:
+    """Build an extraction dict shaped like ContractProcessor.process_contract output"""
+    rng = random.Random(seed)
+    clauses = {}
+    for i in range(n_clauses):
+        name = f"{CLAUSE_TYPES[i % len(CLAUSE_TYPES)]}_{i}"
+        clauses[name] = {
+            "text": " ".join(_sentence(rng, 20) for _ in range(4)),
+            "category": rng.choice(["Legal", "Risk", "Administrative", "Financial"]),
+            "notice_period": rng.choice([15, 30, 60, 90]),
+        }
+    return {
+        "contract_type": "Master Services Agreement",
+        "contract_subtype": "Professional Services",
+        "master_agreement_id": f"MSA-{seed:05d}",
+        "parties": [f"Party {i} Holdings LLC" for i in range(n_parties)],
+        "dates": {
+            "effective_date": "2024-01-01",
+            "expiration_date": "2026-12-31",
+            "execution_date": "2023-12-15",
+            "notice_period_days": 30,
+        },
+        "financial": {
+            "total_value": 1250000,
+            "currency": "USD",
+            "payment_terms": "Net 30",
+            "billing_frequency": "Monthly",
+        },
+        "payment_schedule": [
+            {"milestone": f"Milestone {i}", "percentage": round(100 / n_payments, 2),
+             "amount": 1250000 // n_payments, "due_date": f"2024-{(i % 12) + 1:02d}-01",
+             "conditions": _sentence(rng, 8)}
+            for i in range(n_payments)
+        ],
+        "deliverables": [
+            {"item": f"Deliverable {i}", "due_date": f"2025-{(i % 12) + 1:02d}-15",
+             "milestone": f"Phase {i // 10 + 1}", "acceptance_criteria": _sentence(rng, 10),
+             "status": "Pending"}
+            for i in range(n_deliverables)
+        ],
+        "clauses": clauses,
+        "key_fields": {
+            "governing_law": {"value": "State of Delaware", "data_type": "text", "confidence": 0.98},
+            "contract_value": {"value": "1,250,000 USD", "data_type": "currency", "confidence": 0.95},
+        },
+        "risk_indicators": {"auto_renewal": True, "unlimited_liability": False, "penalty_clauses": True},
+        "confidence_score": 0.92,
+    }
+
+
+def amend(extraction: Dict[str, Any], edit_ratio: float = 0.05, seed: int = 1) -> Dict[str, Any]:
+    """Return an amended copy: reordered lists, lightly edited clauses, a few adds/removes"""
+    rng = random.Random(seed)
+    amended = copy.deepcopy(extraction)
+    amended["financial"]["total_value"] = int(amended["financial"]["total_value"] * 1.1)
+    amended["dates"]["expiration_date"] = "2027-12-31"
+
+    rng.shuffle(amended["deliverables"])
+    rng.shuffle(amended["payment_schedule"])
+    for deliverable in rng.sample(amended["deliverables"], max(1, int(len(amended["deliverables"]) * edit_ratio))):
+        deliverable["status"] = "Accepted"
+
+    clause_names = list(amended["clauses"])
+    for name in rng.sample(clause_names, max(1, int(len(clause_names) * edit_ratio))):
+        amended["clauses"][name]["text"] += " " + _sentence(rng, 6)
+    for name in rng.sample(clause_names, max(1, int(len(clause_names) * edit_ratio / 2))):
+        del amended["clauses"][name]
+    amended["clauses"]["amendment_rider"] = {"text": _sentence(rng, 30), "category": "Legal"}
+    amended["parties"] = list(reversed(amended["parties"])) + ["New Guarantor Inc"]
+    return amended
+
+
+def make_contract_text(n_sections: int = 40, paragraphs_per_section: int = 4, n_table_rows: int = 12,
+                       seed: int = 0) -> str:
+    """Plain contract text with numbered sections, payment/deliverable tables and a signature block"""
+    rng = random.Random(seed)
+    lines = ["MASTER SERVICES AGREEMENT", "",
+             "This Agreement is entered into by Acme Holdings LLC and Globex Corporation.", ""]
+    for s in range(1, n_sections + 1):
+        lines.append(f"{s}. {CLAUSE_TYPES[s % len(CLAUSE_TYPES)].replace('_', ' ').upper()}")
+        for p in range(paragraphs_per_section):
+            lines.append(f"{s}.{p + 1} " + " ".join(_sentence(rng, 18) for _ in range(3)))
+        lines.append("")
+        if s % 10 == 0:
+            lines.append("PAYMENT SCHEDULE")
+            lines.append("Milestone | Percentage | Amount | Due Date")
+            for r in range(n_table_rows):
+                lines.append(f"Milestone {r} | {100 // n_table_rows}% | ${rng.randint(1, 99) * 1000:,} | "
+                             f"2024-{(r % 12) + 1:02d}-01")
+            lines.append("")
+            lines.append("DELIVERABLES")
+            for r in range(n_table_rows):
+                lines.append(f"Deliverable {r} | Phase {r // 4 + 1} | 2025-{(r % 12) + 1:02d}-15 | Pending")
+            lines.append("")
+    lines += ["IN WITNESS WHEREOF, the parties have executed this Agreement.",
+              "Signature: ____________________  Name: Jane Doe  Title: Chief Executive Officer",
+              "Signature: ____________________  Name: John Roe  Title: General Counsel", ""]
+    return "\n".join(lines)
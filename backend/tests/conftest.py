@@ -0,0 +1,41 @@
+"""Shared test setup.
+
+Run from backend/ (needs pytest):
+    python -m pytest -q
+
+The app reads DATABASE_URL when app.database is imported, so a throwaway
+SQLite database is configured here, before any test module imports the app
+(TEST_DATABASE_URL points the tests at another database).
+"""
+import os
+import tempfile
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="contract-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'app.db')}")
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("ALERTS_ENABLED", "false")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app with its lifespan running, so migrations have created the schema"""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
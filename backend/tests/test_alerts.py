@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import models
+from app.alerts import list_alerts
+from app.database import engine
+
+
+def test_list_alerts_loads_contracts_in_the_same_query(client, db):
+    now = datetime.now()
+    contracts = [models.Contract(contract_type="msa", parties=[f"Party {n}"]) for n in range(5)]
+    db.add_all(contracts)
+    db.flush()
+    db.add_all([
+        models.ContractDeadline(contract_id=contract.id, kind="expiration", deadline_at=now + timedelta(days=10),
+                                alert_at=now - timedelta(days=1), fired_at=now)
+        for contract in contracts
+    ])
+    db.commit()
+    contract_ids = {contract.id for contract in contracts}
+    db.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        alerts = list_alerts(db, status="open", kind="expiration", limit=100)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert {alert["contract_id"] for alert in alerts} >= contract_ids
+    assert all(alert["contract_type"] == "msa" for alert in alerts)
+    assert len(statements) == 1
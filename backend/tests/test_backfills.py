@@ -0,0 +1,42 @@
+from app import main, models
+
+
+def _add_contracts(db, *rows):
+    contracts = [models.Contract(contract_type="msa", **row) for row in rows]
+    db.add_all(contracts)
+    db.commit()
+    return [contract.id for contract in contracts]
+
+
+def test_clause_reindex_pages_past_contracts_without_clauses(client, db, monkeypatch):
+    async def embed_texts(texts):
+        return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(main.rag_engine, "embed_texts", embed_texts)
+    empty = _add_contracts(db, {}, {"clauses": {}}, {})
+    [with_clauses] = _add_contracts(db, {"clauses": {"termination": "Either party may terminate on notice."}})
+    after_id = empty[0] - 1
+
+    pages = []
+    while after_id is not None:
+        page = client.post("/clauses/reindex", params={"limit": 2, "after_id": after_id}).json()
+        pages.append(page)
+        after_id = page["next_after_id"]
+
+    assert sum(page["contracts_indexed"] for page in pages) == 1
+    assert db.query(models.ClauseEmbedding).filter(models.ClauseEmbedding.contract_id == with_clauses).count() == 1
+
+
+def test_party_backfill_pages_past_contracts_without_parties(client, db):
+    empty = _add_contracts(db, {}, {"parties": []}, {"signatories": []})
+    [with_parties] = _add_contracts(db, {"parties": ["Acme Holdings LLC", "Globex Corp"]})
+    after_id = empty[0] - 1
+
+    pages = []
+    while after_id is not None:
+        page = client.post("/parties/reindex", params={"limit": 2, "after_id": after_id}).json()
+        pages.append(page)
+        after_id = page["next_after_id"]
+
+    assert sum(page["contracts_linked"] for page in pages) == 1
+    assert db.query(models.ContractParty).filter(models.ContractParty.contract_id == with_parties).count() == 2
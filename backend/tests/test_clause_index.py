@@ -0,0 +1,49 @@
+from app.agents.clause_index import ClauseIndex
+
+
+def test_clause_index_skips_rows_already_added():
+    index = ClauseIndex()
+    rows = [(1, 10, "termination", [1.0, 0.0]), (2, 10, "payment", [0.0, 1.0])]
+    # Two requests synced from the same high-water mark and both add what they read
+    index.add(rows)
+    index.add(rows + [(3, 11, "termination", [1.0, 1.0])])
+
+    assert len(index) == 3
+    assert [row_id for row_id, _ in index.search([1.0, 0.0], top_k=10)].count(1) == 1
+
+
+def test_clause_index_picks_up_rows_committed_out_of_id_order():
+    index = ClauseIndex()
+    # Row 2 belongs to an ingest that hadn't committed when rows 1 and 3 were read
+    index.add([(1, 10, "termination", [1.0, 0.0]), (3, 11, "payment", [0.0, 1.0])])
+    assert index.pending() == (3, [2])
+
+    index.add([(2, 12, "termination", [1.0, 1.0])])
+    index.add([(2, 12, "termination", [1.0, 1.0])])
+
+    assert len(index) == 3
+    assert index.pending() == (3, [])
+
+
+def test_sync_reads_rows_committed_behind_the_high_water_mark(client, db):
+    from app import main, models
+
+    contract = models.Contract(contract_type="msa")
+    db.add(contract)
+    db.commit()
+    top = main.clause_index.max_id + 1000
+
+    def store(row_id):
+        db.add(models.ClauseEmbedding(id=row_id, contract_id=contract.id, clause_name=f"c{row_id}",
+                                      clause_type="termination", text="notice", embedding=[1.0, 0.0]))
+        db.commit()
+
+    store(top + 1)
+    store(top + 3)
+    main.sync_clause_index(db)
+    store(top + 2)  # committed late, below max_id
+    main.sync_clause_index(db)
+    main.sync_clause_index(db)
+
+    matches = main.clause_index.search([1.0, 0.0], top_k=1000, contract_ids=[contract.id])
+    assert sorted(row_id for row_id, _ in matches) == [top + 1, top + 2, top + 3]
@@ -0,0 +1,65 @@
+from app.agents import diff_engine
+from app.agents.diff_engine import TreeDiff, build_tree, diff_extractions, section_fingerprints
+
+DELIVERABLES = [
+    {"item": "Design", "due_date": "2024-01-01", "owner": "Vendor"},
+    {"item": "Build", "due_date": "2024-03-01", "owner": "Vendor"},
+    {"item": "Launch", "due_date": "2024-06-01", "owner": "Client"},
+]
+
+
+def changes(old, new):
+    return sorted((delta["field_name"], delta["change_type"]) for delta in TreeDiff().diff(build_tree(old), build_tree(new)))
+
+
+def test_reordered_list_has_no_deltas():
+    assert changes({"deliverables": DELIVERABLES}, {"deliverables": DELIVERABLES[::-1]}) == []
+
+
+def test_keyed_items_are_matched_across_a_reorder():
+    new = [dict(DELIVERABLES[2]), dict(DELIVERABLES[0], due_date="2024-02-01"), dict(DELIVERABLES[1])]
+
+    assert changes({"deliverables": DELIVERABLES}, {"deliverables": new}) == [
+        ("deliverables[Design].due_date", "modified"),
+    ]
+
+
+def test_keyed_items_added_and_removed():
+    new = DELIVERABLES[:2] + [{"item": "Support", "due_date": "2024-12-01", "owner": "Vendor"}]
+
+    assert changes({"deliverables": DELIVERABLES}, {"deliverables": new}) == [
+        ("deliverables[Launch]", "removed"),
+        ("deliverables[Support]", "added"),
+    ]
+
+
+def test_unkeyed_items_pair_by_similarity():
+    old = {"reporting_requirements": ["Monthly uptime report to the client", "Annual security audit"]}
+    new = {"reporting_requirements": ["Annual security audit", "Monthly uptime report to the customer"]}
+
+    assert changes(old, new) == [("reporting_requirements[Monthly uptime report to the client]", "modified")]
+
+
+def test_similarity_pairing_is_skipped_past_the_pair_cap(monkeypatch):
+    old = {"notes": ["Payment due within 30 days of invoice", "Invoices are sent monthly"]}
+    new = {"notes": ["Payment due within 45 days of invoice", "Invoices are sent quarterly"]}
+    assert [change for _, change in changes(old, new)] == ["modified", "modified"]
+
+    def similarity(old_node, new_node):
+        raise AssertionError("similarity scored past the pair cap")
+
+    monkeypatch.setattr(diff_engine, "MAX_SIMILARITY_PAIRS", 3)
+    monkeypatch.setattr(diff_engine, "similarity", similarity)
+
+    assert sorted(change for _, change in changes(old, new)) == ["added", "added", "removed", "removed"]
+
+
+def test_sections_with_equal_fingerprints_are_skipped():
+    old = {"contract_type": "MSA", "deliverables": DELIVERABLES}
+    new = {"contract_type": "SOW", "deliverables": DELIVERABLES}
+
+    deltas, skipped = diff_extractions(old, new, old_fingerprints=section_fingerprints(old),
+                                       new_fingerprints=section_fingerprints(new))
+
+    assert [(delta["field_name"], delta["change_type"]) for delta in deltas] == [("contract_type", "modified")]
+    assert skipped == 1
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from app.events import InProcessBackend, StatusBroker, make_event
+
+
+class RoundTripBackend(InProcessBackend):
+    """Registers subscriptions after a delay, like a SUBSCRIBE sent to Redis"""
+
+    async def subscribe(self, document_id):
+        await asyncio.sleep(0.05)
+        async for event in super().subscribe(document_id):
+            yield event
+
+
+async def collect(stream, timeout=2.0):
+    frames = []
+
+    async def read():
+        async for frame in stream:
+            if frame.startswith("event:"):
+                frames.append(json.loads(frame.split("data: ", 1)[1]))
+
+    await asyncio.wait_for(read(), timeout)
+    return frames
+
+
+def test_stream_sees_a_terminal_event_published_while_subscribing():
+    async def scenario():
+        broker = StatusBroker(RoundTripBackend())
+        stream = broker.stream(7, initial=make_event(7, "queued"))
+
+        async def fail_quickly():
+            # Lands after the stream started subscribing, before the subscription is in place
+            await asyncio.sleep(0.01)
+            await broker.publish(7, "failed", message="bad pdf")
+
+        task = asyncio.create_task(fail_quickly())
+        frames = await collect(stream)
+        await task
+        return frames
+
+    frames = asyncio.run(scenario())
+
+    assert [frame["stage"] for frame in frames] == ["failed"]
+
+
+def test_stream_does_not_repeat_the_latest_event():
+    async def scenario():
+        broker = StatusBroker(InProcessBackend())
+        await broker.publish(7, "extracting")
+        stream = broker.stream(7)
+
+        async def later():
+            await asyncio.sleep(0.05)
+            await broker.publish(7, "completed", contract_id=1)
+
+        task = asyncio.create_task(later())
+        frames = await collect(stream)
+        await task
+        return frames
+
+    assert [frame["stage"] for frame in asyncio.run(scenario())] == ["extracting", "completed"]
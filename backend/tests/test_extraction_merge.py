@@ -0,0 +1,86 @@
+from app.agents.extraction_merge import ExtractionMerge
+
+
+def merged(*extractions):
+    merger = ExtractionMerge()
+    for index, extraction in enumerate(extractions):
+        merger.add(index, extraction)
+    return merger.result()
+
+
+def test_malformed_dict_does_not_replace_a_list_field():
+    result = merged(
+        {"deliverables": [{"item": "Design", "due_date": "2024-01-01"}]},
+        {"deliverables": {"item": "Stray object"}},
+        {"deliverables": [{"item": "Build", "due_date": "2024-03-01"}]},
+    )
+
+    assert result["deliverables"] == [
+        {"item": "Design", "due_date": "2024-01-01"},
+        {"item": "Build", "due_date": "2024-03-01"},
+    ]
+
+
+def test_malformed_list_does_not_replace_a_dict_field():
+    result = merged(
+        {"clauses": {"Termination": "Either party may terminate."}},
+        {"clauses": ["Termination"]},
+    )
+
+    assert result["clauses"] == {"Termination": "Either party may terminate."}
+
+
+def test_nested_list_wins_over_a_malformed_dict():
+    result = merged(
+        {"contact_information": {"signatories": [{"name": "Jane Roe"}]}},
+        {"contact_information": {"signatories": {"name": "John Doe"}}},
+    )
+
+    assert result["contact_information"]["signatories"] == [{"name": "Jane Roe"}]
+
+
+CHUNKS = [
+    {"contract_type": "MSA", "parties": ["Acme Corp", "Globex"], "dates": {"effective_date": "Unknown"},
+     "financial": {"total_value": "$1,000,000"},
+     "clauses": {"Termination": "Either party may terminate."}},
+    {"contract_type": "Services Agreement", "parties": ["ACME Corp.", "Initech"],
+     "dates": {"effective_date": "2024-01-01"}, "financial": {"total_value": 1250000},
+     "deliverables": {"item": "Stray object"},
+     "clauses": {"termination": "Either party may terminate on 30 days' written notice."}},
+    {"deliverables": [{"item": "Design"}, {"item": "Build", "due_date": "2024-03-01"}],
+     "financial": {"total_value": "N/A", "currency": "USD"}},
+    {"deliverables": [{"item": "design", "owner": "Vendor"}],
+     "dates": {"effective_date": "2023-12-01", "expiration_date": "2026-12-31"}},
+]
+
+
+def test_merge_is_the_same_in_any_grouping_and_order():
+    expected = merged(*CHUNKS)
+
+    reversed_order = ExtractionMerge()
+    for index in reversed(range(len(CHUNKS))):
+        reversed_order.add(index, CHUNKS[index])
+    assert reversed_order.result() == expected
+
+    left, right = ExtractionMerge(), ExtractionMerge()
+    for index in (3, 0):
+        left.add(index, CHUNKS[index])
+    for index in (2, 1):
+        right.add(index, CHUNKS[index])
+    assert right.update(left).result() == expected
+    assert right.chunks == len(CHUNKS)
+
+
+def test_conflicts_resolve_by_field_rule():
+    result = merged(*CHUNKS)
+
+    # First non-empty scalar in document order
+    assert result["contract_type"] == "MSA"
+    assert result["dates"] == {"effective_date": "2024-01-01", "expiration_date": "2026-12-31"}
+    # Largest amount
+    assert result["financial"] == {"total_value": 1250000, "currency": "USD"}
+    # One clause per normalized name, the longest text
+    assert result["clauses"] == {"termination": "Either party may terminate on 30 days' written notice."}
+    # One entry per identity, the most complete duplicate, placed where that duplicate appears
+    assert result["parties"] == ["Globex", "ACME Corp.", "Initech"]
+    assert result["deliverables"] == [{"item": "Build", "due_date": "2024-03-01"}, {"item": "design", "owner": "Vendor"}]
@@ -0,0 +1,23 @@
+from app.agents.hybrid_search import BM25Index
+
+
+def test_bm25_index_skips_documents_already_added():
+    index = BM25Index()
+    docs = [(1, "termination for convenience"), (2, "payment within thirty days")]
+    index.add(docs)
+    scores = dict(index.search("termination"))
+    index.add(docs)
+
+    assert len(index) == 2
+    assert dict(index.search("termination")) == scores
+
+
+def test_bm25_index_picks_up_documents_committed_out_of_id_order():
+    index = BM25Index()
+    index.add([(1, "termination for convenience"), (3, "payment within thirty days")])
+    index.add([(2, "termination for cause")])
+    index.add([(2, "termination for cause")])
+
+    assert len(index) == 3
+    assert sorted(doc_id for doc_id, _ in index.search("termination")) == [1, 2]
+    assert index.pending() == (3, [])
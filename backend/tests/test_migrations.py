@@ -0,0 +1,75 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, inspect, insert, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app import migrations, models
+
+# Schema objects added by migrations after version 4
+LATER_TABLES = ("contract_deadlines", "risk_rescore_runs")
+LATER_CONTRACT_COLUMNS = ("risk_indicators", "risk_rules_version", "risk_scored_at")
+
+
+def make_v4_database(url: str):
+    """A database as a release at schema version 4 left it, holding one contract"""
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        models.Base.metadata.create_all(bind=conn)
+        for table in LATER_TABLES:
+            conn.exec_driver_sql(f"DROP TABLE {table}")
+        for column in LATER_CONTRACT_COLUMNS:
+            conn.exec_driver_sql(f"ALTER TABLE contracts DROP COLUMN {column}")
+        migrations._bookkeeping.create_all(bind=conn)
+        for version, description, _ in migrations.MIGRATIONS[:4]:
+            conn.execute(insert(migrations.schema_migrations).values(version=version, description=description))
+        conn.execute(
+            text("INSERT INTO contracts (contract_type, expiration_date, auto_renewal, renewal_notice_period, "
+                 "risk_factors) VALUES ('msa', :expiration, 1, 60, :factors)"),
+            {"expiration": datetime.now() + timedelta(days=400),
+             "factors": '[{"factor": "Unlimited Liability", "severity": "high"}]'},
+        )
+    return engine
+
+
+def test_upgrade_from_version_4_to_head(tmp_path):
+    engine = make_v4_database(f"sqlite:///{tmp_path / 'v4.db'}")
+
+    assert migrations.migrate(engine) == [version for version, _, _ in migrations.MIGRATIONS[4:]]
+
+    inspector = inspect(engine)
+    assert set(LATER_TABLES) <= set(inspector.get_table_names())
+    assert set(LATER_CONTRACT_COLUMNS) <= {column["name"] for column in inspector.get_columns("contracts")}
+    with engine.connect() as conn:
+        kinds = conn.exec_driver_sql("SELECT kind FROM contract_deadlines ORDER BY deadline_at").scalars().all()
+    assert kinds == ["renewal_notice", "expiration"]
+    with engine.connect() as conn:
+        indicators = conn.exec_driver_sql("SELECT risk_indicators FROM contracts").scalar_one()
+    assert json.loads(indicators) == {"auto_renewal": True, "unlimited_liability": True, "penalty_clauses": False}
+    assert migrations.migrate(engine) == []
+
+
+def test_database_from_before_migrations_gains_fingerprints(tmp_path):
+    """create_all-era databases: no schema_migrations table and no contracts.fingerprints"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        models.Base.metadata.create_all(bind=conn)
+        conn.exec_driver_sql("ALTER TABLE contracts DROP COLUMN fingerprints")
+
+    migrations.migrate(engine)
+
+    assert "fingerprints" in {column["name"] for column in inspect(engine).get_columns("contracts")}
+
+
+def test_search_indexes_build_concurrently_on_postgresql():
+    statements = [str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+                  for index in migrations.concurrent_indexes()]
+
+    assert any("ix_contracts_review_queue" in statement for statement in statements)
+    assert all(" INDEX CONCURRENTLY " in statement for statement in statements)
+    # The model's own indexes stay plain, for create_all inside the migration transaction
+    assert not any(
+        "CONCURRENTLY" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        for table in migrations.SEARCH_INDEX_TABLES for index in table.indexes
+    )
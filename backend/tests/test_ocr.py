@@ -0,0 +1,85 @@
+from concurrent.futures import Future
+
+import PyPDF2
+import pytest
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, EncodedStreamObject, NameObject
+
+from app.agents import ocr
+
+
+def image_stream(data: bytes, filter_name=None):
+    stream = EncodedStreamObject() if filter_name else DecodedStreamObject()
+    # Set raw, as read from a file; a filter PyPDF2 can't decode makes the bytes unreadable
+    stream._data = data
+    stream[NameObject("/Subtype")] = NameObject("/Image")
+    if filter_name:
+        stream[NameObject("/Filter")] = NameObject(filter_name)
+    return stream
+
+
+def page_with(*images):
+    page = PyPDF2.PdfWriter().add_blank_page(612, 792)
+    if images:
+        xobjects = DictionaryObject({NameObject(f"/Im{i}"): image for i, image in enumerate(images)})
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): xobjects})
+    return page
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """OCR calls made by PageOCR, answered at once instead of in the process pool"""
+    calls = []
+
+    class Pool:
+        def submit(self, fn, page_pdf, dpi, language):
+            calls.append(page_pdf)
+            future = Future()
+            future.set_result((f"page text {len(calls)}", 0.01))
+            return future
+
+    monkeypatch.setattr(ocr, "_get_pool", lambda: Pool())
+    return calls
+
+
+def test_pages_with_different_images_get_different_keys():
+    first = ocr.page_image_hash(page_with(image_stream(b"scan one")))
+    second = ocr.page_image_hash(page_with(image_stream(b"scan two")))
+
+    assert first and second and first != second
+    assert ocr.page_image_hash(page_with(image_stream(b"scan one"))) == first
+
+
+def test_unreadable_image_has_no_key():
+    assert ocr.page_image_hash(page_with(image_stream(b"scan", "/JBIG2Decode"))) is None
+
+
+def test_page_without_images_is_not_ocred(submitted):
+    page_ocr = ocr.PageOCR(cache=ocr.OCRCache(directory=None))
+    page_ocr.submit(0, page_with())
+
+    assert page_ocr.collect() == {}
+    assert submitted == []
+
+
+def test_unhashable_page_is_ocred_without_caching(submitted):
+    cache = ocr.OCRCache(directory=None)
+    page = page_with(image_stream(b"scan", "/JBIG2Decode"))
+
+    for run in range(2):
+        page_ocr = ocr.PageOCR(cache=cache)
+        page_ocr.submit(0, page)
+        assert page_ocr.collect() == {0: f"page text {run + 1}"}
+
+    assert len(submitted) == 2
+    assert len(cache._entries) == 0
+
+
+def test_readable_page_is_served_from_the_cache(submitted):
+    cache = ocr.OCRCache(directory=None)
+
+    for _ in range(2):
+        page_ocr = ocr.PageOCR(cache=cache)
+        page_ocr.submit(0, page_with(image_stream(b"scan")))
+        assert page_ocr.collect() == {0: "page text 1"}
+
+    assert len(submitted) == 1
@@ -0,0 +1,34 @@
+import json
+
+from app import models
+from app.parties import link_contract_parties
+
+
+def _contract_with_parties(db, contract_type, parties):
+    contract = models.Contract(contract_type=contract_type, parties=parties)
+    db.add(contract)
+    db.flush()
+    link_contract_parties(db, contract.id, parties, None)
+    db.commit()
+    return contract.id
+
+
+def test_text_search_matches_normalized_party_names(client, db):
+    contract_id = _contract_with_parties(db, "party-search", ["ACME Holdings, L.L.C."])
+
+    found = client.get("/contracts/search/advanced", params={"query": "Acme Holdings LLC"}).json()
+
+    assert contract_id in [contract["id"] for contract in found["contracts"]]
+
+
+def test_batch_compare_filters_by_normalized_party_name(client, db):
+    baseline = _contract_with_parties(db, "party-batch", ["Initech Inc."])
+    match = _contract_with_parties(db, "party-batch", ["The Globex Corporation", "Initech Inc."])
+    _contract_with_parties(db, "party-batch", ["Umbrella Ltd"])
+
+    response = client.post("/contracts/compare/batch", json={
+        "baseline_id": baseline, "contract_type": "party-batch", "party_name": "Globex Corp.",
+    })
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["contract_id"] for line in lines if line["type"] == "result"] == [match]
@@ -0,0 +1,43 @@
+"""The dashboard, search and alert queries use the indexes app.migrations creates.
+
+Runs the cases from benchmarks.check_query_plans against a seeded SQLite
+database of its own; run that script with --database-url for PostgreSQL.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.alerts import backfill_deadlines
+from app.migrations import migrate
+from app.parties import link_contract_parties
+from benchmarks.check_query_plans import capture_plans, missing_indexes, plan_cases, seed
+
+CASE_NAMES = [name for name, _, _ in plan_cases(None, None, postgres=False)]
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    migrate(engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    try:
+        seed(db, models, link_contract_parties, 300)
+        backfill_deadlines(db)
+        cases = {name: (call, expected) for name, call, expected in plan_cases(db, session_factory, postgres=False)}
+        yield engine, db, cases
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.mark.parametrize("name", CASE_NAMES)
+def test_query_uses_index(seeded, name):
+    engine, db, cases = seeded
+    call, expected = cases[name]
+
+    plans = capture_plans(engine, db, call)
+
+    assert plans
+    assert missing_indexes(plans, expected) == [], "\n\n".join(plan for _, plan in plans)
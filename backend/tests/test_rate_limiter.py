@@ -0,0 +1,51 @@
+from app.agents import rate_limiter
+from app.agents.rate_limiter import get_limiter
+
+
+def test_limiters_are_per_model_with_per_model_limits(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.setenv("OPENAI_RPM", "100")
+    monkeypatch.setenv("OPENAI_RPM_GPT_4_TURBO_PREVIEW", "40")
+
+    fast = get_limiter("chat", "gpt-3.5-turbo-0125")
+    strong = get_limiter("chat", "gpt-4-turbo-preview")
+
+    assert fast is not strong
+    assert get_limiter("chat", "gpt-3.5-turbo-0125") is fast
+    # Each worker takes its share of the model's quota
+    assert fast.requests.capacity == 50
+    assert strong.requests.capacity == 20
+    strong.requests.reserve(20)
+    assert fast.requests.reserve(1) == 0
+
+
+def test_waiting_callers_get_a_slot_as_soon_as_one_is_released():
+    import asyncio
+
+    from app.agents.rate_limiter import RateLimiter
+
+    async def scenario():
+        limiter = RateLimiter("test", requests_per_minute=6000, tokens_per_minute=10 ** 9,
+                              max_concurrency=2, min_concurrency=1)
+        limiter.concurrency = 1.0
+        order = []
+
+        async def job(name, seconds):
+            async def work():
+                order.append(("start", name))
+                await asyncio.sleep(seconds)
+                order.append(("end", name))
+            await limiter.call(work)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(job("a", 0.02), job("b", 0.0), job("c", 0.0))
+        return order, loop.time() - started, limiter.in_flight
+
+    order, elapsed, in_flight = asyncio.run(scenario())
+
+    assert order[:2] == [("start", "a"), ("end", "a")]
+    assert len(order) == 6 and in_flight == 0
+    # Polling every 50ms would have taken at least that long per waiter
+    assert elapsed < 0.05
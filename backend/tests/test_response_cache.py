@@ -0,0 +1,17 @@
+from app import models
+
+
+def test_contract_deltas_are_not_served_stale(client, db):
+    contract = models.Contract(contract_type="msa")
+    db.add(contract)
+    db.commit()
+    first = client.get(f"/contracts/{contract.id}/deltas")
+    assert first.json() == []
+
+    # As ingesting the next version does: deltas are added, the contract row is untouched
+    db.add(models.ContractDelta(contract_id=contract.id, field_name="financial.total_value", change_type="modified"))
+    db.commit()
+    second = client.get(f"/contracts/{contract.id}/deltas", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert [delta["field_name"] for delta in second.json()] == ["financial.total_value"]
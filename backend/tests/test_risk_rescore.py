@@ -0,0 +1,16 @@
+from app import models
+from app.agents.risk_rules import load_rules
+from app.risk_rescore import rescore_contracts
+
+
+def test_rescore_keeps_indicator_factors_of_contracts_without_stored_indicators(client, db):
+    factors = [{"factor": "Penalty Clauses", "severity": "medium", "mitigation": "Review penalty terms",
+                "confidence": 0.7}]
+    contract = models.Contract(contract_type="msa", risk_score=0.0, risk_factors=factors, risk_indicators=None)
+    db.add(contract)
+    db.commit()
+
+    rescore_contracts(db, load_rules())
+
+    db.refresh(contract)
+    assert [factor["factor"] for factor in contract.risk_factors] == ["Penalty Clauses"]
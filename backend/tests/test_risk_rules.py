@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from app.agents.risk_rules import DEFAULT_RULES, RiskRules, indicators_from_factors
+
+NOW = datetime(2025, 1, 1)
+
+
+def rule(op, field, weight=1.0, **options):
+    return {"id": f"{op}:{field}", "op": op, "field": field, "weight": weight, **options}
+
+
+def scores(rules, records):
+    return RiskRules({"version": "test", "max_score": 10, "rules": rules}).evaluate(records, NOW)[0].tolist()
+
+
+def test_truthy_reads_columns_and_json_keys():
+    records = [
+        {"auto_renewal": True, "risk_indicators": {"penalty_clauses": True}},
+        {"auto_renewal": False, "risk_indicators": {"penalty_clauses": False}},
+        {"auto_renewal": None, "risk_indicators": None},
+    ]
+
+    assert scores([rule("truthy", "auto_renewal")], records) == [1, 0, 0]
+    assert scores([rule("truthy", "risk_indicators.penalty_clauses")], records) == [1, 0, 0]
+
+
+def test_gt_parses_amounts_and_skips_missing_values():
+    records = [{"total_value": 2_000_000}, {"total_value": "$1,500,000"}, {"total_value": 1000},
+               {"total_value": None}, {"total_value": "TBD"}, {"total_value": True}]
+
+    assert scores([rule("gt", "total_value", value=1_000_000)], records) == [1, 1, 0, 0, 0, 0]
+
+
+def test_days_until_lt_counts_past_dates_and_skips_missing_ones():
+    records = [{"expiration_date": datetime(2025, 1, 20)}, {"expiration_date": "2025-03-01"},
+               {"expiration_date": "2024-06-01T00:00:00Z"}, {"expiration_date": None},
+               {"expiration_date": "not a date"}]
+
+    assert scores([rule("days_until_lt", "expiration_date", value=30)], records) == [1, 0, 1, 0, 0]
+
+
+def test_clause_terms_counts_each_matching_clause_once():
+    records = [{"clauses": {"Mutual Indemnification": "...", "Limitation of Liability": "...", "Governing Law": "..."}},
+               {"clauses": ["termination for convenience", "termination penalty"]},
+               {"clauses": None}]
+
+    assert scores([rule("clause_terms", "clauses", weight=0.5, terms=["indemnification", "liability", "penalty"])],
+                  records) == [1.0, 0.5, 0]
+
+
+def test_same_factor_from_several_rules_keeps_the_most_severe():
+    rules = RiskRules(DEFAULT_RULES)
+
+    score, factors = rules.score_extraction(
+        {"financial": {"total_value": 6_000_000}, "dates": {"expiration_date": "2025-01-10"}}, NOW)
+
+    assert score == pytest.approx(0.65)
+    assert {factor["factor"]: factor["severity"] for factor in factors} == {
+        "High Contract Value": "high", "Contract Expiring Soon": "high",
+    }
+
+
+def test_unknown_op_is_rejected():
+    with pytest.raises(ValueError, match="unknown op"):
+        RiskRules({"version": "bad", "rules": [rule("contains", "clauses")]})
+
+
+def test_indicators_from_factors():
+    assert indicators_from_factors([{"factor": "Unlimited Liability"}, "not a factor"], auto_renewal=1) == {
+        "auto_renewal": True, "unlimited_liability": True, "penalty_clauses": False,
+    }
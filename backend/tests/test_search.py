@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import main, models
+from app.agents import rag_engine as rag_engine_module
+from app.agents.hybrid_search import is_lexical_query
+
+
+@pytest.mark.parametrize("query, lexical", [
+    ('"limitation of liability"', True),
+    ("section 12.3", True),
+    ("$1,000,000", True),
+    ("MSA-2024-017", True),
+    ("Globex", True),
+    ("termination notice period", False),
+    ("what happens if the supplier misses a delivery date", False),
+])
+def test_is_lexical_query(query, lexical):
+    assert is_lexical_query(query) is lexical
+
+
+@pytest.fixture
+def embedding_calls(monkeypatch):
+    calls = []
+
+    async def create_embedding(model, input):
+        calls.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[1.0, 0.0])])
+
+    async def answer_query(query, context):
+        return context
+
+    monkeypatch.setattr(rag_engine_module, "create_embedding", create_embedding)
+    monkeypatch.setattr(main.rag_engine, "answer_query", answer_query)
+    return calls
+
+
+@pytest.fixture
+def chunk(db):
+    contract = models.Contract(contract_type="supply")
+    db.add(contract)
+    db.flush()
+    db.add(models.RAGEmbedding(contract_id=contract.id, embedding=[1.0, 0.0],
+                               text_chunk="12.3 Limitation of liability. Neither party is liable for lost profits."))
+    db.commit()
+    return contract.id
+
+
+def test_hybrid_search_skips_embedding_for_exact_match_queries(client, chunk, embedding_calls):
+    response = client.post("/search", json={"query": '"limitation of liability"'})
+
+    assert chunk in [result["contract_id"] for result in response.json()["results"]]
+    assert embedding_calls == []
+
+
+def test_hybrid_search_embeds_descriptive_queries(client, chunk, embedding_calls):
+    response = client.post("/search", json={"query": "who pays for lost profits"})
+
+    assert response.status_code == 200
+    assert embedding_calls == ["who pays for lost profits"]
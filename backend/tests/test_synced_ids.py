@@ -0,0 +1,24 @@
+from app.agents import synced_ids
+from app.agents.synced_ids import SyncedIds
+
+
+def test_gaps_are_re_read_until_they_expire(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(synced_ids.time, "monotonic", lambda: clock[0])
+    ids = SyncedIds(gap_seconds=60)
+    ids.record([1, 2, 5])
+
+    assert ids.pending() == (5, [3, 4])
+    assert ids.is_new(4) and ids.is_new(6) and not ids.is_new(2)
+
+    ids.record([4])
+    clock[0] += 61
+    assert ids.pending() == (5, [])
+    assert not ids.is_new(3)
+
+
+def test_gaps_are_bounded():
+    ids = SyncedIds(max_gaps=3)
+    ids.record([1, 100])
+
+    assert ids.pending() == (100, [97, 98, 99])
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from app import main
+from app.agents import contract_processor
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def scanned_pdf() -> bytes:
+    """One page holding only an image, like a scanner's output"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 800), "white").save(buffer, "PDF", resolution=72)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def processing(monkeypatch):
+    queued = []
+
+    async def process_document_async(document_id, contents, *args):
+        queued.append(document_id)
+
+    class NoOCRInRequest:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("the upload request ran OCR")
+
+    monkeypatch.setattr(main, "process_document_async", process_document_async)
+    monkeypatch.setattr(contract_processor, "PageOCR", NoOCRInRequest)
+    return queued
+
+
+def test_scanned_upload_is_queued_without_ocr_in_the_request(client, processing, monkeypatch):
+    monkeypatch.setattr(contract_processor, "ocr_available", lambda: True)
+
+    response = client.post("/upload", files={"file": ("scan.pdf", scanned_pdf(), "application/pdf")})
+
+    assert response.status_code == 200
+    assert processing == [response.json()["id"]]
+
+
+def test_scanned_upload_is_rejected_without_ocr(client, processing, monkeypatch):
+    monkeypatch.setattr(contract_processor, "ocr_available", lambda: False)
+
+    response = client.post("/upload", files={"file": ("scan.pdf", scanned_pdf(), "application/pdf")})
+
+    assert response.status_code == 400
+    assert "OCR" in response.json()["detail"]
+    assert processing == []
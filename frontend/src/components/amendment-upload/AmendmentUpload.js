@@ -8,7 +8,7 @@ import ParentContractStep from './ParentContractStep';
 import AmendmentConfigStep from './AmendmentConfigStep';
 import UploadProgressStep from './UploadProgressStep';
 import CompletionDialog from './CompletionDialog';
-import { uploadDocumentWithMetadata, getContracts } from '../../services/api';
+import { uploadDocumentWithMetadata, getContracts, watchDocumentStatus } from '../../services/api';
 
 const AmendmentUpload = ({ onUploadSuccess }) => {
   const [activeStep, setActiveStep] = useState(0);
@@ -44,6 +44,36 @@ const AmendmentUpload = ({ onUploadSuccess }) => {
     setActiveStep((prevStep) => prevStep - 1);
   };
 
+  // Live chunk progress is pushed by the backend; the final state (or
+  // everything, if the event stream is unavailable) comes from polling
+  const waitForProcessing = async (documentId, fileName, fileIndex, totalFiles) => {
+    try {
+      await watchDocumentStatus(documentId, (event) => {
+        let message = null;
+        let progress = null;
+        if (event.stage === 'extracting') {
+          message = 'Reading document text...';
+          progress = 20;
+        } else if (event.stage === 'chunk') {
+          message = `Processing chunk ${event.chunk}/${event.chunks} with AI...`;
+          progress = 30 + Math.round((50 * event.chunk) / event.chunks);
+        } else if (event.stage === 'embedding') {
+          message = 'Creating embeddings...';
+          progress = 85;
+        }
+        if (message) {
+          setProcessingStatus(prev => ({
+            ...prev,
+            [fileIndex]: { fileName, status: 'processing', message, progress }
+          }));
+        }
+      });
+    } catch (error) {
+      console.log('Status stream unavailable, polling instead:', error.message);
+    }
+    return pollDocumentStatus(documentId, fileName, fileIndex, totalFiles);
+  };
+
   const pollDocumentStatus = async (documentId, fileName, fileIndex, totalFiles) => {
     let attempts = 0;
     const maxAttempts = 120;
@@ -208,7 +238,7 @@ const AmendmentUpload = ({ onUploadSuccess }) => {
           const result = await uploadDocumentWithMetadata(file, metadata);
           
           if (result && result.id) {
-            const pollResult = await pollDocumentStatus(result.id, file.name, i, totalFiles);
+            const pollResult = await waitForProcessing(result.id, file.name, i, totalFiles);
             
             if (pollResult.success) {
               successfulUploads++;
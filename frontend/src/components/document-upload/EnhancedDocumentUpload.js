@@ -5,7 +5,7 @@ import UploadZone from './UploadZone';
 import UploadProgress from './UploadProgress';
 import ProcessingSteps from './ProcessingSteps';
 import AmendmentDialog from './AmendmentDialog';
-import { uploadDocumentWithMetadata } from '../../services/api';
+import { uploadDocumentWithMetadata, watchDocumentStatus } from '../../services/api';
 import { processingStages, fileTypes } from './UploadUtils';
 
 const EnhancedDocumentUpload = ({ onUploadSuccess, existingContracts = [] }) => {
@@ -130,6 +130,28 @@ const EnhancedDocumentUpload = ({ onUploadSuccess, existingContracts = [] }) =>
     };
   };
 
+  // Live progress is pushed by the backend; the final state (or everything,
+  // if the event stream is unavailable) comes from the status endpoint
+  const waitForProcessing = async (documentId) => {
+    try {
+      await watchDocumentStatus(documentId, (event) => {
+        if (event.stage === 'extracting') {
+          updateProcessingStep(3, 'processing', 'Reading document text...');
+        } else if (event.stage === 'chunk') {
+          updateProcessingStep(3, 'processing', `Processing chunk ${event.chunk}/${event.chunks} with AI...`);
+          setProgress(40 + Math.round((45 * event.chunk) / event.chunks));
+        } else if (event.stage === 'embedding') {
+          updateProcessingStep(3, 'completed', 'All chunks processed successfully');
+          updateProcessingStep(7, 'processing', 'Creating embeddings...');
+          setProgress(88);
+        }
+      });
+    } catch (error) {
+      console.log('Status stream unavailable, polling instead:', error.message);
+    }
+    return pollDocumentStatus(documentId);
+  };
+
   const simulateProcessing = async (file, isAmendmentFlag) => {
     setUploading(true);
     setProcessingComplete(false);
@@ -168,9 +190,7 @@ const EnhancedDocumentUpload = ({ onUploadSuccess, existingContracts = [] }) =>
       updateProcessingStep(3, 'processing', 'Backend processing started. Waiting for completion...');
       setProgress(40);
       
-      await new Promise(resolve => setTimeout(resolve, 2000));
-      
-      const pollResult = await pollDocumentStatus(result.id);
+      const pollResult = await waitForProcessing(result.id);
       
       if (pollResult.success) {
         setUploadCompleted(true);
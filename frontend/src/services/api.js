@@ -115,6 +115,39 @@ export const compareContracts = async (contractId1, contractId2) => {
   return response.data;
 };
 
+// Push-based processing status over server-sent events. onEvent receives every
+// stage (queued, extracting, chunk, embedding, completed, failed); the promise
+// resolves with the final event. It rejects when the stream can't be opened,
+// so callers can fall back to polling getDocumentStatus.
+export const watchDocumentStatus = (documentId, onEvent) => new Promise((resolve, reject) => {
+  if (typeof EventSource === 'undefined') {
+    reject(new Error('EventSource is not supported'));
+    return;
+  }
+  const source = new EventSource(`${API_BASE}/documents/${documentId}/events`);
+  let received = false;
+
+  source.addEventListener('status', (message) => {
+    received = true;
+    const event = JSON.parse(message.data);
+    if (onEvent) {
+      onEvent(event);
+    }
+    if (event.stage === 'completed' || event.stage === 'failed') {
+      source.close();
+      resolve(event);
+    }
+  });
+
+  source.onerror = () => {
+    // Once the stream has been open, EventSource reconnects by itself
+    if (!received) {
+      source.close();
+      reject(new Error('Status stream unavailable'));
+    }
+  };
+});
+
 export const getDocumentStatus = async (documentId) => {
     try {
         const response = await api.get(`/documents/${documentId}/status`);